@@ -1,579 +1,1460 @@
-from email.policy import default
-import os
-import csv
-from datetime import datetime
-import io
-from flask import Flask, render_template, request, redirect, url_for, flash, make_response
-from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import text, func
-from datetime import datetime, date, timedelta
-from dateutil.relativedelta import relativedelta
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill
-from openpyxl.utils import get_column_letter
-from io import BytesIO
-
-# ============================================================================
-# CONFIGURACIÓN DE LA APLICACIÓN
-# ============================================================================
-app = Flask(__name__)
-
-# Clave secreta para sesiones y mensajes flash (CRÍTICO: usar variable de entorno en producción)
-app.secret_key = os.environ.get('SECRET_KEY', 'mi-clave-super-larga-y-compleja-2024')
-
-# Configuración de base de datos
-# En Render usa PostgreSQL (DATABASE_URL), localmente usa SQLite
-app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
-    "DATABASE_URL",
-    "sqlite:///novedades.db"
-)
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-# Inicializar SQLAlchemy
-db = SQLAlchemy(app)
-
-
-# ============================================================================
-# MODELO DE BASE DE DATOS
-# ============================================================================
-class Novedad(db.Model):
-    """Modelo que representa una novedad laboral (Alta/Baja/Reemplazo/Otros)"""
-    __tablename__ = 'novedades'
-
-    # ID y timestamp
-    id = db.Column(db.Integer, primary_key=True)
-    timestamp = db.Column(db.String(50), nullable=False)
-
-    # Datos básicos del empleado
-    legajo = db.Column(db.String(50), default="")
-    nombre = db.Column(db.String(255), nullable=False)
-    tipo_empleado = db.Column(db.String(50), default="")  # Docente/No Docente
-    tipo_novedad = db.Column(db.String(50), nullable=False)  # Alta/Baja/Reemplazo/Otros
-
-    # Datos personales
-    fecha_nacimiento = db.Column(db.String(50), default="")
-    dni = db.Column(db.String(50), default="")
-    cuil = db.Column(db.String(50), default="")
-    cbu = db.Column(db.String(50), default="")
-    banco = db.Column(db.String(255), default="")
-    domicilio = db.Column(db.String(255), default="")
-    email = db.Column(db.String(255), default="")
-    obra_social = db.Column(db.String(255), default="")
-
-    # Datos del alta
-    nivel = db.Column(db.String(50), default="")  # Inicial/Primario/Secundario/Terciario
-    fecha_alta = db.Column(db.String(50), default="")
-    cargo = db.Column(db.String(255), default="")
-    caracter_del_cargo = db.Column(db.String(50), default="")  # Titular/Suplente
-
-    # Decretos
-    trabaja_otra_institucion = db.Column(db.String(50), default="")
-    tipo_institucion = db.Column(db.String(50), default="")  # Pública/Privada/Ambas
-    horas_catedras = db.Column(db.Float, default=0.0)
-
-    # Datos laborales
-    subvencionado = db.Column(db.String(50), default="")
-    asignaciones_familiares = db.Column(db.String(50), default="")
-    cantidad_hijos = db.Column(db.Integer, default=0)
-
-    # Datos de reemplazo
-    reemplazo_persona_ya_trabaja = db.Column(db.String(50), default="")
-    reemplazo_cargo_que_cubre = db.Column(db.String(255), default="")
-    fecha_inicio_reemplazo = db.Column(db.String(50), default="")
-    fecha_fin_reemplazo = db.Column(db.String(50), default="")
-
-    # Datos de baja
-    fecha_baja = db.Column(db.String(50), default="")
-    motivo_baja = db.Column(db.String(255), default="")
-
-    # Otros tipos de novedad
-    tipo_otro = db.Column(db.String(255), default="")  # Anticipo/Inasistencia/Licencia
-
-    # Información adicional
-    cargos_actuales = db.Column(db.String(255), default="")
-    tipo_movimiento = db.Column(db.String(255), default="")
-    subvencion = db.Column(db.String(255), default="")
-    codigo = db.Column(db.String(255), default="")
-    observaciones = db.Column(db.Text, default="")
-
-
-# ============================================================================
-# FUNCIONES DE BASE DE DATOS
-# ============================================================================
-def add_novedad(data: dict):
-    """
-    Guarda una nueva novedad en la base de datos.
-    
-    Args:
-        data: Diccionario con los campos de la novedad
-    """
-    nueva_novedad = Novedad(**data)
-    db.session.add(nueva_novedad)
-    db.session.commit()
-
-
-def get_all_novedades():
-    """
-    Obtiene todas las novedades del período actual (del 6 del mes al 5 del siguiente).
-    
-    Returns:
-        Lista de objetos Novedad ordenados por fecha descendente
-    """
-    today = date.today()
-
-    # Calcular el rango de fechas (del 6 al 5)
-    if today.day >= 6:
-        # Desde el 6 de este mes hasta el 5 del mes siguiente
-        start_date = today.replace(day=6)
-        end_date = (today.replace(day=1) + relativedelta(months=1)).replace(day=5)
-    else:
-        # Desde el 6 del mes anterior hasta el 5 de este mes
-        start_date = (today.replace(day=1) - relativedelta(months=1)).replace(day=6)
-        end_date = today.replace(day=5)
-
-    # Consultar base de datos con filtro de fechas
-    novedades = (
-        Novedad.query
-        .filter(func.date(Novedad.timestamp) >= start_date)
-        .filter(func.date(Novedad.timestamp) <= end_date)
-        .order_by(Novedad.timestamp.desc())
-        .all()
-    )
-
-    return novedades
-
-def row_to_dict(obj):
-    """Convierte un objeto SQLAlchemy en un diccionario limpio"""
-    return {c.name: getattr(obj, c.name) for c in obj.__table__.columns}
-
-
-
-# ============================================================================
-# RUTAS DE LA APLICACIÓN
-# ============================================================================
-@app.route("/", methods=["GET"])
-def index():
-    """Página principal con el formulario de carga o edición"""
-    #return render_template("index.html")
-    edit_id = request.args.get("edit_id")
-
-    if edit_id:
-        #Buscar registro en la BD
-        novedad = Novedad.query.get(int(edit_id))
-
-        if not novedad:
-            flash("No se encontró la novedad para editar.", "danger")
-            return render_template("index.html", edit_mode=False)
-        
-        flash("Editando novedad existente", "info")
-        return render_template("index.html", edit_mode=True, data=row_to_dict(novedad))
-    #Modo normal (alta)
-    return render_template("index.html", edit_mode=False, data={})
-    
-
-
-
-@app.route("/enviar", methods=["POST"])
-def enviar():
-    """Procesa y valida el formulario de novedades"""
-    
-    # -------------------------------------------------------------------------
-    # 1. OBTENER DATOS DEL FORMULARIO
-    # -------------------------------------------------------------------------
-    # Datos básicos
-    legajo = (request.form.get("legajo") or "").strip()
-    nombre = (request.form.get("nombre") or "").strip()
-    tipo_empleado = (request.form.get("tipo_empleado") or "").strip()
-    tipo_novedad = (request.form.get("tipo_novedad") or "").strip()
-    
-    # Datos personales
-    fecha_nacimiento = (request.form.get("fecha_nacimiento") or "").strip()
-    dni = (request.form.get("dni") or "").strip()
-    cuil = (request.form.get("cuil") or "").strip()
-    cbu = (request.form.get("cbu") or "").strip()
-    banco = (request.form.get("banco") or "").strip()
-    domicilio = (request.form.get("domicilio") or "").strip()
-    email = (request.form.get("email") or "").strip()
-    obra_social = (request.form.get("obra_social") or "").strip()
-    
-    # Datos del alta
-    nivel = (request.form.get("nivel") or "").strip()
-    fecha_alta = (request.form.get("fecha_alta") or "").strip()
-    cargo = (request.form.get("cargo") or "").strip()
-    caracter_del_cargo = (request.form.get("caracter_del_cargo") or "").strip()
-    
-    # Decretos
-    trabaja_otra_institucion = (request.form.get("trabaja_otra_institucion") or "").strip()
-    tipo_institucion = (request.form.get("tipo_institucion") or "").strip()
-    horas_catedras_str = (request.form.get("horas_catedras") or "").strip()
-    
-    # Datos laborales
-    subvencionado = (request.form.get("subvencionado") or "").strip()
-    asignaciones_familiares = (request.form.get("asignaciones_familiares") or "").strip()
-    cantidad_hijos_str = (request.form.get("cantidad_hijos") or "").strip()
-    
-    # Datos de reemplazo
-    reemplazo_persona_ya_trabaja = (request.form.get("reemplazo_persona_ya_trabaja") or "").strip()
-    reemplazo_cargo_que_cubre = (request.form.get("reemplazo_cargo_que_cubre") or "").strip()
-    fecha_inicio_reemplazo = (request.form.get("fecha_inicio_reemplazo") or "").strip()
-    fecha_fin_reemplazo = (request.form.get("fecha_fin_reemplazo") or "").strip()
-    
-    # Datos de baja
-    fecha_baja = (request.form.get("fecha_baja") or "").strip()
-    motivo_baja = (request.form.get("motivo_baja") or "").strip()
-    
-    # Otros
-    tipo_otro = (request.form.get("tipo_otro") or "").strip()
-    
-    # Información adicional
-    cargos_actuales = (request.form.get("cargos_actuales") or "").strip()
-    tipo_movimiento = (request.form.get("tipo_movimiento") or "").strip()
-    subvencion = (request.form.get("subvencion") or "").strip()
-    codigo = (request.form.get("codigo") or "").strip()
-    observaciones = (request.form.get("observaciones") or "").strip()
-
-
-
-#@app.route("/actualizar", methods=["POST"])
-#def actualizar():
-#    """Actualiza una novedad existente"""
-    
-#    id_str = request.form.get("id")
-#    if not id_str:
-#        flash("Falta el ID de la novedad a editar.", "danger")
-#        return redirect(url_for("ver"))
-
-#    novedad = Novedad.query.get(int(id_str))
-#    if not novedad:
-#        flash("No se encontró la novedad a editar.", "danger")
-#        return redirect(url_for("ver"))
-    
-    # -------------------------------------------------------------------------
-    # ACTUALIZAR TODOS LOS CAMPOS (igual que en /enviar)
-    # -------------------------------------------------------------------------
-
-
-    # Datos personales
-#    fecha_nacimiento = (request.form.get("fecha_nacimiento") or "").strip()
-#    novedad.fecha_nacimiento = fecha_nacimiento
-
-# --------- ACTUALIZAR CAMPOS (SIN tocar id ni timestamp) ---------
-    #updates = {
-        
-    
-     #   "fecha_nacimiento": fecha_nacimiento,
-    #}
-
-    #for k, v in updates.items():
-    #setattr(novedad, k, v)
-
-
-    # -------------------------------------------------------------------------
-    # 2. VALIDACIONES
-    # -------------------------------------------------------------------------
-    errores = []
-    
-    # Validaciones básicas
-    if not nombre:
-        errores.append("El campo 'Nombre y apellido' es obligatorio.")
-    if not tipo_empleado:
-        errores.append("Seleccioná 'Docente' o 'No Docente'.")
-    if not tipo_novedad:
-        errores.append("Seleccioná el 'Tipo de novedad'.")
-    
-    ## Validaciones por tipo de novedad
-    if tipo_novedad == "Alta":
-         if not fecha_alta or not nivel or not cargo:
-            errores.append("Para 'Alta', los campos 'Fecha de alta', 'Nivel' y 'Cargo' son obligatorios.")
-    
-    elif tipo_novedad == "Baja":
-        if not fecha_baja or not motivo_baja:
-            errores.append("Para 'Baja', los campos 'Fecha de baja' y 'Motivo' son obligatorios.")
-    
-    elif tipo_novedad == "Reemplazo":
-        if reemplazo_persona_ya_trabaja not in ("Si", "No"):
-            errores.append("En 'Reemplazo', indicá si la persona ya trabaja en el colegio (Sí/No).")
-        elif reemplazo_persona_ya_trabaja == "Si":
-            if not reemplazo_cargo_que_cubre or not fecha_inicio_reemplazo or not fecha_fin_reemplazo:
-                errores.append("En 'Reemplazo (ya trabaja)', indicá cargo y fechas de inicio y fin.")
-        elif not fecha_alta or not nivel or not cargo:
-            errores.append("En 'Reemplazo (nuevo)', los campos 'Fecha de alta', 'Nivel' y 'Cargo' son obligatorios.")
-    
-    elif tipo_novedad == "Otros":
-        if not tipo_otro:
-            errores.append("En 'Otros', seleccioná el subtipo (Anticipo/Inasistencia/Lic. sin goce).")
-
-    # Validación de números
-    try:
-        horas_catedras = float(horas_catedras_str.replace(",", ".")) if horas_catedras_str else 0.0
-    except ValueError:
-        errores.append("Horas Cátedras debe ser un número válido.")
-        horas_catedras = 0.0
-
-    try:
-        cantidad_hijos = int(cantidad_hijos_str) if cantidad_hijos_str else 0
-    except ValueError:
-        errores.append("Cantidad de hijos debe ser un número entero.")
-        cantidad_hijos = 0
-
-    # Si hay errores, mostrarlos y volver al formulario
-    if errores:
-        for e in errores:
-            flash(e, "danger")
-        return render_template("index.html", edit_mode=False, data=request.form.to_dict())
-
-    # -------------------------------------------------------------------------
-    # 3. CREAR REGISTRO Y GUARDAR
-    # -------------------------------------------------------------------------
-    registro = {
-        "timestamp": datetime.now().isoformat(timespec="seconds"),
-        "legajo": legajo,
-        "nombre": nombre,
-        "tipo_empleado": tipo_empleado,
-        "tipo_novedad": tipo_novedad,
-        "fecha_nacimiento": fecha_nacimiento,
-        "dni": dni,
-        "cuil": cuil,
-        "cbu": cbu,
-        "banco": banco,
-        "domicilio": domicilio,
-        "email": email,
-        "obra_social": obra_social,
-        "nivel": nivel,
-        "fecha_alta": fecha_alta,
-        "cargo": cargo,
-        "caracter_del_cargo": caracter_del_cargo,
-        "trabaja_otra_institucion": trabaja_otra_institucion,
-        "tipo_institucion": tipo_institucion,
-        "horas_catedras": horas_catedras,
-        "subvencionado": subvencionado,
-        "asignaciones_familiares": asignaciones_familiares,
-        "cantidad_hijos": cantidad_hijos,
-        "reemplazo_persona_ya_trabaja": reemplazo_persona_ya_trabaja,
-        "reemplazo_cargo_que_cubre": reemplazo_cargo_que_cubre,
-        "fecha_inicio_reemplazo": fecha_inicio_reemplazo,
-        "fecha_fin_reemplazo": fecha_fin_reemplazo,
-        "fecha_baja": fecha_baja,
-        "motivo_baja": motivo_baja,
-        "tipo_otro": tipo_otro,
-        "cargos_actuales": cargos_actuales,
-        "tipo_movimiento": tipo_movimiento,
-        "subvencion": subvencion,
-        "codigo": codigo,
-        "observaciones": observaciones,
-    }
-
-    add_novedad(registro)
-    flash("¡Novedad registrada correctamente!", "success")
-    return redirect(url_for("ver"))
-
-
-@app.route("/actualizar", methods=["POST"])
-def actualizar():
-    """Actualiza una novedad existente (por ahora solo fecha_nacimiento)."""
-    id_str = request.form.get("id")
-    if not id_str:
-        flash("Falta el ID de la novedad a editar.", "danger")
-        return redirect(url_for("ver"))
-
-    novedad = Novedad.query.get(int(id_str))
-    if not novedad:
-        flash("No se encontró la novedad a editar.", "danger")
-        return redirect(url_for("ver"))
-
-    # ---- SOLO ACTUALIZAMOS FECHA DE NACIMIENTO (ejemplo) ----
-    novedad.fecha_nacimiento = (request.form.get("fecha_nacimiento") or "").strip()
-    novedad.nombre = (request.form.get("nombre") or "").strip()
-
-    db.session.commit()
-    flash("¡Novedad actualizada!", "success")
-    return redirect(url_for("ver"))
-
-
-
-
-
-
-@app.route("/ver", methods=["GET"])
-def ver():
-    """Muestra la tabla con todas las novedades del período actual"""
-    novedades_db = get_all_novedades()
-    
-    # Convertir objetos a diccionarios para el template
-    rows = [n.__dict__ for n in novedades_db]
-    
-    return render_template("ver.html", rows=rows, total=len(rows))
-
-
-# REEMPLAZAR la función descargar() completa por esta:
-@app.route("/descargar", methods=["GET"])
-def descargar():
-    """Descarga las novedades en formato XLSX profesional"""
-    
-    # Obtener todas las novedades
-    novedades_db = get_all_novedades()
-    
-    # Validar que hay datos
-    if not novedades_db:
-        flash("No hay datos para descargar.", "warning")
-        return redirect(url_for("ver"))
-    
-    # -------------------------------------------------------------------------
-    # PREPARAR DATOS
-    # -------------------------------------------------------------------------
-    def format_date(date_str):
-        """Convierte fechas de YYYY-MM-DD a DD/MM/YYYY"""
-        if not date_str:
-            return ""
-        try:
-            if len(date_str) == 10 and date_str[4] == '-':
-                parts = date_str.split('-')
-                return f"{parts[2]}/{parts[1]}/{parts[0]}"
-            return date_str
-        except:
-            return date_str
-    
-    def format_number(num_value):
-        """Convierte números con punto decimal a coma"""
-        if num_value is None or num_value == 0 or num_value == 0.0:
-            return ""
-        return str(num_value).replace('.', ',')
-    
-    def format_timestamp(timestamp_str):
-        """Extrae solo la fecha del timestamp"""
-        if not timestamp_str:
-            return ""
-        try:
-            date_part = timestamp_str.split('T')[0] if 'T' in timestamp_str else timestamp_str.split(' ')[0]
-            return format_date(date_part)
-        except:
-            return timestamp_str
-    
-    # -------------------------------------------------------------------------
-    # CREAR ESTRUCTURA DE DATOS
-    # -------------------------------------------------------------------------
-    rows_data = []
-    for novedad in novedades_db:
-        row = {
-            'Fecha Carga': format_timestamp(novedad.timestamp),
-            'Legajo': novedad.legajo or "",
-            'Nombre y Apellido': novedad.nombre or "",
-            'Tipo Empleado': novedad.tipo_empleado or "",
-            'Tipo Novedad': novedad.tipo_novedad or "",
-            'Fecha Nacimiento': format_date(novedad.fecha_nacimiento),
-            'DNI': novedad.dni or "",
-            'CUIL': novedad.cuil or "",
-            'CBU': novedad.cbu or "",
-            'Banco': novedad.banco or "",
-            'Domicilio': novedad.domicilio or "",
-            'Email': novedad.email or "",
-            'Obra Social': novedad.obra_social or "",
-            'Nivel': novedad.nivel or "",
-            'Fecha Alta': format_date(novedad.fecha_alta),
-            'Cargo': novedad.cargo or "",
-            'Carácter Cargo': novedad.caracter_del_cargo or "",
-            'Trabaja Otra Inst': novedad.trabaja_otra_institucion or "",
-            'Tipo Institución': novedad.tipo_institucion or "",
-            'Horas Cátedras': format_number(novedad.horas_catedras),
-            'Subvencionado': novedad.subvencionado or "",
-            'Asig. Familiares': novedad.asignaciones_familiares or "",
-            'Cantidad Hijos': str(novedad.cantidad_hijos) if novedad.cantidad_hijos else "",
-            'Ya Trabaja': novedad.reemplazo_persona_ya_trabaja or "",
-            'Cargo que Cubre': novedad.reemplazo_cargo_que_cubre or "",
-            'Inicio Reemplazo': format_date(novedad.fecha_inicio_reemplazo),
-            'Fin Reemplazo': format_date(novedad.fecha_fin_reemplazo),
-            'Fecha Baja': format_date(novedad.fecha_baja),
-            'Motivo Baja': novedad.motivo_baja or "",
-            'Tipo Otro': novedad.tipo_otro or "",
-            'Cargos Actuales': novedad.cargos_actuales or "",
-            'Tipo Movimiento': novedad.tipo_movimiento or "",
-            'Subvención': novedad.subvencion or "",
-            'Código': novedad.codigo or "",
-            'Observaciones': novedad.observaciones or ""
-        }
-        rows_data.append(row)
-    
-    # -------------------------------------------------------------------------
-    # CREAR ARCHIVO EXCEL
-    # -------------------------------------------------------------------------
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Novedades"
-    
-    # Headers (nombres de columnas)
-    headers = list(rows_data[0].keys())
-    
-    # Estilo para encabezados
-    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF", size=11)
-    header_alignment = Alignment(horizontal='center', vertical='center')
-    
-    # Escribir encabezados con estilo
-    for col_num, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col_num, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
-    
-    # Escribir datos
-    for row_num, row_data in enumerate(rows_data, 2):
-        for col_num, header in enumerate(headers, 1):
-            value = row_data[header]
-            cell = ws.cell(row=row_num, column=col_num, value=value)
-            cell.alignment = Alignment(vertical='center')
-    
-    # Ajustar ancho de columnas automáticamente
-    for column in ws.columns:
-        max_length = 0
-        column_letter = get_column_letter(column[0].column)
-        
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        
-        adjusted_width = min(max_length + 2, 50)
-        ws.column_dimensions[column_letter].width = adjusted_width
-    
-    # Congelar primera fila (encabezados)
-    ws.freeze_panes = 'A2'
-    
-    # -------------------------------------------------------------------------
-    # GUARDAR Y ENVIAR ARCHIVO
-    # -------------------------------------------------------------------------
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
-    
-    # Nombre del archivo con fecha actual
-    fecha_actual = datetime.now().strftime("%Y-%m-%d")
-    filename = f"novedades_{fecha_actual}.xlsx"
-    
-    # Crear respuesta
-    response = make_response(output.getvalue())
-    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
-    response.headers["Content-Type"] = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    
-    return response
-
-
-# ============================================================================
-# INICIALIZACIÓN
-# ============================================================================
-@app.before_request
-def create_tables():
-    """Crea las tablas en la base de datos si no existen"""
-    try:
-        with app.app_context():
-            db.create_all()
-            print("✓ Tablas de la base de datos verificadas")
-    except Exception as e:
-        print(f"✗ Error al crear tablas: {e}")
-
-
-if __name__ == "__main__":
-    with app.app_context():
-        db.create_all()
-    app.run(debug=True)
\ No newline at end of file
+import os
+import json
+from datetime import datetime
+import click
+from flask import Flask, render_template, request, redirect, url_for, flash, send_file, Response, stream_with_context, jsonify, session, current_app
+from flask.cli import AppGroup
+from werkzeug.local import LocalProxy
+from sqlalchemy import func, or_, and_, select, insert, cast, String
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+import shutil
+import uuid
+import tempfile
+from time import perf_counter
+
+from modelos import db, Novedad, ResumenNovedad, ClaveIdempotencia
+from motor import configurar_engine, registrar_eventos
+from compresion import registrar_compresion
+from metricas import (
+    instrumentar, registro as registro_metricas, FILAS_LEIDAS, contar_filas, observar_export, medir_stream,
+    MIMETYPE_PROMETHEUS,
+)
+from migraciones import aplicar_migraciones, estado_migraciones
+from cache import CachePeriodos, crear_backend
+from artefactos import ArtefactosExcel, ESPERA_RECONSTRUCCION
+from trabajos import ColaTrabajos, ColaLlena, TERMINADO
+from busqueda import buscar_novedades
+from particiones import (
+    ESQUEMA_ARCHIVO, archivar_periodos, asegurar_particiones, hay_archivo, opciones_lectura,
+    periodo_archivado, periodos_archivados, registrar_archivo, registrar_particiones,
+)
+from resumen import (
+    sumar_novedad, aplicar_deltas, reconstruir_resumen, tablero_periodo, TIPOS_TABLERO,
+)
+from periodos import Periodo, clave_de_fecha
+from campos import CAMPOS_EDITABLES, COLUMNAS, VISTAS, VISTA_POR_DEFECTO, CAMPOS_POR_VISTA
+from validaciones import (
+    validar_novedad, solo_digitos, huella_novedad, CAMPOS_IDENTIFICADORES, CAMPOS_HUELLA,
+)
+from importar import leer_archivo, importar_novedades, TAMANO_LOTE
+from exportar import (
+    escribir_xlsx, generar_csv, escribir_parquet, ANCHOS_FIJOS,
+    MIMETYPE_XLSX, MIMETYPE_CSV, MIMETYPE_PARQUET,
+)
+
+# ============================================================================
+# CONFIGURACIÓN DE LA APLICACIÓN
+# ============================================================================
+def crear_app():
+    """
+    Crea y configura la aplicación (gunicorn: "app:crear_app()").
+
+    No abre conexiones ni arranca threads: con `gunicorn --preload` el master
+    la crea una vez y los workers la heredan al hacer fork (ver gunicorn.conf.py).
+    """
+    app = Flask(__name__)
+
+    # Clave secreta para sesiones y mensajes flash (CRÍTICO: usar variable de entorno en producción)
+    app.secret_key = os.environ.get('SECRET_KEY', 'mi-clave-super-larga-y-compleja-2024')
+
+    # Configuración de base de datos
+    # En Render usa PostgreSQL (DATABASE_URL), localmente usa SQLite
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+        "DATABASE_URL",
+        "sqlite:///novedades.db"
+    )
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+    # Pool, pre-ping y timeouts (PostgreSQL) / WAL y busy timeout (SQLite)
+    configurar_engine(app)
+
+    # Inicializar SQLAlchemy
+    db.init_app(app)
+    registrar_eventos(app, db)
+
+    # Períodos cerrados archivados en un archivo aparte (solo SQLite) y
+    # particiones de cada período nuevo (solo PostgreSQL), ver particiones.py
+    registrar_archivo(app, db)
+    registrar_particiones(app, db)
+
+    # Latencia por ruta, SQL por petición, consultas lentas y exports (/metrics)
+    instrumentar(app, db)
+
+    # gzip/brotli para HTML y JSON (COMPRESION_DESACTIVADA=1 si ya comprime el proxy)
+    registrar_compresion(app)
+
+    # Cache de resultados por período (CACHE_URL=redis://... para compartirlo
+    # entre workers; CACHE_DESACTIVADO=1 para apagarlo)
+    app.extensions["cache_periodos"] = CachePeriodos(
+        db.session,
+        crear_backend(os.environ.get("CACHE_URL")),
+        activo=not os.environ.get("CACHE_DESACTIVADO"),
+    )
+
+    # Excel precalculado por período (se reconstruye en segundo plano unos
+    # segundos después de los cambios, ver artefactos.py)
+    app.config['EXPORTS_DIR'] = os.environ.get("EXPORTS_DIR", os.path.join(app.instance_path, "exports"))
+    app.extensions["artefactos"] = ArtefactosExcel(
+        app.config['EXPORTS_DIR'],
+        espera=float(os.environ.get("EXCEL_ESPERA_SEGUNDOS", ESPERA_RECONSTRUCCION)),
+    )
+
+    # Exports en segundo plano (POST /jobs y GET /jobs/<id>), ver trabajos.py
+    cola = ColaTrabajos(app, db, os.path.join(app.config['EXPORTS_DIR'], "trabajos"))
+    cola.registrar("export", exportar_periodo)
+    app.extensions["cola_trabajos"] = cola
+
+    for regla, vista, opciones in RUTAS:
+        app.add_url_rule(regla, view_func=vista, **opciones)
+    for comando in comandos.commands.values():
+        app.cli.add_command(comando)
+    return app
+
+
+# `flask` (sin --app) busca una función con este nombre
+create_app = crear_app
+
+
+def __getattr__(nombre):
+    """
+    Compatibilidad con `gunicorn app:app` y `from app import app`: la
+    aplicación se crea la primera vez que se pide y queda en el módulo.
+    """
+    if nombre == "app":
+        globals()["app"] = aplicacion = crear_app()
+        return aplicacion
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
+
+# Servicios de la aplicación activa (crear_app los guarda en app.extensions)
+cache_periodos = LocalProxy(lambda: current_app.extensions["cache_periodos"])
+artefactos = LocalProxy(lambda: current_app.extensions["artefactos"])
+cola_trabajos = LocalProxy(lambda: current_app.extensions["cola_trabajos"])
+
+# Rutas que crear_app registra en la aplicación. Cumple el papel de un
+# Blueprint, pero sin prefijo en los endpoints: url_for("ver") en las
+# plantillas y la etiqueta de ruta de las métricas siguen iguales
+RUTAS = []
+
+
+def ruta(regla, **opciones):
+    """Decorador que agrega una vista a RUTAS (mismos argumentos que app.route)"""
+    def registrar(vista):
+        RUTAS.append((regla, vista, opciones))
+        return vista
+    return registrar
+
+
+# Comandos de `flask` (crear_app los agrega sueltos a app.cli)
+comandos = AppGroup("comandos")
+
+
+# ============================================================================
+# FUNCIONES DE BASE DE DATOS
+# ============================================================================
+# Largo máximo de una clave de idempotencia (columna VARCHAR(64))
+LARGO_CLAVE_IDEMPOTENCIA = 64
+
+
+class ClaveRepetida(Exception):
+    """Ya hay una novedad guardada con la misma clave de idempotencia"""
+
+    def __init__(self, novedad_id):
+        super().__init__(novedad_id)
+        self.novedad_id = novedad_id
+
+
+def ids_por_clave(claves):
+    """Devuelve {clave_idempotencia: id} de las claves que ya están guardadas"""
+    claves = [c for c in claves if c]
+    if not claves:
+        return {}
+    return dict(db.session.execute(
+        select(ClaveIdempotencia.clave, ClaveIdempotencia.novedad_id)
+        .where(ClaveIdempotencia.clave.in_(claves))
+    ).all())
+
+
+def registrar_claves(pares):
+    """
+    Registra las claves de idempotencia de novedades recién insertadas, en la
+    misma transacción: si otro envío ya usó la clave (en cualquier período),
+    la clave primaria de claves_idempotencia lo rechaza con IntegrityError.
+
+    Args:
+        pares: Iterable de (clave_idempotencia o None, id de la novedad)
+    """
+    filas = [{"clave": clave, "novedad_id": novedad_id} for clave, novedad_id in pares if clave]
+    if filas:
+        db.session.execute(insert(ClaveIdempotencia), filas)
+
+
+def posibles_duplicados(huellas):
+    """
+    Busca novedades ya guardadas con alguna de las huellas (índice por huella).
+
+    Returns:
+        Diccionario {huella: id de la novedad más antigua con esa huella}
+    """
+    huellas = [h for h in huellas if h]
+    if not huellas:
+        return {}
+    return dict(db.session.execute(
+        select(Novedad.huella, func.min(Novedad.id))
+        .where(Novedad.huella.in_(huellas))
+        .group_by(Novedad.huella)
+    ).all())
+
+
+def add_novedad(data: dict):
+    """
+    Guarda una nueva novedad en la base de datos.
+    
+    Args:
+        data: Diccionario con los campos de la novedad (puede traer clave_idempotencia)
+
+    Returns:
+        Id de la novedad guardada
+
+    Raises:
+        ClaveRepetida: Si ya hay una novedad con la misma clave_idempotencia
+    """
+    nueva_novedad = Novedad(**data)
+    db.session.add(nueva_novedad)
+    # Resumen del tablero en la misma transacción que la novedad
+    deltas = {}
+    sumar_novedad(deltas, clave_de_fecha(data["timestamp"]), data)
+    try:
+        db.session.flush()
+        registrar_claves([(data.get("clave_idempotencia"), nueva_novedad.id)])
+        aplicar_deltas(db.session, deltas)
+        cache_periodos.invalidar(nueva_novedad.periodo)
+        db.session.commit()
+    except IntegrityError:
+        # Dos envíos con la misma clave a la vez: claves_idempotencia deja pasar uno
+        db.session.rollback()
+        existente = ids_por_clave([data.get("clave_idempotencia")])
+        if not existente:
+            raise
+        raise ClaveRepetida(next(iter(existente.values())))
+    notificar_cambios(nueva_novedad.periodo)
+    return nueva_novedad.id
+
+
+def add_novedades(registros: list):
+    """
+    Guarda varias novedades en un solo INSERT ejecutado por lotes (executemany).
+
+    Las novedades cuya clave_idempotencia ya está guardada (o se repite dentro
+    del mismo lote) no se insertan de nuevo: se devuelve el id existente.
+
+    Args:
+        registros: Lista de diccionarios con los campos de cada novedad
+
+    Returns:
+        Lista de tuplas (id, nueva), en el mismo orden que registros; nueva es
+        False si la novedad ya estaba guardada con esa clave
+    """
+    if not registros:
+        return []
+
+    for intento in range(2):
+        # Si otro envío inserta una de las claves entre la consulta y el
+        # INSERT, claves_idempotencia lo rechaza y se vuelve a consultar
+        existentes = ids_por_clave([r.get("clave_idempotencia") for r in registros])
+        nuevos, primero_del_lote = [], {}
+        for posicion, registro in enumerate(registros):
+            clave = registro.get("clave_idempotencia")
+            if clave and (clave in existentes or clave in primero_del_lote):
+                continue
+            if clave:
+                primero_del_lote[clave] = len(nuevos)
+            nuevos.append(posicion)
+
+        try:
+            ids = list(db.session.scalars(
+                insert(Novedad).returning(Novedad.id, sort_by_parameter_order=True),
+                [registros[p] for p in nuevos],
+            )) if nuevos else []
+            registrar_claves((registros[p].get("clave_idempotencia"), i) for p, i in zip(nuevos, ids))
+            deltas = {}
+            for posicion in nuevos:
+                registro = registros[posicion]
+                sumar_novedad(deltas, clave_de_fecha(registro["timestamp"]), registro)
+            aplicar_deltas(db.session, deltas)
+            cache_periodos.invalidar(*{grupo[0] for grupo in deltas})
+            db.session.commit()
+            break
+        except IntegrityError:
+            db.session.rollback()
+            if intento:
+                raise
+
+    notificar_cambios(*{grupo[0] for grupo in deltas})
+    id_por_posicion = dict(zip(nuevos, ids))
+    resultado = []
+    for posicion, registro in enumerate(registros):
+        if posicion in id_por_posicion:
+            resultado.append((id_por_posicion[posicion], True))
+        else:
+            clave = registro["clave_idempotencia"]
+            novedad_id = existentes.get(clave) or ids[primero_del_lote[clave]]
+            resultado.append((novedad_id, False))
+    return resultado
+
+
+# Campos que definen el grupo de una novedad en el tablero (o su total de horas)
+CAMPOS_RESUMEN = {"nivel", "tipo_empleado", "tipo_novedad", "horas_catedras"}
+
+
+class ConflictoEdicion(Exception):
+    """La novedad fue modificada por otra persona desde que se abrió para editar"""
+
+
+def actualizar_novedad(novedad, datos, version=None):
+    """
+    Aplica a una novedad los campos editables que vienen en datos.
+
+    Los campos que no vienen quedan como están y el registro resultante pasa
+    por las mismas validaciones que /enviar. Solo se escriben las columnas que
+    cambiaron; si no cambió nada, no se hace commit.
+
+    Args:
+        novedad: Novedad a modificar
+        datos: Diccionario o MultiDict con los campos como texto
+        version: Versión de la novedad cuando se abrió para editar (None = no verificar)
+
+    Returns:
+        Tupla (cambios, errores): cambios es {campo: valor nuevo} (vacío si no
+        hubo cambios) y errores la lista de mensajes de validación.
+
+    Raises:
+        ConflictoEdicion: Si la versión no coincide o la fila cambió antes del UPDATE
+    """
+    if version is not None and version != novedad.version:
+        raise ConflictoEdicion()
+
+    completos = {campo: getattr(novedad, campo) for campo in CAMPOS_EDITABLES}
+    completos.update({campo: datos.get(campo) for campo in CAMPOS_EDITABLES if campo in datos})
+    registro, errores = validar_novedad(completos)
+    if errores:
+        return {}, errores
+
+    # None, "" y 0 cuentan como el mismo valor vacío
+    cambios = {
+        campo: valor for campo, valor in registro.items()
+        if (valor or None) != (getattr(novedad, campo) or None)
+    }
+    if not cambios:
+        return {}, []
+
+    # Si cambió algo que agrupa el tablero, se mueve la novedad de grupo
+    deltas = {}
+    if cambios.keys() & CAMPOS_RESUMEN:
+        sumar_novedad(deltas, novedad.periodo, novedad, signo=-1)
+    for campo, valor in cambios.items():
+        setattr(novedad, campo, valor)
+    if cambios.keys() & CAMPOS_HUELLA:
+        novedad.huella = huella_novedad(novedad, novedad.periodo)
+    if deltas:
+        sumar_novedad(deltas, novedad.periodo, novedad)
+    try:
+        # El UPDATE lleva "WHERE version = <leída>" (version_id_col del modelo);
+        # el upsert del resumen hace flush antes, así que el conflicto puede
+        # saltar en cualquiera de los dos pasos
+        aplicar_deltas(db.session, deltas)
+        cache_periodos.invalidar(novedad.periodo)
+        db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+        raise ConflictoEdicion()
+
+    notificar_cambios(novedad.periodo)
+    return cambios, []
+
+
+def notificar_cambios(*periodos):
+    """
+    Avisa que cambiaron datos de los períodos (llamar después del commit,
+    que ya incrementó su versión con cache_periodos.invalidar): agenda la
+    reconstrucción de su Excel precalculado, que junta los cambios de los
+    próximos segundos (ver ArtefactosExcel.programar). Solo se reconstruye
+    el período actual y los que ya tienen un Excel en disco.
+
+    Args:
+        periodos: Claves YYYY-MM de los períodos modificados
+    """
+    # El Excel se arma en otro thread, con su propio contexto de esta aplicación
+    app = current_app._get_current_object()
+    actual = Periodo.de_fecha().clave
+    for clave in periodos:
+        if clave == actual or artefactos.existe_alguno(clave):
+            artefactos.programar(
+                clave, lambda clave=clave: reconstruir_excel(app, Periodo.desde_clave(clave))
+            )
+
+
+def es_periodo_archivado(clave):
+    """True si el período está archivado: sus novedades se leen del archivo y no se cargan nuevas"""
+    return periodo_archivado(db.session, clave)
+
+
+# Filtros exactos que acepta /ver (nombre del parámetro = columna)
+FILTROS_VER = ("tipo_novedad", "tipo_empleado", "nivel", "legajo", "dni")
+
+# Columnas donde busca el texto libre de /ver
+COLUMNAS_BUSQUEDA = ("nombre", "legajo", "dni", "cuil", "cargo", "cargos_actuales", "observaciones")
+
+# Filas por página en /ver
+TAMANO_PAGINA = 50
+
+
+def condicion_filtro(columna, valor):
+    """
+    Condición de igualdad para un filtro. Legajo, DNI y CUIL se comparan por
+    su versión normalizada (solo dígitos), que está indexada.
+    """
+    digitos = solo_digitos(valor)
+    if columna in CAMPOS_IDENTIFICADORES and digitos:
+        return getattr(Novedad, f"{columna}_norm") == digitos
+    return getattr(Novedad, columna) == valor
+
+
+def filtrar_novedades(query, periodo, filtros=None, busqueda=""):
+    """
+    Aplica a una consulta el período, los filtros exactos y la búsqueda libre.
+
+    Args:
+        query: Consulta sobre Novedad (Query del ORM o select de Core)
+        periodo: Periodo a consultar
+        filtros: Diccionario {columna: valor} (solo columnas de FILTROS_VER)
+        busqueda: Texto a buscar (sin distinguir mayúsculas) en COLUMNAS_BUSQUEDA
+    """
+    query = query.filter(Novedad.periodo == periodo.clave)
+
+    for columna, valor in (filtros or {}).items():
+        if columna in FILTROS_VER and valor:
+            query = query.filter(condicion_filtro(columna, valor))
+
+    if busqueda:
+        # % y _ del texto se buscan literalmente, no como comodines de LIKE
+        literal = busqueda.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        patron = f"%{literal}%"
+        query = query.filter(or_(*(
+            getattr(Novedad, columna).ilike(patron, escape="\\") for columna in COLUMNAS_BUSQUEDA
+        )))
+
+    return query
+
+
+def codificar_cursor(timestamp, novedad_id):
+    """Arma el cursor de paginación (timestamp e id de la última fila mostrada)"""
+    return f"{timestamp.isoformat()}_{novedad_id}"
+
+
+def decodificar_cursor(cursor):
+    """Devuelve (timestamp, id) de un cursor, o None si es inválido"""
+    try:
+        timestamp_str, id_str = cursor.rsplit("_", 1)
+        return datetime.fromisoformat(timestamp_str), int(id_str)
+    except (AttributeError, ValueError):
+        return None
+
+
+def _clave_consulta(*partes):
+    """Texto estable que identifica una consulta dentro del cache del período"""
+    return repr(partes)
+
+
+# Columnas que encabezan cada fila de get_pagina_novedades(columnas=...):
+# id y timestamp para el cursor, legajo_norm para el link al historial
+COLUMNAS_FIJAS_FILA = ("id", "timestamp", "legajo_norm")
+
+
+def get_pagina_novedades(filtros=None, busqueda="", cursor=None, limite=TAMANO_PAGINA, periodo=None,
+                         columnas=None):
+    """
+    Obtiene una página de novedades de un período con paginación por keyset.
+
+    Ordena por (timestamp, id) descendente y continúa después del cursor, así
+    que cada página es un recorrido acotado del índice sin OFFSET.
+
+    Solo se cachean las páginas con columnas (las tuplas de /ver): las de
+    filas completas (API, hasta MAX_LIMITE_API diccionarios) ocuparían
+    demasiada memoria en el LRU de cada worker, que cuenta entradas y no bytes.
+
+    Args:
+        columnas: Leer solo estas columnas (nombres de CAMPOS). Por defecto
+            se leen todas y cada novedad se devuelve como diccionario.
+
+    Returns:
+        Tupla (novedades, cursor_siguiente). Sin columnas, las novedades son
+        diccionarios con todas las columnas; con columnas, son tuplas
+        (*COLUMNAS_FIJAS_FILA, *columnas), sin armar un diccionario por fila.
+        cursor_siguiente es None en la última página.
+    """
+    periodo = periodo or Periodo.de_fecha()
+    filtros = {k: v for k, v in (filtros or {}).items() if v}
+    tabla = Novedad.__table__
+
+    def consultar():
+        if columnas is None:
+            consulta = select(tabla)
+        else:
+            consulta = select(*(tabla.c[c] for c in (*COLUMNAS_FIJAS_FILA, *columnas)))
+        consulta = filtrar_novedades(consulta, periodo, filtros, busqueda)
+
+        posicion = decodificar_cursor(cursor) if cursor else None
+        if posicion:
+            timestamp, novedad_id = posicion
+            consulta = consulta.where(or_(
+                Novedad.timestamp < timestamp,
+                and_(Novedad.timestamp == timestamp, Novedad.id < novedad_id),
+            ))
+
+        # Se pide una fila de más para saber si hay página siguiente
+        filas = db.session.execute(
+            consulta.order_by(Novedad.timestamp.desc(), Novedad.id.desc()).limit(limite + 1),
+            execution_options=opciones_lectura(db.session, periodo.clave),
+        ).all()
+        FILAS_LEIDAS.observar(len(filas), consulta="pagina")
+        siguiente = None
+        if len(filas) > limite:
+            filas = filas[:limite]
+            siguiente = codificar_cursor(filas[-1].timestamp, filas[-1].id)
+
+        if columnas is None:
+            return [dict(fila._mapping) for fila in filas], siguiente
+        return [tuple(fila) for fila in filas], siguiente
+
+    if columnas is None:
+        return consultar()
+    clave = _clave_consulta("pagina", sorted(filtros.items()), busqueda, cursor, limite, columnas)
+    return cache_periodos.obtener(periodo.clave, clave, consultar)
+
+
+def contar_novedades(filtros=None, busqueda="", periodo=None):
+    """Cuenta las novedades de un período (por defecto, el actual) que cumplen los filtros"""
+    periodo = periodo or Periodo.de_fecha()
+    filtros = {k: v for k, v in (filtros or {}).items() if v}
+
+    def consultar():
+        query = filtrar_novedades(db.session.query(func.count(Novedad.id)), periodo, filtros, busqueda)
+        return query.execution_options(**opciones_lectura(db.session, periodo.clave)).scalar()
+
+    clave = _clave_consulta("total", sorted(filtros.items()), busqueda)
+    return cache_periodos.obtener(periodo.clave, clave, consultar)
+
+
+def resumen_periodos(periodo=None):
+    """
+    Cantidad de novedades por período y tipo de novedad, sumando el resumen
+    precalculado (una fila por grupo, sin recorrer las novedades).
+
+    Args:
+        periodo: Limitar a un Periodo (por defecto, todos)
+
+    Returns:
+        Diccionario {clave de período: {tipo_novedad: cantidad}}, del más reciente al más viejo
+    """
+    consulta = (
+        select(ResumenNovedad.periodo, ResumenNovedad.tipo_novedad, func.sum(ResumenNovedad.cantidad))
+        .group_by(ResumenNovedad.periodo, ResumenNovedad.tipo_novedad)
+        .having(func.sum(ResumenNovedad.cantidad) > 0)
+        .order_by(ResumenNovedad.periodo.desc(), ResumenNovedad.tipo_novedad)
+    )
+    if periodo:
+        consulta = consulta.where(ResumenNovedad.periodo == periodo.clave)
+
+    resumen = {}
+    for clave, tipo_novedad, cantidad in db.session.execute(consulta):
+        resumen.setdefault(clave, {})[tipo_novedad] = cantidad
+    return resumen
+
+
+def historial_empleado(campo, valor):
+    """
+    Todas las novedades de una persona, en todos los períodos.
+
+    Busca por igualdad en la columna normalizada (<campo>_norm), así que usa
+    su índice sin importar el tamaño de la tabla.
+
+    Args:
+        campo: "legajo", "dni" o "cuil"
+        valor: Identificador tal como lo escribió el usuario (se normaliza)
+
+    Returns:
+        Lista de diccionarios ordenados por fecha de carga descendente
+    """
+    digitos = solo_digitos(valor)
+    if campo not in CAMPOS_IDENTIFICADORES or not digitos:
+        return []
+
+    consulta = (
+        select(Novedad.__table__)
+        .where(getattr(Novedad, f"{campo}_norm") == digitos)
+        .order_by(Novedad.timestamp.desc(), Novedad.id.desc())
+    )
+    novedades = [dict(fila._mapping) for fila in db.session.execute(consulta)]
+    if hay_archivo(db.session):
+        # Los períodos archivados también son parte del historial
+        archivadas = db.session.execute(
+            consulta, execution_options={"schema_translate_map": {None: ESQUEMA_ARCHIVO}}
+        )
+        novedades.extend(dict(fila._mapping) for fila in archivadas)
+        novedades.sort(key=lambda n: (n["timestamp"], n["id"]), reverse=True)
+    return novedades
+
+
+def iter_filas_periodo(columnas, lote=1000, periodo=None):
+    """
+    Recorre las filas de un período sin cargarlas todas en memoria.
+
+    Args:
+        columnas: Nombres de columnas de Novedad a seleccionar (en ese orden)
+        lote: Filas que se traen por vez (cursor del lado del servidor en PostgreSQL)
+        periodo: Periodo a recorrer (por defecto, el actual)
+
+    Returns:
+        Iterable de tuplas, ordenado por fecha descendente (al terminar de
+        recorrerlo se registra la cantidad de filas en /metrics)
+    """
+    periodo = periodo or Periodo.de_fecha()
+    tabla = Novedad.__table__
+    consulta = (
+        select(*(tabla.c[columna] for columna in columnas))
+        .where(tabla.c.periodo == periodo.clave)
+        .order_by(tabla.c.timestamp.desc(), tabla.c.id.desc())
+    )
+    return contar_filas("export", db.session.execute(
+        consulta, execution_options={"yield_per": lote, **opciones_lectura(db.session, periodo.clave)}
+    ))
+
+
+def largos_columnas(columnas, periodo=None):
+    """
+    Calcula en una sola consulta el largo máximo del contenido de cada columna
+    del período (se usa para el ancho de columnas del Excel).
+    """
+    periodo = periodo or Periodo.de_fecha()
+    tabla = Novedad.__table__
+    medidas = [c for c in columnas if c not in ANCHOS_FIJOS]
+
+    def consultar():
+        consulta = (
+            select(*(func.max(func.length(cast(tabla.c[c], String))) for c in medidas))
+            .where(tabla.c.periodo == periodo.clave)
+        )
+        opciones = opciones_lectura(db.session, periodo.clave)
+        largos = dict(zip(medidas, db.session.execute(consulta, execution_options=opciones).one()))
+        largos.update(ANCHOS_FIJOS)
+        return largos
+
+    return cache_periodos.obtener(periodo.clave, _clave_consulta("largos", columnas), consultar)
+
+
+def construir_excel_periodo(periodo, destino):
+    """Escribe el Excel completo del período en destino"""
+    inicio = perf_counter()
+    escribir_xlsx(
+        iter_filas_periodo(COLUMNAS, periodo=periodo), destino,
+        largos_columnas(COLUMNAS, periodo=periodo),
+    )
+    observar_export("xlsx", perf_counter() - inicio, os.path.getsize(destino))
+
+
+def reconstruir_excel(app, periodo):
+    """Reconstruye en segundo plano el Excel precalculado del período"""
+    with app.app_context():
+        try:
+            version = cache_periodos.version(periodo.clave)
+            artefactos.obtener(
+                periodo.clave, version, lambda destino: construir_excel_periodo(periodo, destino)
+            )
+        except Exception:
+            app.logger.exception("Error al reconstruir el Excel del período %s", periodo)
+
+
+def row_to_dict(obj):
+    """Convierte un objeto SQLAlchemy en un diccionario limpio"""
+    return {c.name: getattr(obj, c.name) for c in obj.__table__.columns}
+
+
+def novedad_json(novedad):
+    """Copia de una novedad (diccionario) lista para jsonify, con el timestamp en ISO 8601"""
+    return dict(novedad, timestamp=novedad["timestamp"].isoformat())
+
+
+
+# ============================================================================
+# RUTAS DE LA APLICACIÓN
+# ============================================================================
+@ruta("/", methods=["GET"])
+def index():
+    """Página principal con el formulario de carga o edición"""
+    #return render_template("index.html")
+    edit_id = request.args.get("edit_id")
+
+    if edit_id:
+        #Buscar registro en la BD
+        novedad = Novedad.query.get(int(edit_id))
+
+        if not novedad:
+            flash("No se encontró la novedad para editar.", "danger")
+            return render_template("index.html", edit_mode=False)
+        
+        flash("Editando novedad existente", "info")
+        return render_template("index.html", edit_mode=True, data=row_to_dict(novedad))
+    #Modo normal (alta)
+    return render_template("index.html", edit_mode=False, data={"clave_idempotencia": uuid.uuid4().hex})
+    
+
+
+
+@ruta("/enviar", methods=["POST"])
+def enviar():
+    """Procesa y valida el formulario de novedades"""
+    
+    # -------------------------------------------------------------------------
+    # 1. OBTENER Y VALIDAR DATOS DEL FORMULARIO
+    # -------------------------------------------------------------------------
+    # Clave única de cada formulario abierto: un doble clic o un reenvío
+    # después de una respuesta lenta llegan con la misma
+    clave = request.form.get("clave_idempotencia", "").strip()[:LARGO_CLAVE_IDEMPOTENCIA] or None
+    if clave and ids_por_clave([clave]):
+        flash("Esta novedad ya se había registrado; no se volvió a guardar.", "info")
+        return redirect(url_for("ver"))
+
+    registro, errores = validar_novedad(request.form)
+
+    # Si hay errores, mostrarlos y volver al formulario
+    if errores:
+        for e in errores:
+            flash(e, "danger")
+        return render_template("index.html", edit_mode=False, data=request.form.to_dict())
+
+    # -------------------------------------------------------------------------
+    # 2. GUARDAR
+    # -------------------------------------------------------------------------
+    registro["timestamp"] = datetime.now().replace(microsecond=0)
+    registro["clave_idempotencia"] = clave
+    duplicado = posibles_duplicados([huella_novedad(registro, clave_de_fecha(registro["timestamp"]))])
+
+    try:
+        add_novedad(registro)
+    except ClaveRepetida:
+        flash("Esta novedad ya se había registrado; no se volvió a guardar.", "info")
+        return redirect(url_for("ver"))
+
+    flash("¡Novedad registrada correctamente!", "success")
+    if duplicado:
+        flash(
+            f"Posible duplicado: la novedad N.º {next(iter(duplicado.values()))} es de la misma "
+            f"persona, tipo y fecha en este período. Revisala antes de exportar.",
+            "warning",
+        )
+    return redirect(url_for("ver"))
+
+
+@ruta("/actualizar", methods=["POST"])
+def actualizar():
+    """Actualiza los campos editables de una novedad existente"""
+    id_str = request.form.get("id")
+    if not id_str:
+        flash("Falta el ID de la novedad a editar.", "danger")
+        return redirect(url_for("ver"))
+
+    novedad = Novedad.query.get(int(id_str))
+    if not novedad:
+        flash("No se encontró la novedad a editar.", "danger")
+        return redirect(url_for("ver"))
+
+    version_str = (request.form.get("version") or "").strip()
+    try:
+        cambios, errores = actualizar_novedad(
+            novedad, request.form, int(version_str) if version_str.isdigit() else None
+        )
+    except ConflictoEdicion:
+        flash("Otra persona modificó esta novedad mientras la editabas. "
+              "Revisá los datos actuales y volvé a guardar.", "warning")
+        return redirect(url_for("index", edit_id=novedad.id))
+
+    # Si hay errores, mostrarlos y volver al formulario con lo que se envió
+    if errores:
+        for e in errores:
+            flash(e, "danger")
+        data = row_to_dict(novedad)
+        data.update(request.form.to_dict())
+        return render_template("index.html", edit_mode=True, data=data)
+
+    if cambios:
+        flash("¡Novedad actualizada!", "success")
+    else:
+        flash("No había cambios para guardar.", "info")
+    return redirect(url_for("ver", periodo=novedad.periodo))
+
+
+def periodo_solicitado():
+    """
+    Período pedido en ?periodo=YYYY-MM (por defecto, el actual).
+
+    Raises:
+        ValueError: Si el parámetro no tiene el formato YYYY-MM
+    """
+    clave = (request.args.get("periodo") or "").strip()
+    return Periodo.desde_clave(clave) if clave else Periodo.de_fecha()
+
+
+@ruta("/ver", methods=["GET"])
+def ver():
+    """Muestra una página de las novedades de un período (por defecto, el actual), con filtros y búsqueda"""
+    try:
+        periodo = periodo_solicitado()
+    except ValueError as e:
+        flash(str(e), "danger")
+        return redirect(url_for("ver"))
+
+    filtros = {campo: (request.args.get(campo) or "").strip() for campo in FILTROS_VER}
+    busqueda = (request.args.get("q") or "").strip()
+    cursor = request.args.get("despues")
+
+    # Vista (conjunto de columnas): la elegida queda guardada en la sesión
+    vista = request.args.get("vista")
+    if vista in VISTAS:
+        session["vista_ver"] = vista
+    else:
+        vista = session.get("vista_ver")
+        if vista not in VISTAS:
+            vista = VISTA_POR_DEFECTO
+    campos = CAMPOS_POR_VISTA[vista]
+
+    # Solo se leen las columnas de la vista, como tuplas
+    rows, cursor_siguiente = get_pagina_novedades(
+        filtros, busqueda, cursor, periodo=periodo, columnas=VISTAS[vista]
+    )
+
+    # Parámetros activos para armar los links de paginación
+    parametros = {k: v for k, v in filtros.items() if v}
+    if busqueda:
+        parametros["q"] = busqueda
+    if request.args.get("periodo"):
+        parametros["periodo"] = periodo.clave
+    
+    return render_template(
+        "ver.html",
+        rows=rows,
+        campos=campos,
+        # Las columnas de la vista empiezan después de id, timestamp y legajo_norm
+        desplazamiento=len(COLUMNAS_FIJAS_FILA),
+        vistas=VISTAS,
+        vista=vista,
+        total=contar_novedades(filtros, busqueda, periodo=periodo),
+        filtros=filtros,
+        busqueda=busqueda,
+        parametros=parametros,
+        periodo=periodo,
+        es_periodo_actual=periodo == Periodo.de_fecha(),
+        archivado=periodo_archivado(db.session, periodo.clave),
+        es_primera_pagina=not cursor,
+        cursor_siguiente=cursor_siguiente,
+    )
+
+
+@ruta("/resumen", methods=["GET"])
+def resumen():
+    """Cantidad de novedades por período y tipo de novedad (JSON). Acepta ?periodo=YYYY-MM."""
+    clave = (request.args.get("periodo") or "").strip()
+    try:
+        periodo = Periodo.desde_clave(clave) if clave else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify(resumen_periodos(periodo))
+
+
+@ruta("/dashboard", methods=["GET"])
+def dashboard():
+    """
+    Tablero del período: altas, bajas, reemplazos y otros por nivel y tipo de
+    empleado, con el total de horas cátedra. Acepta ?periodo=YYYY-MM y
+    ?format=json.
+    """
+    try:
+        periodo = periodo_solicitado()
+    except ValueError as e:
+        if request.args.get("format") == "json":
+            return jsonify({"error": str(e)}), 400
+        flash(str(e), "danger")
+        return redirect(url_for("dashboard"))
+
+    tablero = tablero_periodo(db.session, periodo.clave)
+    if request.args.get("format") == "json":
+        return jsonify(dict(tablero, periodo=periodo.clave))
+
+    return render_template(
+        "dashboard.html",
+        tablero=tablero,
+        tipos=TIPOS_TABLERO,
+        periodo=periodo,
+        es_periodo_actual=periodo == Periodo.de_fecha(),
+    )
+
+
+@ruta("/empleado", methods=["GET"])
+@ruta("/empleado/<legajo>", methods=["GET"])
+def empleado(legajo=None):
+    """
+    Historial de novedades de una persona en todos los períodos.
+
+    Se busca por legajo (en la ruta) o por ?legajo= / ?dni= / ?cuil=. Con
+    ?format=json devuelve las novedades en JSON.
+    """
+    campo, valor = "legajo", legajo
+    if not legajo:
+        campo = next((c for c in CAMPOS_IDENTIFICADORES if request.args.get(c)), "legajo")
+        valor = request.args.get(campo)
+
+    novedades = historial_empleado(campo, valor)
+
+    if (request.args.get("format") or "").lower() == "json":
+        return jsonify({
+            "campo": campo,
+            "valor": solo_digitos(valor),
+            "total": len(novedades),
+            "novedades": [novedad_json(n) for n in novedades],
+        })
+
+    # Las novedades de períodos archivados son de solo lectura: sin "Editar"
+    return render_template(
+        "empleado.html", campo=campo, valor=valor or "", novedades=novedades,
+        archivados=periodos_archivados(db.session),
+    )
+
+
+@ruta("/buscar", methods=["GET"])
+def buscar():
+    """
+    Búsqueda de texto completo en todos los períodos (?q=), ordenada por
+    relevancia y paginada (?pagina=, desde 1). Acepta ?periodo=YYYY-MM para
+    limitarla a un período y ?format=json.
+    """
+    como_json = (request.args.get("format") or "").lower() == "json"
+    texto = (request.args.get("q") or "").strip()
+    pagina_str = (request.args.get("pagina") or "1").strip()
+    pagina = int(pagina_str) if pagina_str.isdigit() and int(pagina_str) > 0 else 1
+
+    clave = (request.args.get("periodo") or "").strip()
+    try:
+        periodo = Periodo.desde_clave(clave).clave if clave else None
+    except ValueError as e:
+        if como_json:
+            return jsonify({"error": str(e)}), 400
+        flash(str(e), "danger")
+        periodo = None
+
+    # Se pide un resultado de más para saber si hay página siguiente
+    resultados = buscar_novedades(
+        db.session, texto, TAMANO_PAGINA + 1, (pagina - 1) * TAMANO_PAGINA, periodo
+    )
+    hay_siguiente = len(resultados) > TAMANO_PAGINA
+    resultados = [dict(fila._mapping) for fila in resultados[:TAMANO_PAGINA]]
+
+    if como_json:
+        return jsonify({
+            "q": texto,
+            "periodo": periodo,
+            "pagina": pagina,
+            "siguiente": pagina + 1 if hay_siguiente else None,
+            "resultados": [novedad_json(r) for r in resultados],
+        })
+
+    return render_template(
+        "buscar.html", q=texto, periodo=periodo, pagina=pagina, tamano_pagina=TAMANO_PAGINA,
+        hay_siguiente=hay_siguiente, resultados=resultados,
+        archivados=periodos_archivados(db.session),
+    )
+
+
+@ruta("/metrics", methods=["GET"])
+def metrics():
+    """Métricas de rendimiento del proceso en formato Prometheus"""
+    return Response(registro_metricas.exponer(), mimetype=MIMETYPE_PROMETHEUS)
+
+
+@ruta("/cache/estado", methods=["GET"])
+def cache_estado():
+    """Contadores de aciertos y fallos del cache de períodos (JSON)"""
+    return jsonify(cache_periodos.estadisticas())
+
+
+# Errores de importación que se muestran en pantalla (el resto solo se cuenta)
+MAX_ERRORES_MOSTRADOS = 200
+
+
+@ruta("/importar", methods=["GET", "POST"])
+def importar():
+    """Importa novedades desde un archivo CSV o XLSX subido"""
+    if request.method == "GET":
+        return render_template("importar.html", resultado=None)
+
+    archivo = request.files.get("archivo")
+    if not archivo or not archivo.filename:
+        flash("Seleccioná un archivo CSV o XLSX para importar.", "danger")
+        return redirect(url_for("importar"))
+
+    try:
+        filas = leer_archivo(archivo.stream, archivo.filename)
+        resultado = importar_novedades(filas, add_novedades, archivado=es_periodo_archivado)
+    except ValueError as e:
+        flash(str(e), "danger")
+        return redirect(url_for("importar"))
+
+    if resultado["insertadas"]:
+        flash(f"Se importaron {resultado['insertadas']} novedades.", "success")
+    if resultado["errores"]:
+        flash(f"{len(resultado['errores'])} filas con errores no se importaron.", "warning")
+
+    return render_template(
+        "importar.html",
+        resultado=resultado,
+        errores=resultado["errores"][:MAX_ERRORES_MOSTRADOS],
+    )
+
+
+# Formatos que acepta /descargar?format=...
+FORMATOS_DESCARGA = ("xlsx", "csv", "parquet")
+
+
+@ruta("/descargar", methods=["GET"])
+def descargar():
+    """Descarga las novedades de un período en XLSX (por defecto), CSV o Parquet.
+    Acepta ?periodo=YYYY-MM (por defecto, el período actual)."""
+    formato = (request.args.get("format") or "xlsx").lower()
+    if formato not in FORMATOS_DESCARGA:
+        flash(f"Formato de descarga no válido: {formato}", "danger")
+        return redirect(url_for("ver"))
+
+    try:
+        periodo = periodo_solicitado()
+    except ValueError as e:
+        flash(str(e), "danger")
+        return redirect(url_for("ver"))
+    
+    # Validar que hay datos
+    if not contar_novedades(periodo=periodo):
+        flash("No hay datos para descargar.", "warning")
+        return redirect(url_for("ver", periodo=request.args.get("periodo")))
+    
+    # Nombre del archivo: período pedido o, para el actual, la fecha de hoy
+    if request.args.get("periodo"):
+        filename = f"novedades_{periodo.clave}.{formato}"
+    else:
+        filename = f"novedades_{datetime.now().strftime('%Y-%m-%d')}.{formato}"
+    
+    # -------------------------------------------------------------------------
+    # CSV: se genera y envía por bloques, sin archivo intermedio
+    # -------------------------------------------------------------------------
+    if formato == "csv":
+        def contenido():
+            yield from medir_stream("csv", generar_csv(iter_filas_periodo(COLUMNAS, periodo=periodo)))
+
+        response = Response(stream_with_context(contenido()), mimetype=MIMETYPE_CSV)
+        response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+        return response
+    
+    # -------------------------------------------------------------------------
+    # XLSX: Excel precalculado del período (se construye solo si cambió)
+    # -------------------------------------------------------------------------
+    if formato == "xlsx":
+        version = cache_periodos.version(periodo.clave)
+        camino_archivo = artefactos.obtener(
+            periodo.clave, version, lambda destino: construir_excel_periodo(periodo, destino)
+        )
+
+        # Con ETag = período + versión, el navegador revalida y recibe 304 si no hubo cambios
+        response = send_file(
+            camino_archivo, mimetype=MIMETYPE_XLSX, as_attachment=True, download_name=filename,
+            etag=f"{periodo.clave}-{version}", conditional=True,
+        )
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+    
+    # -------------------------------------------------------------------------
+    # PARQUET: se escribe en un archivo temporal (no en memoria) leyendo las
+    # filas por lotes desde un cursor del servidor
+    # -------------------------------------------------------------------------
+    archivo = tempfile.TemporaryFile()
+    inicio = perf_counter()
+    try:
+        escribir_parquet(iter_filas_periodo(COLUMNAS, periodo=periodo), archivo)
+    except ImportError:
+        archivo.close()
+        flash("La descarga en Parquet no está disponible en este servidor.", "danger")
+        return redirect(url_for("ver"))
+    observar_export("parquet", perf_counter() - inicio, archivo.tell())
+    archivo.seek(0)
+    
+    # send_file envía el archivo por partes y lo cierra (y borra) al terminar
+    return send_file(archivo, mimetype=MIMETYPE_PARQUET, as_attachment=True, download_name=filename)
+
+
+# ============================================================================
+# API JSON
+# ============================================================================
+# Novedades por POST /api/novedades y filas por página en GET
+MAX_LOTE_API = 1000
+MAX_LIMITE_API = 500
+
+
+def error_api(mensaje, estado):
+    """Respuesta de error de la API: {"error": mensaje} con el código HTTP dado"""
+    return jsonify({"error": mensaje}), estado
+
+
+@ruta("/api/novedades", methods=["GET"])
+def api_listar_novedades():
+    """
+    Lista las novedades de un período con paginación por keyset.
+
+    Acepta los mismos parámetros que /ver (periodo, q, filtros y despues) más
+    limite (por defecto TAMANO_PAGINA, máximo MAX_LIMITE_API).
+    """
+    try:
+        periodo = periodo_solicitado()
+    except ValueError as e:
+        return error_api(str(e), 400)
+
+    limite_str = (request.args.get("limite") or "").strip()
+    if limite_str and not limite_str.isdigit():
+        return error_api("El parámetro 'limite' debe ser un número entero.", 400)
+    limite = min(int(limite_str or TAMANO_PAGINA), MAX_LIMITE_API) or TAMANO_PAGINA
+
+    filtros = {campo: (request.args.get(campo) or "").strip() for campo in FILTROS_VER}
+    busqueda = (request.args.get("q") or "").strip()
+    novedades, siguiente = get_pagina_novedades(
+        filtros, busqueda, request.args.get("despues"), limite, periodo=periodo
+    )
+
+    return jsonify({
+        "periodo": periodo.clave,
+        "total": contar_novedades(filtros, busqueda, periodo=periodo),
+        "novedades": [novedad_json(n) for n in novedades],
+        "siguiente": siguiente,
+    })
+
+
+@ruta("/api/novedades", methods=["POST"])
+def api_crear_novedades():
+    """
+    Carga un lote de novedades (array JSON de objetos con los campos del formulario).
+
+    Cada novedad se valida con las mismas reglas que /enviar; las válidas se
+    guardan en una sola transacción con un INSERT por lotes. La respuesta trae
+    un resultado por novedad, en el mismo orden del array:
+    {"indice", "ok", "id"} o {"indice", "ok": false, "errores"}.
+
+    Reintentos: cada objeto puede traer "clave_idempotencia", o la petición un
+    header Idempotency-Key (la clave de cada novedad es "<header>:<indice>").
+    Una novedad cuya clave ya está guardada no se inserta de nuevo: su
+    resultado trae el id existente y "repetida": true. Si se parece a una
+    novedad ya cargada (misma huella), trae "posible_duplicado_de": id.
+
+    Códigos: 201 si se guardaron todas, 200 si todas ya estaban guardadas,
+    207 si algunas tuvieron errores y 422 si no se guardó ninguna.
+    """
+    datos = request.get_json(silent=True)
+    if isinstance(datos, dict):
+        datos = [datos]
+    if not isinstance(datos, list) or not datos:
+        return error_api("Se espera un array JSON de novedades.", 400)
+    if len(datos) > MAX_LOTE_API:
+        return error_api(f"Se aceptan hasta {MAX_LOTE_API} novedades por petición.", 413)
+    clave_peticion = request.headers.get("Idempotency-Key", "").strip()
+    # Lugar para ":<indice>" dentro del largo de la columna
+    if len(clave_peticion) > LARGO_CLAVE_IDEMPOTENCIA - len(f":{MAX_LOTE_API}"):
+        return error_api("El header Idempotency-Key es demasiado largo.", 400)
+
+    timestamp = datetime.now().replace(microsecond=0)
+    periodo = clave_de_fecha(timestamp)
+    resultados, registros, indices = [], [], []
+    for indice, item in enumerate(datos):
+        if not isinstance(item, dict):
+            resultados.append({"indice": indice, "ok": False, "errores": ["Se espera un objeto JSON."]})
+            continue
+        registro, errores = validar_novedad(item)
+        clave = item.get("clave_idempotencia") or (f"{clave_peticion}:{indice}" if clave_peticion else None)
+        if clave is not None and (not isinstance(clave, str) or len(clave) > LARGO_CLAVE_IDEMPOTENCIA):
+            errores.append(f"'clave_idempotencia' debe ser un texto de hasta {LARGO_CLAVE_IDEMPOTENCIA} caracteres.")
+        if errores:
+            resultados.append({"indice": indice, "ok": False, "errores": errores})
+            continue
+        registro["timestamp"] = timestamp
+        registro["clave_idempotencia"] = clave
+        registros.append(registro)
+        indices.append(indice)
+        resultados.append(None)
+
+    huellas = [huella_novedad(registro, periodo) for registro in registros]
+    # Una sola consulta por el índice de huella (antes de insertar el lote)
+    anteriores = posibles_duplicados(huellas)
+    nuevas = 0
+    for indice, huella, (novedad_id, nueva) in zip(indices, huellas, add_novedades(registros)):
+        resultado = {"indice": indice, "ok": True, "id": novedad_id}
+        if not nueva:
+            resultado["repetida"] = True
+        else:
+            nuevas += 1
+            if huella in anteriores:
+                resultado["posible_duplicado_de"] = anteriores[huella]
+            elif huella:
+                # Las siguientes del mismo lote con esta huella se marcan contra esta
+                anteriores[huella] = novedad_id
+        resultados[indice] = resultado
+
+    if not registros:
+        estado = 422
+    elif len(registros) < len(datos):
+        estado = 207
+    elif not nuevas:
+        estado = 200
+    else:
+        estado = 201
+    return jsonify({
+        "insertadas": nuevas,
+        "repetidas": len(registros) - nuevas,
+        "con_errores": len(datos) - len(registros),
+        "resultados": resultados,
+    }), estado
+
+
+@ruta("/api/novedades/<int:novedad_id>", methods=["PATCH"])
+def api_actualizar_novedad(novedad_id):
+    """
+    Modifica los campos enviados de una novedad (objeto JSON).
+
+    Si el objeto trae "version", el cambio solo se aplica si la novedad sigue
+    en esa versión (409 si otra persona la modificó antes).
+    """
+    datos = request.get_json(silent=True)
+    if not isinstance(datos, dict):
+        return error_api("Se espera un objeto JSON con los campos a modificar.", 400)
+
+    novedad = db.session.get(Novedad, novedad_id)
+    if not novedad:
+        return error_api("No se encontró la novedad.", 404)
+
+    version = datos.get("version")
+    if version is not None and not isinstance(version, int):
+        return error_api("'version' debe ser un número entero.", 400)
+
+    try:
+        cambios, errores = actualizar_novedad(novedad, datos, version)
+    except ConflictoEdicion:
+        return error_api("La novedad fue modificada por otra persona (versión distinta).", 409)
+    if errores:
+        return jsonify({"errores": errores}), 422
+
+    return jsonify({"cambios": sorted(cambios), "novedad": novedad_json(row_to_dict(novedad))})
+
+
+# ============================================================================
+# EXPORTS EN SEGUNDO PLANO
+# ============================================================================
+MIMETYPE_POR_FORMATO = {"xlsx": MIMETYPE_XLSX, "csv": MIMETYPE_CSV, "parquet": MIMETYPE_PARQUET}
+
+
+def exportar_periodo(parametros, destino):
+    """
+    Trabajo "export": escribe el export de un período en destino (corre en
+    el pool de trabajos, fuera de la petición).
+
+    Args:
+        parametros: {"formato": "xlsx"|"csv"|"parquet", "periodo": "YYYY-MM"}
+        destino: Ruta del archivo a escribir
+
+    Returns:
+        Tupla (nombre del archivo para la descarga, mimetype)
+    """
+    formato = parametros["formato"]
+    periodo = Periodo.desde_clave(parametros["periodo"])
+
+    if formato == "xlsx":
+        # Se reutiliza el Excel precalculado del período (o se construye)
+        version = cache_periodos.version(periodo.clave)
+        camino_archivo = artefactos.obtener(
+            periodo.clave, version, lambda destino: construir_excel_periodo(periodo, destino)
+        )
+        shutil.copyfile(camino_archivo, destino)
+    elif formato == "csv":
+        with open(destino, "w", encoding="utf-8", newline="") as archivo:
+            for bloque in medir_stream("csv", generar_csv(iter_filas_periodo(COLUMNAS, periodo=periodo))):
+                archivo.write(bloque)
+    else:
+        inicio = perf_counter()
+        with open(destino, "wb") as archivo:
+            escribir_parquet(iter_filas_periodo(COLUMNAS, periodo=periodo), archivo)
+        observar_export("parquet", perf_counter() - inicio, os.path.getsize(destino))
+
+    return f"novedades_{periodo.clave}.{formato}", MIMETYPE_POR_FORMATO[formato]
+
+
+
+
+def trabajo_json(trabajo):
+    """Estado de un trabajo para la respuesta de /jobs"""
+    fecha = lambda valor: valor.isoformat() if valor else None
+    datos = {
+        "id": trabajo.id,
+        "tipo": trabajo.tipo,
+        "estado": trabajo.estado,
+        "parametros": json.loads(trabajo.parametros),
+        "creado": fecha(trabajo.creado),
+        "iniciado": fecha(trabajo.iniciado),
+        "terminado": fecha(trabajo.terminado),
+        "url": url_for("estado_trabajo", id_trabajo=trabajo.id),
+    }
+    if trabajo.estado == TERMINADO:
+        datos["tamano"] = trabajo.tamano
+        datos["descarga"] = url_for("descargar_trabajo", id_trabajo=trabajo.id)
+    if trabajo.error:
+        datos["error"] = trabajo.error
+    return datos
+
+
+@ruta("/jobs", methods=["POST"])
+def crear_trabajo():
+    """
+    Agenda el export de un período (JSON o formulario con "format" y
+    "periodo"). Responde 202 con el id del trabajo para consultar su estado.
+    """
+    datos = request.get_json(silent=True) or request.form
+    formato = (datos.get("format") or "xlsx").lower()
+    if formato not in FORMATOS_DESCARGA:
+        return error_api(f"Formato de descarga no válido: {formato}", 422)
+    try:
+        periodo = Periodo.desde_clave(datos["periodo"]) if datos.get("periodo") else Periodo.de_fecha()
+    except ValueError as e:
+        return error_api(str(e), 422)
+    if not contar_novedades(periodo=periodo):
+        return error_api("No hay datos para descargar.", 422)
+
+    try:
+        trabajo = cola_trabajos.enviar("export", {"formato": formato, "periodo": periodo.clave})
+    except ColaLlena as e:
+        respuesta, estado = error_api(str(e), 503)
+        respuesta.headers["Retry-After"] = "30"
+        return respuesta, estado
+
+    respuesta = jsonify(trabajo_json(trabajo))
+    respuesta.headers["Location"] = url_for("estado_trabajo", id_trabajo=trabajo.id)
+    return respuesta, 202
+
+
+@ruta("/jobs/<id_trabajo>", methods=["GET"])
+def estado_trabajo(id_trabajo):
+    """Estado de un trabajo (pendiente, en_curso, terminado o error)"""
+    trabajo = cola_trabajos.obtener(id_trabajo)
+    if trabajo is None:
+        return error_api("No se encontró el trabajo.", 404)
+    return jsonify(trabajo_json(trabajo))
+
+
+@ruta("/jobs/<id_trabajo>/descargar", methods=["GET"])
+def descargar_trabajo(id_trabajo):
+    """Descarga el archivo de un trabajo terminado"""
+    trabajo = cola_trabajos.obtener(id_trabajo)
+    if trabajo is None:
+        return error_api("No se encontró el trabajo.", 404)
+    if trabajo.estado != TERMINADO:
+        return error_api(f"El trabajo todavía no terminó (estado: {trabajo.estado}).", 409)
+    if not os.path.exists(trabajo.archivo):
+        return error_api("El archivo del trabajo ya no está disponible.", 410)
+    return send_file(
+        trabajo.archivo, mimetype=trabajo.mimetype, as_attachment=True,
+        download_name=trabajo.nombre_archivo,
+    )
+
+
+# ============================================================================
+# INICIALIZACIÓN
+# ============================================================================
+# El esquema se crea/migra UNA sola vez al arrancar (comando `flask migrar`
+# o hook de gunicorn en gunicorn.conf.py), nunca dentro de una petición.
+@comandos.command("migrar")
+@click.option("--estado", is_flag=True, help="Solo muestra las migraciones aplicadas y pendientes.")
+def migrar_command(estado):
+    """Aplica las migraciones pendientes del esquema de la base de datos"""
+    if estado:
+        for version, descripcion, aplicada in estado_migraciones(db.engine):
+            marca = "✓" if aplicada else "·"
+            click.echo(f"{marca} {version:03d} {descripcion}")
+        return
+
+    aplicadas = aplicar_migraciones(db.engine)
+    if aplicadas:
+        click.echo(f"✓ Migraciones aplicadas: {', '.join(str(v) for v in aplicadas)}")
+    else:
+        click.echo("✓ El esquema ya está actualizado")
+
+
+@comandos.command("importar")
+@click.argument("archivo", type=click.Path(exists=True, dir_okay=False))
+@click.option("--lote", default=TAMANO_LOTE, show_default=True, help="Filas por INSERT.")
+def importar_command(archivo, lote):
+    """Importa novedades desde un archivo CSV o XLSX"""
+    if db.engine.dialect.name == "postgresql":
+        # El comando puede correr en un período que todavía no tiene partición
+        with db.engine.begin() as conn:
+            asegurar_particiones(conn)
+
+    with open(archivo, "rb") as f:
+        try:
+            resultado = importar_novedades(
+                leer_archivo(f, archivo), add_novedades, lote, archivado=es_periodo_archivado
+            )
+        except ValueError as e:
+            raise click.ClickException(str(e))
+
+    for error in resultado["errores"]:
+        click.echo(f"✗ Fila {error['fila']}: {' '.join(error['errores'])}", err=True)
+    click.echo(f"✓ {resultado['insertadas']} de {resultado['procesadas']} filas importadas")
+
+
+@comandos.command("reconstruir-resumen")
+@click.option("--periodo", help="Recalcular solo este período (YYYY-MM).")
+def reconstruir_resumen_command(periodo):
+    """Recalcula el resumen del tablero desde la tabla de novedades"""
+    if periodo:
+        try:
+            periodo = Periodo.desde_clave(periodo).clave
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--periodo")
+    grupos = reconstruir_resumen(db.session, periodo)
+    click.echo(f"✓ Resumen reconstruido: {grupos} grupos")
+
+
+@comandos.command("archivar-periodos")
+@click.option("--activos", type=int, help="Períodos cerrados que quedan en la base principal "
+              "(por defecto ARCHIVO_PERIODOS_ACTIVOS).")
+@click.option("--sin-compactar", is_flag=True, help="No correr VACUUM después de archivar.")
+def archivar_periodos_command(activos, sin_compactar):
+    """Archiva los períodos cerrados (SQLite) o crea las particiones que falten (PostgreSQL)"""
+    if db.engine.dialect.name == "postgresql":
+        # Cada período ya es una partición: solo se asegura la del actual y el siguiente
+        with db.engine.begin() as conn:
+            creadas = asegurar_particiones(conn)
+        click.echo(f"✓ Particiones creadas: {', '.join(creadas)}" if creadas else "✓ Particiones al día")
+        return
+
+    if activos is None:
+        activos = current_app.config["ARCHIVO_PERIODOS_ACTIVOS"]
+    archivados = archivar_periodos(db.engine, activos, compactar=not sin_compactar, informar=click.echo)
+    click.echo(f"✓ Períodos archivados: {len(archivados)}")
+
+
+if __name__ == "__main__":
+    app = crear_app()
+    with app.app_context():
+        aplicar_migraciones(db.engine)
+    app.run(debug=True)
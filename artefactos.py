@@ -0,0 +1,115 @@
+"""
+Excel precalculado por período.
+
+El XLSX de cada período se guarda en disco con la versión de datos del
+período en el nombre (novedades_YYYY-MM_v<versión>.xlsx). Mientras la versión
+no cambie, /descargar sirve ese archivo directamente (con ETag) en lugar de
+volver a armar el libro. Cuando una escritura cambia un período, el archivo
+se reconstruye en un thread de fondo unos segundos después
+(EXCEL_ESPERA_SEGUNDOS): las escrituras que llegan mientras tanto, o
+mientras se arma el libro, se juntan en una sola reconstrucción.
+"""
+import glob
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Segundos entre un cambio y la reconstrucción del Excel de su período
+ESPERA_RECONSTRUCCION = 10
+
+
+class ArtefactosExcel:
+    """Archivos XLSX por (período, versión) y su reconstrucción en segundo plano"""
+
+    def __init__(self, directorio, espera=ESPERA_RECONSTRUCCION):
+        self.directorio = directorio
+        self.espera = espera
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="exports")
+        self._pendientes = set()   # con la reconstrucción agendada
+        self._en_curso = set()     # reconstruyéndose ahora
+        self._cambiados = set()    # con cambios posteriores al inicio de la reconstrucción
+        self._lock = threading.Lock()
+
+    def ruta(self, periodo, version):
+        return os.path.join(self.directorio, f"novedades_{periodo}_v{version}.xlsx")
+
+    def _archivos(self, periodo):
+        return glob.glob(os.path.join(self.directorio, f"novedades_{periodo}_v*.xlsx"))
+
+    def existe_alguno(self, periodo):
+        """True si hay algún archivo (de cualquier versión) para el período"""
+        return bool(self._archivos(periodo))
+
+    def obtener(self, periodo, version, construir):
+        """
+        Devuelve la ruta del Excel del período en esa versión, construyéndolo
+        si todavía no existe.
+
+        Args:
+            periodo: Clave del período (YYYY-MM)
+            version: Versión de los datos del período
+            construir: Función que recibe la ruta destino y escribe el XLSX
+        """
+        ruta = self.ruta(periodo, version)
+        if os.path.exists(ruta):
+            return ruta
+
+        os.makedirs(self.directorio, exist_ok=True)
+        # Se escribe en un temporal del mismo directorio y se renombra, así
+        # nunca se sirve un archivo a medio escribir (os.replace es atómico)
+        descriptor, temporal = tempfile.mkstemp(dir=self.directorio, suffix=".tmp")
+        os.close(descriptor)
+        try:
+            construir(temporal)
+            os.replace(temporal, ruta)
+        finally:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+
+        # Borrar las versiones anteriores del período
+        for archivo in self._archivos(periodo):
+            if archivo != ruta:
+                try:
+                    os.remove(archivo)
+                except OSError:
+                    pass
+        return ruta
+
+    def programar(self, periodo, reconstruir):
+        """
+        Agenda la reconstrucción del período en segundo plano, `espera`
+        segundos después. Si ya hay una agendada para el período, el cambio
+        se suma a esa (el libro se arma con la versión del momento). Si se
+        está reconstruyendo, se agenda otra recién cuando termine, así un
+        período con escrituras seguidas no se reconstruye sin pausa.
+
+        Args:
+            periodo: Clave del período (YYYY-MM)
+            reconstruir: Función sin argumentos que reconstruye el archivo
+        """
+        with self._lock:
+            if periodo in self._pendientes:
+                return
+            if periodo in self._en_curso:
+                self._cambiados.add(periodo)
+                return
+            self._pendientes.add(periodo)
+
+        def tarea():
+            with self._lock:
+                self._pendientes.discard(periodo)
+                self._en_curso.add(periodo)
+            try:
+                reconstruir()
+            finally:
+                with self._lock:
+                    self._en_curso.discard(periodo)
+                    repetir = periodo in self._cambiados
+                    self._cambiados.discard(periodo)
+                if repetir:
+                    self.programar(periodo, reconstruir)
+
+        temporizador = threading.Timer(self.espera, self._executor.submit, args=(tarea,))
+        temporizador.daemon = True
+        temporizador.start()
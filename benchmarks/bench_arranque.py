@@ -0,0 +1,279 @@
+"""
+Tiempo de arranque y memoria por worker, con salida en JSON.
+
+Mide sobre un árbol del repositorio (--raiz, por defecto este):
+
+- importacion: tiempo de importar el módulo y crear la aplicación (mediana de
+  varios procesos nuevos), RSS después de crearla, después de la primera
+  petición a /ver y después del primer export XLSX, y si openpyxl ya estaba
+  cargado en cada paso. Con -X importtime, los módulos de primer nivel que
+  más tardan en importarse.
+- workers: gunicorn con N workers, sin y con --preload. Tiempo hasta la
+  primera respuesta y, por worker, PSS y USS (memoria propia, no compartida)
+  leídos de /proc/<pid>/smaps_rollup (solo Linux) después de unas peticiones.
+
+Para comparar con una versión anterior, correr el mismo script sobre un
+checkout de esa versión y pasarle su JSON con --comparar:
+
+    git worktree add /tmp/anterior <commit>
+    python benchmarks/bench_arranque.py --raiz /tmp/anterior --app app:app --salida antes.json
+    python benchmarks/bench_arranque.py --comparar antes.json
+"""
+import argparse
+import json
+import os
+import re
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, DIRECTORIO)
+
+# Novedades sintéticas de la base (un período: lo que muestran /ver y el export)
+FILAS = 2000
+# Peticiones que se reparten entre los workers antes de medir su memoria
+PETICIONES_WORKERS = 60
+# Espera máxima a que gunicorn responda, en segundos
+ESPERA_GUNICORN_S = 60
+
+
+# ============================================================================
+# PROCESOS HIJOS
+# ============================================================================
+def _rss_mb():
+    """RSS actual del proceso en MB"""
+    with open("/proc/self/status") as f:
+        return int(re.search(r"VmRSS:\s+(\d+)", f.read()).group(1)) / 1024
+
+
+def _cargar_app(especificacion):
+    """Importa el módulo y evalúa la expresión de una especificación 'modulo:expresion' (como gunicorn)"""
+    import importlib
+
+    modulo, _, expresion = especificacion.partition(":")
+    return eval(expresion or "app", vars(importlib.import_module(modulo)))
+
+
+def medir_importacion(especificacion):
+    """Mide en este proceso (nuevo) la importación, la creación y las primeras peticiones"""
+    rss_inicial = _rss_mb()
+    t0 = time.perf_counter()
+    app = _cargar_app(especificacion)
+    resultado = {
+        "importar_y_crear_ms": round((time.perf_counter() - t0) * 1000, 1),
+        "rss_inicial_mb": round(rss_inicial, 1),
+        "rss_app_mb": round(_rss_mb(), 1),
+        "openpyxl_al_crear": "openpyxl" in sys.modules,
+    }
+
+    cliente = app.test_client()
+    assert cliente.get("/ver").status_code == 200
+    resultado["rss_ver_mb"] = round(_rss_mb(), 1)
+    resultado["openpyxl_despues_de_ver"] = "openpyxl" in sys.modules
+
+    assert cliente.get("/descargar?format=xlsx").status_code == 200
+    resultado["rss_xlsx_mb"] = round(_rss_mb(), 1)
+    return resultado
+
+
+def preparar_base(especificacion):
+    """Aplica las migraciones y carga un período de novedades sintéticas"""
+    from modelos import db, Novedad
+    from migraciones import aplicar_migraciones
+    from datos_sinteticos import generar_filas
+
+    with _cargar_app(especificacion).app_context():
+        aplicar_migraciones(db.engine)
+        db.session.execute(Novedad.__table__.insert(), list(generar_filas(FILAS, filas_por_periodo=FILAS)))
+        db.session.commit()
+
+
+# ============================================================================
+# PROCESO PRINCIPAL
+# ============================================================================
+def _hijo(raiz, entorno, *argumentos, importtime=False):
+    """Corre este script en un proceso nuevo, con el árbol raiz primero en el path"""
+    comando = [sys.executable, *(["-X", "importtime"] if importtime else []), os.path.abspath(__file__)]
+    return subprocess.run(
+        [*comando, *argumentos], cwd=raiz, env=dict(entorno, PYTHONPATH=raiz),
+        check=True, capture_output=True, text=True,
+    )
+
+
+def modulos_mas_lentos(stderr, cantidad=10):
+    """Módulos de primer nivel que más tardan según la salida de -X importtime"""
+    modulos = []
+    for linea in stderr.splitlines():
+        partes = linea.split("|")
+        if not linea.startswith("import time:") or len(partes) != 3 or partes[1].strip() == "cumulative":
+            continue
+        nombre = partes[2]
+        if len(nombre) - len(nombre.lstrip()) == 1:  # sin sangría: importado directamente
+            modulos.append((nombre.strip(), int(partes[1]) / 1000))
+    modulos.sort(key=lambda m: m[1], reverse=True)
+    return [{"modulo": nombre, "ms": round(ms, 1)} for nombre, ms in modulos[:cantidad]]
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _memoria_proceso(pid):
+    """PSS y USS (Private_Clean + Private_Dirty) de un proceso, en MB"""
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        valores = dict(re.findall(r"^(\w+):\s+(\d+) kB", f.read(), re.M))
+    return {
+        "pss_mb": int(valores["Pss"]) / 1024,
+        "uss_mb": (int(valores["Private_Clean"]) + int(valores["Private_Dirty"])) / 1024,
+    }
+
+
+def _hijos_de(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(p) for p in f.read().split()]
+
+
+def medir_workers(raiz, entorno, especificacion, workers, preload):
+    """Levanta gunicorn, espera la primera respuesta, hace peticiones y mide cada worker"""
+    puerto = _puerto_libre()
+    comando = [
+        sys.executable, "-m", "gunicorn", "-w", str(workers), "-b", f"127.0.0.1:{puerto}",
+        *(["--preload"] if preload else []), especificacion,
+    ]
+    entorno = dict(entorno, PYTHONPATH=raiz, GUNICORN_PRELOAD="1" if preload else "0")
+    t0 = time.perf_counter()
+    proceso = subprocess.Popen(
+        comando, cwd=raiz, env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        url = f"http://127.0.0.1:{puerto}"
+        while True:
+            try:
+                urllib.request.urlopen(f"{url}/ver", timeout=5).read()
+                break
+            except OSError:
+                if time.perf_counter() - t0 > ESPERA_GUNICORN_S or proceso.poll() is not None:
+                    raise RuntimeError("gunicorn no respondió")
+                time.sleep(0.05)
+        primera_respuesta = time.perf_counter() - t0
+
+        # Hasta que arrancan todos los workers, la cuenta de hijos puede ser menor
+        while len(_hijos_de(proceso.pid)) < workers:
+            time.sleep(0.05)
+        for i in range(PETICIONES_WORKERS):
+            urllib.request.urlopen(f"{url}/ver", timeout=30).read()
+            if i % 10 == 0:
+                urllib.request.urlopen(f"{url}/resumen", timeout=30).read()
+
+        memorias = [_memoria_proceso(pid) for pid in _hijos_de(proceso.pid)]
+        master = _memoria_proceso(proceso.pid)
+    finally:
+        proceso.send_signal(signal.SIGTERM)
+        proceso.wait(timeout=30)
+
+    return {
+        "preload": preload,
+        "workers": workers,
+        "primera_respuesta_s": round(primera_respuesta, 2),
+        "pss_worker_mb": round(statistics.mean(m["pss_mb"] for m in memorias), 1),
+        "uss_worker_mb": round(statistics.mean(m["uss_mb"] for m in memorias), 1),
+        "pss_total_mb": round(master["pss_mb"] + sum(m["pss_mb"] for m in memorias), 1),
+    }
+
+
+def comparar(actual, ruta_anterior):
+    """Muestra las diferencias con una corrida anterior"""
+    with open(ruta_anterior, encoding="utf-8") as f:
+        anterior = json.load(f)
+
+    print(f"\nComparación con {ruta_anterior}:")
+    for clave in ("importar_y_crear_ms", "rss_app_mb", "rss_ver_mb", "rss_xlsx_mb"):
+        antes, ahora = anterior["importacion"][clave], actual["importacion"][clave]
+        print(f"{clave:>22} {antes:>10.1f} → {ahora:>10.1f} ({(ahora - antes) / antes * 100:+.1f}%)")
+    previos = {(w["preload"], w["workers"]): w for w in anterior.get("workers", [])}
+    for w in actual.get("workers", []):
+        previo = previos.get((w["preload"], w["workers"]))
+        if not previo:
+            continue
+        for clave in ("primera_respuesta_s", "uss_worker_mb", "pss_total_mb"):
+            print(f"{'preload' if w['preload'] else 'sin preload':>12} {clave:>20} "
+                  f"{previo[clave]:>8.1f} → {w[clave]:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--raiz", default=os.path.dirname(DIRECTORIO), help="Árbol del repositorio a medir")
+    parser.add_argument("--app", default="app:crear_app()", help="Aplicación, como para gunicorn")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--sin-gunicorn", action="store_true", help="Medir solo la importación")
+    parser.add_argument("--salida", default="resultados_arranque.json")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior")
+    parser.add_argument("--medir", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--preparar", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.preparar:
+        preparar_base(args.app)
+        return
+    if args.medir:
+        print(json.dumps(medir_importacion(args.app)))
+        return
+
+    from bench_suite import metadatos
+
+    raiz = os.path.abspath(args.raiz)
+    directorio = tempfile.mkdtemp(prefix="bench_arranque_")
+    entorno = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{directorio}/arranque.db",
+        EXPORTS_DIR=os.path.join(directorio, "exports"),
+    )
+    _hijo(raiz, entorno, "--preparar", "--app", args.app)
+
+    mediciones = [
+        json.loads(_hijo(raiz, entorno, "--medir", "--app", args.app).stdout.splitlines()[-1])
+        for _ in range(args.repeticiones)
+    ]
+    importacion = dict(mediciones[0])
+    for clave in ("importar_y_crear_ms", "rss_app_mb", "rss_ver_mb", "rss_xlsx_mb"):
+        importacion[clave] = round(statistics.median(m[clave] for m in mediciones), 1)
+    importacion["modulos_mas_lentos"] = modulos_mas_lentos(
+        _hijo(raiz, entorno, "--medir", "--app", args.app, importtime=True).stderr
+    )
+
+    print(f"Importar y crear la app: {importacion['importar_y_crear_ms']:.0f} ms "
+          f"(openpyxl cargado: {'sí' if importacion['openpyxl_al_crear'] else 'no'})")
+    print(f"RSS: app {importacion['rss_app_mb']:.1f} MB, después de /ver {importacion['rss_ver_mb']:.1f} MB, "
+          f"después del XLSX {importacion['rss_xlsx_mb']:.1f} MB")
+    for modulo in importacion["modulos_mas_lentos"]:
+        print(f"  {modulo['ms']:>8.1f} ms  {modulo['modulo']}")
+
+    resultado = {"metadatos": dict(metadatos(), raiz=raiz, app=args.app), "importacion": importacion}
+    if not args.sin_gunicorn:
+        resultado["workers"] = []
+        print(f"\n{'modo':>12} {'1ª respuesta s':>15} {'PSS/worker MB':>14} {'USS/worker MB':>14} {'PSS total MB':>13}")
+        for preload in (False, True):
+            w = medir_workers(raiz, entorno, args.app, args.workers, preload)
+            resultado["workers"].append(w)
+            print(f"{'preload' if preload else 'sin preload':>12} {w['primera_respuesta_s']:>15.2f} "
+                  f"{w['pss_worker_mb']:>14.1f} {w['uss_worker_mb']:>14.1f} {w['pss_total_mb']:>13.1f}")
+
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados en {args.salida}")
+
+    if args.comparar:
+        comparar(resultado, args.comparar)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Microbenchmarks del registro de campos: costo de normalizar y validar una
+novedad (/enviar, importación) y de formatear una fila para exportar.
+
+Compara el pipeline compilado de campos.py contra el código escrito a mano
+que había antes (un .get().strip() por campo y una función de formato por
+columna) y verifica que ambos den el mismo resultado.
+
+Uso:
+    python benchmarks/bench_campos.py [--repeticiones 20000]
+"""
+import argparse
+import os
+import sys
+import timeit
+from datetime import datetime
+
+from werkzeug.datastructures import MultiDict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from campos import (  # noqa: E402
+    CAMPOS, COLUMNAS, FORMATO_POR_TIPO, formatear_fila, normalizar_novedad,
+)
+from datos_sinteticos import generar_filas  # noqa: E402
+
+
+def normalizar_a_mano(datos):
+    """Normalización anterior: el código de /enviar tal como estaba, una variable por campo"""
+    # Datos básicos
+    legajo = (datos.get("legajo") or "").strip()
+    nombre = (datos.get("nombre") or "").strip()
+    tipo_empleado = (datos.get("tipo_empleado") or "").strip()
+    tipo_novedad = (datos.get("tipo_novedad") or "").strip()
+
+    # Datos personales
+    fecha_nacimiento = (datos.get("fecha_nacimiento") or "").strip()
+    dni = (datos.get("dni") or "").strip()
+    cuil = (datos.get("cuil") or "").strip()
+    cbu = (datos.get("cbu") or "").strip()
+    banco = (datos.get("banco") or "").strip()
+    domicilio = (datos.get("domicilio") or "").strip()
+    email = (datos.get("email") or "").strip()
+    obra_social = (datos.get("obra_social") or "").strip()
+
+    # Datos del alta
+    nivel = (datos.get("nivel") or "").strip()
+    fecha_alta = (datos.get("fecha_alta") or "").strip()
+    cargo = (datos.get("cargo") or "").strip()
+    caracter_del_cargo = (datos.get("caracter_del_cargo") or "").strip()
+
+    # Decretos
+    trabaja_otra_institucion = (datos.get("trabaja_otra_institucion") or "").strip()
+    tipo_institucion = (datos.get("tipo_institucion") or "").strip()
+    horas_catedras_str = (datos.get("horas_catedras") or "").strip()
+
+    # Datos laborales
+    subvencionado = (datos.get("subvencionado") or "").strip()
+    asignaciones_familiares = (datos.get("asignaciones_familiares") or "").strip()
+    cantidad_hijos_str = (datos.get("cantidad_hijos") or "").strip()
+
+    # Datos de reemplazo
+    reemplazo_persona_ya_trabaja = (datos.get("reemplazo_persona_ya_trabaja") or "").strip()
+    reemplazo_cargo_que_cubre = (datos.get("reemplazo_cargo_que_cubre") or "").strip()
+    fecha_inicio_reemplazo = (datos.get("fecha_inicio_reemplazo") or "").strip()
+    fecha_fin_reemplazo = (datos.get("fecha_fin_reemplazo") or "").strip()
+
+    # Datos de baja
+    fecha_baja = (datos.get("fecha_baja") or "").strip()
+    motivo_baja = (datos.get("motivo_baja") or "").strip()
+
+    # Otros
+    tipo_otro = (datos.get("tipo_otro") or "").strip()
+
+    # Información adicional
+    cargos_actuales = (datos.get("cargos_actuales") or "").strip()
+    tipo_movimiento = (datos.get("tipo_movimiento") or "").strip()
+    subvencion = (datos.get("subvencion") or "").strip()
+    codigo = (datos.get("codigo") or "").strip()
+    observaciones = (datos.get("observaciones") or "").strip()
+
+    # Validación de números
+    errores = []
+    try:
+        horas_catedras = float(horas_catedras_str.replace(",", ".")) if horas_catedras_str else 0.0
+    except ValueError:
+        errores.append("Horas Cátedras debe ser un número válido.")
+        horas_catedras = 0.0
+
+    try:
+        cantidad_hijos = int(cantidad_hijos_str) if cantidad_hijos_str else 0
+    except ValueError:
+        errores.append("Cantidad de hijos debe ser un número entero.")
+        cantidad_hijos = 0
+
+    registro = {
+        "legajo": legajo,
+        "nombre": nombre,
+        "tipo_empleado": tipo_empleado,
+        "tipo_novedad": tipo_novedad,
+        "fecha_nacimiento": fecha_nacimiento,
+        "dni": dni,
+        "cuil": cuil,
+        "cbu": cbu,
+        "banco": banco,
+        "domicilio": domicilio,
+        "email": email,
+        "obra_social": obra_social,
+        "nivel": nivel,
+        "fecha_alta": fecha_alta,
+        "cargo": cargo,
+        "caracter_del_cargo": caracter_del_cargo,
+        "trabaja_otra_institucion": trabaja_otra_institucion,
+        "tipo_institucion": tipo_institucion,
+        "horas_catedras": horas_catedras,
+        "subvencionado": subvencionado,
+        "asignaciones_familiares": asignaciones_familiares,
+        "cantidad_hijos": cantidad_hijos,
+        "reemplazo_persona_ya_trabaja": reemplazo_persona_ya_trabaja,
+        "reemplazo_cargo_que_cubre": reemplazo_cargo_que_cubre,
+        "fecha_inicio_reemplazo": fecha_inicio_reemplazo,
+        "fecha_fin_reemplazo": fecha_fin_reemplazo,
+        "fecha_baja": fecha_baja,
+        "motivo_baja": motivo_baja,
+        "tipo_otro": tipo_otro,
+        "cargos_actuales": cargos_actuales,
+        "tipo_movimiento": tipo_movimiento,
+        "subvencion": subvencion,
+        "codigo": codigo,
+        "observaciones": observaciones,
+    }
+    return registro, errores
+
+
+_FORMATOS = [FORMATO_POR_TIPO[c.tipo] for c in CAMPOS]
+
+
+def formatear_a_mano(fila):
+    """Formato anterior: una llamada a la función de formato por columna"""
+    return [formato(valor) for formato, valor in zip(_FORMATOS, fila)]
+
+
+def medir(funcion, argumento, repeticiones):
+    """Microsegundos por llamada (mejor de 5 rondas)"""
+    tiempos = timeit.repeat(lambda: funcion(argumento), number=repeticiones, repeat=5)
+    return min(tiempos) / repeticiones * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeticiones", type=int, default=20000)
+    args = parser.parse_args()
+
+    # Un envío de formulario completo (todos los campos con texto)
+    fila = next(generar_filas(1))
+    formulario = MultiDict({c.nombre: str(fila.get(c.nombre) or "x") for c in CAMPOS})
+    formulario["horas_catedras"] = "12,5"
+
+    # Una fila de la base como la devuelve iter_filas_periodo
+    fila_base = tuple(
+        datetime.now() if columna == "timestamp" else fila.get(columna, "") for columna in COLUMNAS
+    )
+
+    assert normalizar_novedad(formulario)[0] == normalizar_a_mano(formulario)[0]
+    assert formatear_fila(fila_base) == formatear_a_mano(fila_base)
+
+    print(f"{'caso':<28} {'a mano µs':>10} {'registro µs':>12}")
+    for caso, a_mano, compilado, argumento in (
+        ("normalizar envío", normalizar_a_mano, normalizar_novedad, formulario),
+        ("formatear fila de export", formatear_a_mano, formatear_fila, fila_base),
+    ):
+        antes = medir(a_mano, argumento, args.repeticiones)
+        despues = medir(compilado, argumento, args.repeticiones)
+        print(f"{caso:<28} {antes:>10.2f} {despues:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Prueba de carga del pool de conexiones con N workers concurrentes.
+
+Cada worker es un thread con su propio cliente de la app que hace peticiones
+mezcladas (/ver, GET y POST de la API, /descargar en CSV) durante un tiempo
+fijo. Se cuentan, con los eventos del pool de SQLAlchemy, las conexiones
+reales abiertas contra la base y los checkouts: con el pool funcionando, las
+conexiones abiertas quedan acotadas por tamaño + overflow aunque haya miles
+de peticiones, y ninguna petición falla por timeout del pool.
+
+Uso:
+    python benchmarks/bench_concurrencia.py [--workers 4,16,32] [--segundos 10]
+        [--url postgresql+psycopg2://...]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from itertools import islice
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FILAS = 20_000
+
+
+class ContadorPool:
+    """Cuenta conexiones abiertas, checkouts y el máximo de conexiones en uso a la vez"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.conexiones = 0
+        self.checkouts = 0
+        self.en_uso = 0
+        self.max_en_uso = 0
+        self._lock = threading.Lock()
+        event.listen(engine, "connect", self._connect)
+        event.listen(engine, "checkout", self._checkout)
+        event.listen(engine, "checkin", self._checkin)
+
+    def _connect(self, *_):
+        with self._lock:
+            self.conexiones += 1
+
+    def _checkout(self, *_):
+        with self._lock:
+            self.checkouts += 1
+            self.en_uso += 1
+            self.max_en_uso = max(self.max_en_uso, self.en_uso)
+
+    def _checkin(self, *_):
+        with self._lock:
+            self.en_uso -= 1
+
+    def reiniciar(self):
+        with self._lock:
+            self.conexiones = self.checkouts = self.max_en_uso = 0
+
+
+def peticion(cliente, rnd, lote):
+    """Una petición elegida al azar, con la mezcla de una jornada normal"""
+    opcion = rnd.random()
+    if opcion < 0.5:
+        return cliente.get("/ver")
+    if opcion < 0.8:
+        return cliente.get("/api/novedades?limite=50&tipo_novedad=Alta")
+    if opcion < 0.97:
+        return cliente.post("/api/novedades", json=lote)
+    return cliente.get("/descargar?format=csv")
+
+
+def correr(app, workers, segundos, filas_muestra):
+    """Lanza los workers y devuelve (latencias en ms, errores)"""
+    latencias, errores = [], []
+    lock = threading.Lock()
+    fin = time.perf_counter() + segundos
+
+    def worker(numero):
+        rnd = random.Random(numero)
+        cliente = app.test_client()
+        propias, fallas = [], []
+        while time.perf_counter() < fin:
+            lote = rnd.sample(filas_muestra, 5)
+            t0 = time.perf_counter()
+            try:
+                respuesta = peticion(cliente, rnd, lote)
+                respuesta.get_data()
+                if respuesta.status_code >= 500:
+                    fallas.append(respuesta.status_code)
+            except Exception as e:  # pool agotado, timeout, lock de SQLite...
+                fallas.append(type(e).__name__)
+            propias.append((time.perf_counter() - t0) * 1000)
+        with lock:
+            latencias.extend(propias)
+            errores.extend(fallas)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencias, errores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", default="4,16,32")
+    parser.add_argument("--segundos", type=float, default=10)
+    parser.add_argument("--url", help="URL de base de datos (por defecto, SQLite temporal)")
+    args = parser.parse_args()
+
+    directorio = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = args.url or f"sqlite:///{directorio}/bench.db"
+    os.environ.setdefault("EXPORTS_DIR", os.path.join(directorio, "exports"))
+
+    from app import crear_app
+    app = crear_app()
+    from modelos import db, Novedad
+    from migraciones import aplicar_migraciones
+    from datos_sinteticos import generar_filas
+
+    with app.app_context():
+        aplicar_migraciones(db.engine)
+        generador = generar_filas(FILAS, filas_por_periodo=FILAS // 4)
+        while lote := list(islice(generador, 10_000)):
+            db.session.execute(Novedad.__table__.insert(), lote)
+            db.session.commit()
+        engine = db.engine
+
+    # Para la API: mismos campos que el formulario, sin timestamp
+    filas_muestra = [
+        {k: v for k, v in fila.items() if k != "timestamp"} for fila in generar_filas(500, semilla=99)
+    ]
+
+    contador = ContadorPool(engine)
+    capacidad = engine.pool.size() + getattr(engine.pool, "_max_overflow", 0)
+    print(f"{engine.url.get_backend_name()} · pool {type(engine.pool).__name__} "
+          f"(tamaño + overflow = {capacidad})")
+    print(f"{'workers':>7} {'peticiones':>10} {'errores':>7} {'p50 ms':>7} {'p95 ms':>7} "
+          f"{'conexiones':>10} {'checkouts':>9} {'máx en uso':>10}")
+
+    for workers in (int(w) for w in args.workers.split(",")):
+        contador.reiniciar()
+        latencias, errores = correr(app, workers, args.segundos, filas_muestra)
+        latencias.sort()
+        p95 = latencias[int(len(latencias) * 0.95) - 1] if latencias else 0
+        print(f"{workers:>7} {len(latencias):>10} {len(errores):>7} "
+              f"{statistics.median(latencias):>7.1f} {p95:>7.1f} "
+              f"{contador.conexiones:>10} {contador.checkouts:>9} {contador.max_en_uso:>10}")
+        if errores:
+            print(f"        errores: {sorted(set(map(str, errores)))}")
+
+
+if __name__ == "__main__":
+    main()
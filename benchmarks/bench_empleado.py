@@ -0,0 +1,75 @@
+"""
+Benchmark del historial de un empleado (legajo / DNI / CUIL) a medida que
+crece la tabla.
+
+Las búsquedas van por igualdad sobre las columnas normalizadas e indexadas,
+así que el tiempo depende de cuántas novedades tiene la persona y no del
+total de filas.
+
+Uso:
+    python benchmarks/bench_empleado.py [--tamanos 10000,100000,1000000]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from itertools import islice
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tamanos", default="10000,100000,1000000")
+    parser.add_argument("--repeticiones", type=int, default=200)
+    parser.add_argument("--url", help="URL de base de datos (por defecto, SQLite temporal)")
+    args = parser.parse_args()
+
+    directorio = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = args.url or f"sqlite:///{directorio}/bench.db"
+
+    from app import crear_app, historial_empleado
+    app = crear_app()
+    from modelos import db, Novedad
+    from migraciones import aplicar_migraciones
+    from datos_sinteticos import generar_filas
+
+    tamanos = [int(t) for t in args.tamanos.split(",")]
+    filas = generar_filas(max(tamanos))
+    insertadas = 0
+    muestra = {"legajo": [], "dni": [], "cuil": []}
+    rnd = random.Random(1)
+
+    with app.app_context():
+        aplicar_migraciones(db.engine)
+        print(f"{'filas':>10} {'campo':>7} {'filas/persona':>14} {'mediana ms':>11} {'p95 ms':>8}")
+
+        for tamano in tamanos:
+            while insertadas < tamano:
+                lote = list(islice(filas, min(50_000, tamano - insertadas)))
+                db.session.execute(Novedad.__table__.insert(), lote)
+                db.session.commit()
+                insertadas += len(lote)
+                for campo, valores in muestra.items():
+                    valores.extend(f[campo] for f in rnd.sample(lote, min(100, len(lote))))
+
+            for campo, valores in muestra.items():
+                tiempos, encontradas = [], []
+                for _ in range(args.repeticiones):
+                    db.session.expunge_all()
+                    valor = rnd.choice(valores)
+                    t0 = time.perf_counter()
+                    resultado = historial_empleado(campo, valor)
+                    tiempos.append((time.perf_counter() - t0) * 1000)
+                    encontradas.append(len(resultado))
+                tiempos.sort()
+                p95 = tiempos[int(len(tiempos) * 0.95) - 1]
+                print(f"{tamano:>10} {campo:>7} {statistics.mean(encontradas):>14.1f} "
+                      f"{statistics.median(tiempos):>11.3f} {p95:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
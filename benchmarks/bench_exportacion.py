@@ -0,0 +1,132 @@
+"""
+Benchmark de /descargar: export en memoria (implementación anterior) contra
+el export write-only por lotes.
+
+Cada caso corre en un proceso nuevo para medir el pico de memoria (RSS) de
+ese export solo.
+
+Uso:
+    python benchmarks/bench_exportacion.py [--tamanos 10000,100000,500000]
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from io import BytesIO
+from itertools import islice
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def exportar_en_memoria():
+    """Export como lo hacía /descargar antes: ORM completo, lista de dicts,
+    Workbook normal con un Alignment por celda y segundo recorrido para anchos."""
+    from openpyxl import Workbook
+    from openpyxl.styles import Alignment
+    from openpyxl.utils import get_column_letter
+    from app import row_to_dict
+    from campos import CAMPOS, FORMATO_POR_TIPO
+    from modelos import Novedad
+    from periodos import Periodo
+
+    novedades = [
+        row_to_dict(n) for n in Novedad.query
+        .filter(Novedad.periodo == Periodo.de_fecha().clave)
+        .order_by(Novedad.timestamp.desc(), Novedad.id.desc())
+    ]
+    rows_data = [
+        {c.etiqueta: FORMATO_POR_TIPO[c.tipo](n[c.nombre]) for c in CAMPOS}
+        for n in novedades
+    ]
+    wb = Workbook()
+    ws = wb.active
+    headers = list(rows_data[0].keys())
+    for col_num, header in enumerate(headers, 1):
+        ws.cell(row=1, column=col_num, value=header)
+    for row_num, row_data in enumerate(rows_data, 2):
+        for col_num, header in enumerate(headers, 1):
+            cell = ws.cell(row=row_num, column=col_num, value=row_data[header])
+            cell.alignment = Alignment(vertical='center')
+    for column in ws.columns:
+        max_length = max(len(str(cell.value)) for cell in column)
+        ws.column_dimensions[get_column_letter(column[0].column)].width = min(max_length + 2, 50)
+    output = BytesIO()
+    wb.save(output)
+    return len(output.getvalue())
+
+
+def exportar_streaming():
+    """Export actual de /descargar"""
+    from app import iter_filas_periodo, largos_columnas
+    from campos import COLUMNAS
+    from exportar import escribir_xlsx
+
+    with tempfile.TemporaryFile() as archivo:
+        escribir_xlsx(iter_filas_periodo(COLUMNAS), archivo, largos_columnas(COLUMNAS))
+        return archivo.tell()
+
+
+def correr_caso(modo):
+    """Proceso hijo: corre un export y muestra tiempo, bytes y pico de RSS"""
+    from app import crear_app
+    app = crear_app()
+
+    exportadores = {"memoria": exportar_en_memoria, "streaming": exportar_streaming}
+    with app.app_context():
+        t0 = time.perf_counter()
+        tamano = exportadores[modo]()
+        segundos = time.perf_counter() - t0
+    pico_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{segundos:.2f} {tamano} {pico_mb:.0f}")
+
+
+def preparar_base(url, filas):
+    from app import crear_app
+    app = crear_app()
+    from modelos import db, Novedad
+    from migraciones import aplicar_migraciones
+    from datos_sinteticos import generar_filas
+
+    with app.app_context():
+        aplicar_migraciones(db.engine)
+        generador = generar_filas(filas, filas_por_periodo=filas)
+        while lote := list(islice(generador, 50_000)):
+            db.session.execute(Novedad.__table__.insert(), lote)
+            db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tamanos", default="10000,100000,500000")
+    parser.add_argument("--caso", choices=("memoria", "streaming"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.caso:
+        correr_caso(args.caso)
+        return
+
+    directorio = tempfile.mkdtemp()
+    print(f"{'filas':>8} {'modo':>10} {'segundos':>9} {'MB xlsx':>8} {'pico RSS MB':>12}")
+    for tamano in (int(t) for t in args.tamanos.split(",")):
+        url = f"sqlite:///{directorio}/bench_{tamano}.db"
+        entorno = dict(os.environ, DATABASE_URL=url)
+        subprocess.run(
+            [sys.executable, "-c", f"import bench_exportacion as b; b.preparar_base({url!r}, {tamano})"],
+            cwd=os.path.dirname(os.path.abspath(__file__)), env=entorno, check=True,
+        )
+        for modo in ("memoria", "streaming"):
+            salida = subprocess.run(
+                [sys.executable, __file__, "--caso", modo],
+                env=entorno, check=True, capture_output=True, text=True,
+            ).stdout.split()
+            segundos, tamano_xlsx, pico = float(salida[0]), int(salida[1]), float(salida[2])
+            print(f"{tamano:>8} {modo:>10} {segundos:>9.2f} {tamano_xlsx / 1e6:>8.1f} {pico:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark de la consulta del período actual a medida que crece la tabla.
+
+Mantiene fija la cantidad de filas por período y agrega períodos históricos,
+así que con el índice de timestamp el tiempo de consulta debe quedar
+constante aunque la tabla pase de 10k a 1M filas.
+
+Uso:
+    python benchmarks/bench_periodo.py [--tamanos 10000,100000,1000000]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from itertools import islice
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tamanos", default="10000,100000,1000000")
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--url", help="URL de base de datos (por defecto, SQLite temporal)")
+    args = parser.parse_args()
+
+    directorio = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = args.url or f"sqlite:///{directorio}/bench.db"
+
+    from app import crear_app, iter_filas_periodo
+    app = crear_app()
+    from modelos import db, Novedad
+    from migraciones import aplicar_migraciones
+    from campos import COLUMNAS
+    from datos_sinteticos import generar_filas
+
+    tamanos = [int(t) for t in args.tamanos.split(",")]
+    filas = generar_filas(max(tamanos))
+    insertadas = 0
+
+    with app.app_context():
+        aplicar_migraciones(db.engine)
+        print(f"{'filas':>10} {'resultado':>10} {'mediana ms':>11} {'p95 ms':>8}")
+
+        for tamano in tamanos:
+            while insertadas < tamano:
+                lote = list(islice(filas, min(50_000, tamano - insertadas)))
+                db.session.execute(Novedad.__table__.insert(), lote)
+                db.session.commit()
+                insertadas += len(lote)
+
+            tiempos = []
+            for _ in range(args.repeticiones):
+                db.session.expunge_all()
+                t0 = time.perf_counter()
+                resultado = list(iter_filas_periodo(COLUMNAS))
+                tiempos.append((time.perf_counter() - t0) * 1000)
+            tiempos.sort()
+            p95 = tiempos[int(len(tiempos) * 0.95) - 1]
+            print(f"{tamano:>10} {len(resultado):>10} {statistics.median(tiempos):>11.2f} {p95:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Suite reproducible de benchmarks de la aplicación, con salida en JSON.
+
+Para cada motor (SQLite temporal y, si se pasa --pg-url, PostgreSQL) y cada
+tamaño de tabla, se llena `novedades` con datos sintéticos de todos los tipos
+(ver datos_sinteticos.py) y se mide, a través del cliente de pruebas de Flask:
+
+- ver / ver_cache: latencia de /ver del período actual sin cache y con cache.
+- leer_periodo: tiempo de leer todas las filas del período (sin cache).
+- dashboard: latencia de /dashboard (resumen precalculado del período).
+- descargar_xlsx / descargar_csv / descargar_parquet: tiempo de armado del
+  export y pico de memoria (RSS) del proceso.
+- enviar: novedades por segundo cargadas con POST /enviar.
+
+Cada caso corre en un proceso nuevo, así el pico de RSS es solo de ese caso y
+un caso no calienta el cache ni la memoria del siguiente. Los resultados se
+guardan en JSON (con versión de Python, SQLAlchemy y commit) y con --comparar
+se muestra la diferencia contra una corrida anterior.
+
+Uso:
+    python benchmarks/bench_suite.py [--tamanos 10000,100000]
+        [--pg-url postgresql+psycopg2://usuario@localhost/bench]
+        [--salida resultados.json] [--comparar anterior.json]
+"""
+import argparse
+import glob
+import json
+import math
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from itertools import islice
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+RAIZ = os.path.dirname(DIRECTORIO)
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, DIRECTORIO)
+
+# Casos en el orden en que se corren (enviar al final: agrega filas)
+CASOS = (
+    "ver", "ver_cache", "leer_periodo", "dashboard",
+    "descargar_xlsx", "descargar_csv", "descargar_parquet",
+    "enviar",
+)
+# Cantidad de POST /enviar por repetición del caso enviar
+POSTS_ENVIAR = 200
+
+
+# ============================================================================
+# PROCESOS HIJOS
+# ============================================================================
+def preparar_base(filas, filas_por_periodo):
+    """Deja la tabla con `filas` novedades sintéticas (borra lo que haya)"""
+    from sqlalchemy import text
+    from app import crear_app
+    app = crear_app()
+    from modelos import db, Novedad
+    from migraciones import aplicar_migraciones
+    from datos_sinteticos import generar_filas
+    from resumen import reconstruir_resumen
+
+    with app.app_context():
+        aplicar_migraciones(db.engine)
+        if db.engine.dialect.name == "postgresql":
+            db.session.execute(text("TRUNCATE novedades RESTART IDENTITY"))
+        else:
+            db.session.execute(Novedad.__table__.delete())
+        db.session.commit()
+
+        generador = generar_filas(filas, filas_por_periodo=filas_por_periodo)
+        while lote := list(islice(generador, 10_000)):
+            db.session.execute(Novedad.__table__.insert(), lote)
+            db.session.commit()
+        # Los INSERT directos no pasan por add_novedades: resumen desde cero
+        reconstruir_resumen(db.session)
+        if db.engine.dialect.name == "postgresql":
+            db.session.execute(text("ANALYZE novedades"))
+            db.session.commit()
+
+
+def _medir(funcion, repeticiones):
+    """Corre `funcion` una vez para calentar y devuelve los ms de cada repetición"""
+    funcion()
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - t0) * 1000)
+    return tiempos
+
+
+def _borrar_exports(directorio):
+    """Borra los Excel precalculados para que /descargar arme el libro de nuevo"""
+    for archivo in glob.glob(os.path.join(directorio, "*.xlsx")):
+        os.remove(archivo)
+
+
+def correr_caso(caso, repeticiones):
+    """Corre un caso y devuelve sus resultados (tiempos, bytes, RSS)"""
+    from app import crear_app, iter_filas_periodo
+    app = crear_app()
+    from campos import COLUMNAS
+    from datos_sinteticos import generar_filas
+
+    cliente = app.test_client()
+    rss_inicial = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    resultado = {}
+
+    def pedir(url):
+        respuesta = cliente.get(url)
+        cuerpo = respuesta.get_data()
+        assert respuesta.status_code == 200, (url, respuesta.status_code)
+        resultado["bytes"] = len(cuerpo)
+
+    if caso in ("ver", "ver_cache"):
+        app.extensions["cache_periodos"].activo = caso == "ver_cache"
+        tiempos = _medir(lambda: pedir("/ver"), repeticiones * 4)
+    elif caso == "dashboard":
+        tiempos = _medir(lambda: pedir("/dashboard"), repeticiones * 4)
+    elif caso == "leer_periodo":
+        def consultar():
+            with app.app_context():
+                resultado["filas_periodo"] = sum(1 for _ in iter_filas_periodo(COLUMNAS))
+        tiempos = _medir(consultar, repeticiones)
+    elif caso.startswith("descargar_"):
+        formato = caso.split("_", 1)[1]
+
+        def descargar():
+            # El XLSX se sirve precalculado si existe: se borra para medir el armado
+            _borrar_exports(app.config["EXPORTS_DIR"])
+            pedir(f"/descargar?format={formato}")
+        tiempos = _medir(descargar, repeticiones)
+    elif caso == "enviar":
+        formularios = [
+            {k: str(v) for k, v in fila.items() if k != "timestamp"}
+            for fila in generar_filas(POSTS_ENVIAR, semilla=99)
+        ]
+
+        def enviar():
+            for formulario in formularios:
+                respuesta = cliente.post("/enviar", data=formulario)
+                assert respuesta.status_code == 302, respuesta.status_code
+        tiempos = _medir(enviar, repeticiones)
+        resultado["novedades_por_segundo"] = round(
+            POSTS_ENVIAR * 1000 / statistics.median(tiempos), 1
+        )
+    else:
+        raise ValueError(f"Caso desconocido: {caso}")
+
+    tiempos.sort()
+    resultado.update({
+        "mediana_ms": round(statistics.median(tiempos), 2),
+        "p95_ms": round(tiempos[math.ceil(len(tiempos) * 0.95) - 1], 2),
+        "min_ms": round(tiempos[0], 2),
+        "repeticiones": len(tiempos),
+        "rss_inicial_mb": round(rss_inicial, 1),
+        "rss_pico_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    })
+    return resultado
+
+
+# ============================================================================
+# PROCESO PRINCIPAL
+# ============================================================================
+def _hijo(entorno, *argumentos):
+    """Corre este script en un proceso nuevo y devuelve su salida estándar"""
+    return subprocess.run(
+        [sys.executable, os.path.abspath(__file__), *argumentos],
+        env=entorno, check=True, capture_output=True, text=True,
+    ).stdout
+
+
+def metadatos():
+    import sqlalchemy
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "plataforma": platform.platform(),
+    }
+
+
+def comparar(resultados, ruta_anterior):
+    """Muestra la variación de la mediana contra una corrida anterior"""
+    with open(ruta_anterior, encoding="utf-8") as f:
+        anteriores = {
+            (r["motor"], r["filas"], r["caso"]): r for r in json.load(f)["resultados"]
+        }
+    print(f"\nComparación con {ruta_anterior}:")
+    print(f"{'motor':>10} {'filas':>8} {'caso':>18} {'antes ms':>10} {'ahora ms':>10} {'cambio':>8}")
+    for r in resultados:
+        anterior = anteriores.get((r["motor"], r["filas"], r["caso"]))
+        if not anterior:
+            continue
+        cambio = (r["mediana_ms"] - anterior["mediana_ms"]) / anterior["mediana_ms"] * 100
+        print(f"{r['motor']:>10} {r['filas']:>8} {r['caso']:>18} {anterior['mediana_ms']:>10.1f} "
+              f"{r['mediana_ms']:>10.1f} {cambio:>+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tamanos", default="10000,100000")
+    parser.add_argument("--filas-por-periodo", type=int, default=2000)
+    parser.add_argument("--pg-url", help="URL de PostgreSQL (además de SQLite); la tabla se vacía")
+    parser.add_argument("--solo-pg", action="store_true", help="No correr SQLite")
+    parser.add_argument("--casos", default=",".join(CASOS))
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--salida", default="resultados_bench.json")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior")
+    parser.add_argument("--preparar", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--caso", choices=CASOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.preparar is not None:
+        preparar_base(args.preparar, args.filas_por_periodo)
+        return
+    if args.caso:
+        print(json.dumps(correr_caso(args.caso, args.repeticiones)))
+        return
+
+    directorio = tempfile.mkdtemp(prefix="bench_suite_")
+    casos = args.casos.split(",")
+    motores = [] if args.solo_pg else [("sqlite", None)]
+    if args.pg_url:
+        motores.append(("postgresql", args.pg_url))
+
+    resultados = []
+    print(f"{'motor':>10} {'filas':>8} {'caso':>18} {'mediana ms':>11} {'p95 ms':>9} {'pico RSS MB':>12}")
+    for motor, url in motores:
+        for filas in (int(t) for t in args.tamanos.split(",")):
+            entorno = dict(
+                os.environ,
+                DATABASE_URL=url or f"sqlite:///{directorio}/bench_{filas}.db",
+                EXPORTS_DIR=os.path.join(directorio, f"exports_{motor}_{filas}"),
+            )
+            comunes = ["--filas-por-periodo", str(args.filas_por_periodo)]
+            _hijo(entorno, "--preparar", str(filas), *comunes)
+            for caso in casos:
+                salida = _hijo(entorno, "--caso", caso, "--repeticiones", str(args.repeticiones), *comunes)
+                resultado = {"motor": motor, "filas": filas, "caso": caso, **json.loads(salida.splitlines()[-1])}
+                resultados.append(resultado)
+                print(f"{motor:>10} {filas:>8} {caso:>18} {resultado['mediana_ms']:>11.1f} "
+                      f"{resultado['p95_ms']:>9.1f} {resultado['rss_pico_mb']:>12.0f}")
+
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump({"metadatos": metadatos(), "resultados": resultados}, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados en {args.salida}")
+
+    if args.comparar:
+        comparar(resultados, args.comparar)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Generador de novedades sintéticas para benchmarks.
+
+Las filas se reparten en períodos de liquidación hacia atrás desde hoy, con
+una cantidad fija de filas por período, para poder medir cómo escalan las
+consultas de un período a medida que crece la tabla.
+
+Cada fila es una novedad válida (pasa validar_novedad) con los valores de los
+combos del formulario, para todos los tipos: Alta, Baja, Reemplazo (de una
+persona que ya trabaja o nueva) y Otros. Las novedades se reparten entre un
+conjunto de personas con legajo, DNI y CUIL fijos, así que cada persona
+tiene historial en varios períodos.
+"""
+import random
+from datetime import date, timedelta
+
+# Tipo de novedad → peso (proporción aproximada de un cierre de período real)
+TIPOS_NOVEDAD = {"Otros": 40, "Alta": 20, "Baja": 15, "Reemplazo": 25}
+NIVELES = ("Inicial", "Primario", "Secundario", "Terciario")
+CARGOS_DOCENTE = (
+    "MAESTRA DE GRADO", "MAESTRA DE NIVEL INICIAL", "MAESTRA ESPECIAL",
+    "PROFESOR NIVEL MEDIO", "PROFESOR NIVEL TERCIARIO", "PRECEPTOR", "BIBLIOTECARIO",
+)
+CARGOS_NO_DOCENTE = ("ADM.1°CAT", "ADM.3°CAT", "MAEST.2°CAT", "MAEST.4°CAT")
+MOTIVOS_BAJA = ("Jubilación", "Renuncia", "Despido", "Lic.Médica", "Lic. Maternidad")
+TIPOS_OTRO = ("Anticipo", "Inasistencia", "Licencia sin goce")
+BANCOS = ("Banco Nación", "Banco Provincia", "Banco Galicia", "Banco Macro")
+OBRAS_SOCIALES = ("OSDE", "IOSFA", "OSPLAD", "Swiss Medical")
+NOMBRES = ("María", "Juan", "Lucía", "Martín", "Sofía", "Diego", "Valentina", "Pablo", "Carla", "Andrés")
+APELLIDOS = ("González", "Rodríguez", "Gómez", "Fernández", "López", "Díaz", "Martínez", "Pérez", "Sosa", "Romero")
+
+
+def _persona(rnd, numero):
+    """Datos fijos de una persona (se repiten en todas sus novedades)"""
+    dni = str(20_000_000 + rnd.randrange(30_000_000))
+    tipo_empleado = rnd.choice(("Docente", "Docente", "No Docente"))
+    nombre = f"{rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)}"
+    return {
+        "legajo": str(1000 + numero),
+        "nombre": nombre,
+        "tipo_empleado": tipo_empleado,
+        "fecha_nacimiento": (date(1960, 1, 1) + timedelta(days=rnd.randrange(15000))).isoformat(),
+        "dni": dni,
+        "cuil": f"{rnd.choice(('20', '27'))}-{dni}-{rnd.randrange(10)}",
+        "cbu": "".join(str(rnd.randrange(10)) for _ in range(22)),
+        "banco": rnd.choice(BANCOS),
+        "domicilio": f"Calle {rnd.randrange(1, 200)} N° {rnd.randrange(1, 5000)}",
+        "email": f"{nombre.split()[0].lower()}.{numero}@ejemplo.com",
+        "obra_social": rnd.choice(OBRAS_SOCIALES),
+        "asignaciones_familiares": rnd.choice(("Si", "No")),
+        "cantidad_hijos": rnd.randrange(4),
+    }
+
+
+def _datos_alta(rnd, persona, dia):
+    cargos = CARGOS_DOCENTE if persona["tipo_empleado"] == "Docente" else CARGOS_NO_DOCENTE
+    return {
+        "nivel": rnd.choice(NIVELES),
+        "fecha_alta": dia.isoformat(),
+        "cargo": rnd.choice(cargos),
+        "caracter_del_cargo": rnd.choice(("Titular", "Suplente")),
+        "trabaja_otra_institucion": rnd.choice(("Si", "No")),
+        "tipo_institucion": rnd.choice(("Pública", "Privada", "")),
+        "horas_catedras": float(rnd.randrange(0, 40)) if persona["tipo_empleado"] == "Docente" else 0.0,
+        "subvencionado": rnd.choice(("100", "80", "")),
+    }
+
+
+def generar_filas(cantidad, filas_por_periodo=2000, semilla=1234):
+    """
+    Genera `cantidad` diccionarios listos para insertar en `novedades`.
+
+    Args:
+        cantidad: Total de filas a generar
+        filas_por_periodo: Filas por período de liquidación (6 al 5)
+        semilla: Semilla del generador aleatorio (resultados reproducibles)
+    """
+    from periodos import Periodo
+
+    rnd = random.Random(semilla)
+    periodo = Periodo.de_fecha()
+    # Unas 4 novedades por persona en promedio
+    personas = [_persona(rnd, n) for n in range(max(1, cantidad // 4))]
+    tipos, pesos = list(TIPOS_NOVEDAD), list(TIPOS_NOVEDAD.values())
+
+    for i in range(cantidad):
+        if i and i % filas_por_periodo == 0:
+            periodo = periodo.anterior()
+        timestamp = periodo.inicio + timedelta(seconds=rnd.randrange(28 * 24 * 3600))
+        dia = timestamp.date()
+        tipo = rnd.choices(tipos, pesos)[0]
+
+        fila = dict.fromkeys((
+            "nivel", "fecha_alta", "cargo", "caracter_del_cargo", "trabaja_otra_institucion",
+            "tipo_institucion", "subvencionado", "reemplazo_persona_ya_trabaja",
+            "reemplazo_cargo_que_cubre", "fecha_inicio_reemplazo", "fecha_fin_reemplazo",
+            "fecha_baja", "motivo_baja", "tipo_otro", "cargos_actuales", "tipo_movimiento",
+            "subvencion", "codigo", "observaciones",
+        ), "")
+        fila.update(rnd.choice(personas))
+        fila["timestamp"] = timestamp
+        fila["tipo_novedad"] = tipo
+        fila["horas_catedras"] = 0.0
+
+        if tipo == "Alta":
+            fila.update(_datos_alta(rnd, fila, dia))
+        elif tipo == "Baja":
+            fila["fecha_baja"] = dia.isoformat()
+            fila["motivo_baja"] = rnd.choice(MOTIVOS_BAJA)
+        elif tipo == "Reemplazo":
+            if rnd.random() < 0.5:
+                fila["reemplazo_persona_ya_trabaja"] = "Si"
+                fila["reemplazo_cargo_que_cubre"] = rnd.choice(CARGOS_DOCENTE)
+                fila["fecha_inicio_reemplazo"] = dia.isoformat()
+                fila["fecha_fin_reemplazo"] = (dia + timedelta(days=rnd.randrange(7, 120))).isoformat()
+            else:
+                fila["reemplazo_persona_ya_trabaja"] = "No"
+                fila.update(_datos_alta(rnd, fila, dia))
+        else:
+            fila["tipo_otro"] = rnd.choice(TIPOS_OTRO)
+            fila["observaciones"] = rnd.choice(("", "", "Según nota de dirección", "Con certificado"))
+
+        yield fila
@@ -0,0 +1,97 @@
+"""
+Búsqueda de texto completo en todas las novedades (todos los períodos).
+
+Busca en nombre, cargo, cargos actuales, motivo de baja y observaciones, sin
+distinguir mayúsculas ni acentos ("Nuñez" encuentra "NUNEZ" y viceversa), y
+cada palabra vale como prefijo ("gonz" encuentra "González").
+
+- PostgreSQL: columna `busqueda` (tsvector generado) con índice GIN, ranking
+  con ts_rank_cd pesando más el nombre que el cargo y las observaciones.
+- SQLite: tabla FTS5 `novedades_fts` sincronizada con triggers, ranking bm25.
+  Los períodos archivados se buscan en el índice del archivo (UNION ALL).
+
+El índice se mantiene solo (columna generada / triggers) en cualquier
+INSERT o UPDATE, también en las cargas masivas. Ver migración 9.
+"""
+import re
+import unicodedata
+
+from sqlalchemy import Float, text
+
+from modelos import Novedad
+from particiones import ESQUEMA_ARCHIVO, hay_archivo
+
+# Columnas que se devuelven en cada resultado
+COLUMNAS_RESULTADO = (
+    "id", "timestamp", "periodo", "legajo", "legajo_norm", "nombre", "tipo_empleado",
+    "tipo_novedad", "nivel", "cargo", "motivo_baja", "observaciones",
+)
+# Pesos de bm25 (SQLite) en el orden de las columnas de novedades_fts
+PESOS_BM25 = (10.0, 4.0, 4.0, 2.0, 1.0)
+# Palabras de la búsqueda que se tienen en cuenta
+MAX_TERMINOS = 8
+
+
+def terminos(texto):
+    """
+    Palabras de la búsqueda en minúscula y sin acentos. Como solo quedan
+    letras y dígitos, no hay forma de inyectar sintaxis de tsquery o FTS5.
+    """
+    sin_acentos = "".join(
+        c for c in unicodedata.normalize("NFKD", texto or "") if not unicodedata.combining(c)
+    )
+    return re.findall(r"\w+", sin_acentos.lower())[:MAX_TERMINOS]
+
+
+def buscar_novedades(session, texto, limite, desplazamiento=0, periodo=None):
+    """
+    Novedades que contienen todas las palabras buscadas, de la más a la menos
+    relevante (a igual relevancia, las más recientes primero).
+
+    Args:
+        session: Sesión de SQLAlchemy
+        texto: Texto tal como lo escribió el usuario
+        limite: Cantidad máxima de resultados
+        desplazamiento: Resultados a saltear (paginación)
+        periodo: Limitar a una clave YYYY-MM (por defecto, todos los períodos)
+
+    Returns:
+        Lista de filas (COLUMNAS_RESULTADO + "rango"); vacía si no hay palabras
+    """
+    palabras = terminos(texto)
+    if not palabras:
+        return []
+
+    columnas = ", ".join(f'n."{c}"' for c in COLUMNAS_RESULTADO)
+    filtro_periodo = "AND n.periodo = :periodo" if periodo else ""
+    parametros = {"limite": limite, "desplazamiento": desplazamiento, "periodo": periodo}
+
+    if session.get_bind().dialect.name == "postgresql":
+        parametros["consulta"] = " & ".join(f"{p}:*" for p in palabras)
+        sql = (
+            f"SELECT {columnas}, ts_rank_cd(n.busqueda, q) AS rango "
+            f"FROM novedades n, to_tsquery('spanish', :consulta) q "
+            f"WHERE n.busqueda @@ q {filtro_periodo} "
+            f"ORDER BY rango DESC, n.\"timestamp\" DESC, n.id DESC "
+            f"LIMIT :limite OFFSET :desplazamiento"
+        )
+    else:
+        parametros["consulta"] = " ".join(f'"{p}"*' for p in palabras)
+        pesos = ", ".join(str(p) for p in PESOS_BM25)
+        # Los períodos archivados tienen su propio índice en el archivo adjunto
+        esquemas = ("main", ESQUEMA_ARCHIVO) if hay_archivo(session) else ("main",)
+        # bm25 es negativo: cuanto menor, más relevante
+        sql = " UNION ALL ".join(
+            f"SELECT {columnas}, -bm25(novedades_fts, {pesos}) AS rango "
+            f"FROM {esquema}.novedades_fts JOIN {esquema}.novedades n ON n.id = novedades_fts.rowid "
+            f"WHERE novedades_fts MATCH :consulta {filtro_periodo}"
+            for esquema in esquemas
+        ) + (
+            ' ORDER BY rango DESC, "timestamp" DESC, id DESC '
+            "LIMIT :limite OFFSET :desplazamiento"
+        )
+
+    # Tipos de las columnas del modelo (timestamp como datetime también en SQLite)
+    tipos = [Novedad.__table__.c[c] for c in COLUMNAS_RESULTADO]
+    consulta = text(sql).columns(*tipos, rango=Float)
+    return session.execute(consulta, parametros).all()
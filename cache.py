@@ -0,0 +1,181 @@
+"""
+Cache de resultados por período de liquidación.
+
+Cada período tiene un número de versión, guardado en la base (tabla
+versiones_periodos), que se incrementa en la misma transacción que cada
+escritura de una novedad de ese período. Las claves del cache incluyen la
+versión, así que una escritura invalida todo lo cacheado del período sin
+tener que buscar ni borrar entradas: las viejas simplemente dejan de pedirse
+y salen del LRU. Como la versión se lee de la base, todos los workers (y los
+comandos de `flask`) ven las mismas versiones. La versión también identifica
+el Excel precalculado del período y su ETag.
+
+Backends:
+- MemoriaBackend (por defecto): LRU dentro de cada proceso.
+- RedisBackend: una sola copia de cada resultado para todos los workers e
+  instancias. Se activa con la variable de entorno CACHE_URL=redis://...
+  (requiere el paquete redis).
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from flask import g
+from sqlalchemy import select, text
+
+from modelos import VersionPeriodo
+
+# Entradas máximas del LRU en memoria (se cuentan entradas, no bytes: no
+# guardar resultados grandes, ver get_pagina_novedades)
+MAX_ENTRADAS = 256
+
+
+# ============================================================================
+# BACKENDS
+# ============================================================================
+class MemoriaBackend:
+    """LRU en memoria del proceso, seguro entre threads"""
+
+    def __init__(self, max_entradas=MAX_ENTRADAS):
+        self.max_entradas = max_entradas
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, clave):
+        with self._lock:
+            if clave not in self._datos:
+                return None
+            self._datos.move_to_end(clave)
+            return self._datos[clave]
+
+    def set(self, clave, valor):
+        with self._lock:
+            self._datos[clave] = valor
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+
+class RedisBackend:
+    """Cache compartido en Redis (los valores se guardan con pickle)"""
+
+    PREFIJO = "novedades:"
+
+    def __init__(self, url, ttl=24 * 3600):
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self.ttl = ttl
+
+    def get(self, clave):
+        valor = self._redis.get(self.PREFIJO + clave)
+        return pickle.loads(valor) if valor is not None else None
+
+    def set(self, clave, valor):
+        self._redis.set(self.PREFIJO + clave, pickle.dumps(valor), ex=self.ttl)
+
+
+def crear_backend(url=None, max_entradas=MAX_ENTRADAS):
+    """Crea el backend según la URL configurada (vacía = memoria del proceso)"""
+    if url and url.startswith(("redis://", "rediss://")):
+        return RedisBackend(url)
+    return MemoriaBackend(max_entradas)
+
+
+# ============================================================================
+# VERSIONES POR PERÍODO
+# ============================================================================
+def version_periodo(conexion, periodo):
+    """Versión actual de los datos del período (0 si nunca se escribió)"""
+    return conexion.scalar(select(VersionPeriodo.version).where(VersionPeriodo.periodo == periodo)) or 0
+
+
+def incrementar_versiones(conexion, periodos):
+    """
+    Incrementa la versión de los períodos dentro de la transacción en curso
+    (el commit lo hace quien llama, junto con la escritura).
+
+    La primera versión de un período es el instante actual en milisegundos,
+    para no repetir la de una base anterior: el Excel precalculado queda en
+    disco con la versión en el nombre.
+
+    Args:
+        conexion: Sesión o conexión de SQLAlchemy
+        periodos: Claves YYYY-MM de los períodos modificados
+    """
+    inicial = time.time_ns() // 1_000_000
+    # Siempre en el mismo orden, para que dos transacciones no se bloqueen mutuamente
+    filas = [{"periodo": periodo, "inicial": inicial} for periodo in sorted(set(periodos))]
+    if filas:
+        conexion.execute(text(
+            "INSERT INTO versiones_periodos (periodo, version) VALUES (:periodo, :inicial) "
+            "ON CONFLICT (periodo) DO UPDATE SET version = versiones_periodos.version + 1"
+        ), filas)
+
+
+# ============================================================================
+# CACHE POR PERÍODO
+# ============================================================================
+class CachePeriodos:
+    """Cache de resultados con invalidación por versión de período"""
+
+    def __init__(self, session, backend=None, activo=True):
+        self.session = session
+        self.backend = backend or MemoriaBackend()
+        self.activo = activo
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, periodo):
+        """Versión actual de los datos del período (se lee de la base una vez por petición)"""
+        versiones = g.setdefault("versiones_periodos", {})
+        if periodo not in versiones:
+            versiones[periodo] = version_periodo(self.session, periodo)
+        return versiones[periodo]
+
+    def invalidar(self, *periodos):
+        """Incrementa la versión de los períodos (llamar antes del commit de la escritura)"""
+        incrementar_versiones(self.session, periodos)
+        versiones = g.get("versiones_periodos", {})
+        for periodo in periodos:
+            versiones.pop(periodo, None)
+
+    def obtener(self, periodo, clave, calcular):
+        """
+        Devuelve el resultado cacheado para (período, versión actual, clave) o
+        lo calcula y lo guarda.
+
+        Los resultados se comparten entre peticiones: no hay que modificarlos.
+
+        Args:
+            periodo: Clave del período (YYYY-MM)
+            clave: Texto que identifica la consulta dentro del período
+            calcular: Función sin argumentos que obtiene el resultado de la base
+        """
+        if not self.activo:
+            return calcular()
+
+        # La versión se lee ANTES de consultar: si hay una escritura en el
+        # medio, el resultado queda guardado bajo la versión vieja y no se usa
+        clave_completa = f"{periodo}:{self.version(periodo)}:{clave}"
+        resultado = self.backend.get(clave_completa)
+        if resultado is not None:
+            self.hits += 1
+            return resultado
+
+        self.misses += 1
+        resultado = calcular()
+        self.backend.set(clave_completa, resultado)
+        return resultado
+
+    def estadisticas(self):
+        """Contadores de aciertos y fallos del cache de este proceso"""
+        total = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "activo": self.activo,
+            "hits": self.hits,
+            "misses": self.misses,
+            "ratio_hits": round(self.hits / total, 4) if total else 0.0,
+        }
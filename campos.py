@@ -0,0 +1,256 @@
+"""
+Registro declarativo de los campos de una novedad.
+
+Cada campo se declara una sola vez con su tipo y su etiqueta; de ahí salen
+la normalización de lo que llega del formulario, la API o la importación, los
+encabezados y formatos de los exports y las columnas de cada vista de /ver.
+
+El registro se "compila" al importar el módulo: se agrupan los campos por tipo
+en tuplas planas, así que normalizar una novedad o formatear una fila es un
+recorrido directo sin decidir nada por campo en cada petición.
+"""
+
+
+# ============================================================================
+# TIPOS
+# ============================================================================
+TEXTO = "texto"
+FECHA = "fecha"          # Texto YYYY-MM-DD (DD/MM/YYYY se acepta y se convierte)
+DECIMAL = "decimal"      # Float; acepta coma decimal
+ENTERO = "entero"
+TIMESTAMP = "timestamp"  # Fecha de carga (la pone el servidor, no el formulario)
+
+
+class Campo:
+    """Un campo de la novedad: columna de Novedad, tipo y etiqueta para mostrar/exportar"""
+
+    __slots__ = ("nombre", "tipo", "etiqueta")
+
+    def __init__(self, nombre, tipo, etiqueta):
+        self.nombre = nombre
+        self.tipo = tipo
+        self.etiqueta = etiqueta
+
+    def __repr__(self):
+        return f"Campo({self.nombre!r}, {self.tipo!r})"
+
+
+# Campos en el orden de /ver y de los exports
+CAMPOS = (
+    # Datos básicos
+    Campo("timestamp", TIMESTAMP, "Fecha Carga"),
+    Campo("legajo", TEXTO, "Legajo"),
+    Campo("nombre", TEXTO, "Nombre y Apellido"),
+    Campo("tipo_empleado", TEXTO, "Tipo Empleado"),
+    Campo("tipo_novedad", TEXTO, "Tipo Novedad"),
+    # Datos personales
+    Campo("fecha_nacimiento", FECHA, "Fecha Nacimiento"),
+    Campo("dni", TEXTO, "DNI"),
+    Campo("cuil", TEXTO, "CUIL"),
+    Campo("cbu", TEXTO, "CBU"),
+    Campo("banco", TEXTO, "Banco"),
+    Campo("domicilio", TEXTO, "Domicilio"),
+    Campo("email", TEXTO, "Email"),
+    Campo("obra_social", TEXTO, "Obra Social"),
+    # Datos del alta
+    Campo("nivel", TEXTO, "Nivel"),
+    Campo("fecha_alta", FECHA, "Fecha Alta"),
+    Campo("cargo", TEXTO, "Cargo"),
+    Campo("caracter_del_cargo", TEXTO, "Carácter Cargo"),
+    # Decretos
+    Campo("trabaja_otra_institucion", TEXTO, "Trabaja Otra Inst"),
+    Campo("tipo_institucion", TEXTO, "Tipo Institución"),
+    Campo("horas_catedras", DECIMAL, "Horas Cátedras"),
+    # Datos laborales
+    Campo("subvencionado", TEXTO, "Subvencionado"),
+    Campo("asignaciones_familiares", TEXTO, "Asig. Familiares"),
+    Campo("cantidad_hijos", ENTERO, "Cantidad Hijos"),
+    # Datos de reemplazo
+    Campo("reemplazo_persona_ya_trabaja", TEXTO, "Ya Trabaja"),
+    Campo("reemplazo_cargo_que_cubre", TEXTO, "Cargo que Cubre"),
+    Campo("fecha_inicio_reemplazo", FECHA, "Inicio Reemplazo"),
+    Campo("fecha_fin_reemplazo", FECHA, "Fin Reemplazo"),
+    # Datos de baja
+    Campo("fecha_baja", FECHA, "Fecha Baja"),
+    Campo("motivo_baja", TEXTO, "Motivo Baja"),
+    # Otros
+    Campo("tipo_otro", TEXTO, "Tipo Otro"),
+    # Información adicional
+    Campo("cargos_actuales", TEXTO, "Cargos Actuales"),
+    Campo("tipo_movimiento", TEXTO, "Tipo Movimiento"),
+    Campo("subvencion", TEXTO, "Subvención"),
+    Campo("codigo", TEXTO, "Código"),
+    Campo("observaciones", TEXTO, "Observaciones"),
+)
+
+
+# ============================================================================
+# NORMALIZADORES (entrada)
+# ============================================================================
+def fecha_iso(valor):
+    """Pasa DD/MM/YYYY a YYYY-MM-DD; cualquier otro texto queda igual"""
+    if len(valor) == 10 and valor[2] == "/" and valor[5] == "/":
+        return f"{valor[6:]}-{valor[3:5]}-{valor[:2]}"
+    return valor
+
+
+def _decimal(texto):
+    return float(texto.replace(",", ".")) if texto else 0.0
+
+
+def _entero(texto):
+    return int(texto) if texto else 0
+
+
+# Conversión y mensaje de error de los campos numéricos
+_NUMERICOS = {
+    DECIMAL: (_decimal, 0.0, "{} debe ser un número válido."),
+    ENTERO: (_entero, 0, "{} debe ser un número entero."),
+}
+
+
+# ============================================================================
+# FORMATOS (salida)
+# ============================================================================
+def format_date(date_str):
+    """Convierte fechas de YYYY-MM-DD a DD/MM/YYYY"""
+    if not date_str:
+        return ""
+    if len(date_str) == 10 and date_str[4] == '-':
+        parts = date_str.split('-')
+        return f"{parts[2]}/{parts[1]}/{parts[0]}"
+    return date_str
+
+
+def format_number(num_value):
+    """Convierte números con punto decimal a coma"""
+    if num_value is None or num_value == 0 or num_value == 0.0:
+        return ""
+    return str(num_value).replace('.', ',')
+
+
+def format_timestamp(timestamp):
+    """Extrae solo la fecha del timestamp"""
+    if not timestamp:
+        return ""
+    return timestamp.strftime("%d/%m/%Y")
+
+
+def format_text(value):
+    """Texto tal cual (None como vacío)"""
+    return value or ""
+
+
+def format_int(value):
+    """Enteros como texto (0 como vacío)"""
+    return str(value) if value else ""
+
+
+FORMATO_POR_TIPO = {
+    TEXTO: format_text,
+    FECHA: format_date,
+    DECIMAL: format_number,
+    ENTERO: format_int,
+    TIMESTAMP: format_timestamp,
+}
+
+
+# ============================================================================
+# COMPILACIÓN DEL REGISTRO
+# ============================================================================
+# Campos que llegan como texto (todo lo que no es timestamp ni número)
+CAMPOS_TEXTO = tuple(c.nombre for c in CAMPOS if c.tipo in (TEXTO, FECHA))
+_CAMPOS_FECHA = tuple(c.nombre for c in CAMPOS if c.tipo == FECHA)
+_CAMPOS_NUMERICOS = tuple(
+    (c.nombre, *_NUMERICOS[c.tipo][:2], _NUMERICOS[c.tipo][2].format(c.etiqueta))
+    for c in CAMPOS if c.tipo in _NUMERICOS
+)
+# Campos que se pueden editar (todos menos la fecha de carga)
+CAMPOS_EDITABLES = tuple(c.nombre for c in CAMPOS if c.tipo != TIMESTAMP)
+
+# Exports: columna, encabezado y formato en el orden de CAMPOS
+COLUMNAS = tuple(c.nombre for c in CAMPOS)
+ENCABEZADOS = tuple(c.etiqueta for c in CAMPOS)
+# Solo las columnas que no son texto necesitan una función de formato
+_FORMATOS_ESPECIALES = tuple(
+    (indice, FORMATO_POR_TIPO[c.tipo]) for indice, c in enumerate(CAMPOS) if c.tipo != TEXTO
+)
+
+# ============================================================================
+# VISTAS DE /ver (conjuntos de columnas)
+# ============================================================================
+# Nombre → columnas que se muestran (y que se leen de la base) en /ver
+VISTAS = {
+    "General": (
+        "timestamp", "legajo", "nombre", "tipo_empleado", "tipo_novedad", "nivel", "cargo",
+        "observaciones",
+    ),
+    "Altas": (
+        "timestamp", "legajo", "nombre", "tipo_empleado", "nivel", "fecha_alta", "cargo",
+        "caracter_del_cargo", "trabaja_otra_institucion", "tipo_institucion", "horas_catedras",
+        "subvencionado",
+    ),
+    "Bajas": (
+        "timestamp", "legajo", "nombre", "tipo_empleado", "nivel", "cargo", "fecha_baja",
+        "motivo_baja", "observaciones",
+    ),
+    "Reemplazos": (
+        "timestamp", "legajo", "nombre", "tipo_empleado", "reemplazo_persona_ya_trabaja",
+        "reemplazo_cargo_que_cubre", "fecha_inicio_reemplazo", "fecha_fin_reemplazo",
+        "observaciones",
+    ),
+    "Datos personales": (
+        "timestamp", "legajo", "nombre", "fecha_nacimiento", "dni", "cuil", "domicilio", "email",
+        "obra_social", "asignaciones_familiares", "cantidad_hijos",
+    ),
+    "Datos bancarios": ("timestamp", "legajo", "nombre", "dni", "cuil", "cbu", "banco"),
+    "Todas": COLUMNAS,
+}
+VISTA_POR_DEFECTO = "General"
+
+# Vistas compiladas a tuplas de Campo (un nombre mal escrito falla al importar)
+_CAMPO_POR_NOMBRE = {c.nombre: c for c in CAMPOS}
+CAMPOS_POR_VISTA = {
+    vista: tuple(_CAMPO_POR_NOMBRE[nombre] for nombre in columnas)
+    for vista, columnas in VISTAS.items()
+}
+
+
+def normalizar_novedad(datos):
+    """
+    Convierte los datos recibidos (texto) en los valores que se guardan
+    (todos los campos menos timestamp).
+
+    Args:
+        datos: Diccionario o MultiDict con los campos como texto
+
+    Returns:
+        Tupla (registro, errores): registro con los campos normalizados y la
+        lista de mensajes de los números que no se pudieron convertir.
+    """
+    # Una sola copia a dict plano: MultiDict.get es bastante más lento que dict.get
+    get = dict(datos.items()).get
+    registro = {nombre: str(get(nombre) or "").strip() for nombre in CAMPOS_TEXTO}
+    for nombre in _CAMPOS_FECHA:
+        registro[nombre] = fecha_iso(registro[nombre])
+
+    errores = []
+    for nombre, convertir, vacio, mensaje in _CAMPOS_NUMERICOS:
+        try:
+            registro[nombre] = convertir(str(get(nombre) or "").strip())
+        except ValueError:
+            errores.append(mensaje)
+            registro[nombre] = vacio
+
+    return registro, errores
+
+
+def formatear_fila(fila):
+    """
+    Convierte una fila de la base (tupla en el orden de COLUMNAS) en la lista
+    de valores que se exportan.
+    """
+    valores = [valor or "" for valor in fila]
+    for indice, formato in _FORMATOS_ESPECIALES:
+        valores[indice] = formato(fila[indice])
+    return valores
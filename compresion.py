@@ -0,0 +1,77 @@
+"""
+Compresión gzip/brotli de las respuestas HTML, JSON y texto.
+
+Se comprime en un after_request cuando el cliente lo acepta (Accept-Encoding)
+y la respuesta vale la pena: no se tocan las respuestas en streaming (CSV),
+los archivos de send_file (XLSX, Parquet: ya van comprimidos o se mandan por
+partes) ni las respuestas chicas.
+
+brotli es opcional: si el paquete está instalado se prefiere cuando el
+cliente lo acepta; si no, se usa gzip de la biblioteca estándar. Con un proxy
+que ya comprime (nginx, Render), se apaga con COMPRESION_DESACTIVADA=1.
+"""
+import gzip
+import os
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # opcional
+    brotli = None
+
+MIMETYPES_COMPRIMIBLES = {
+    "text/html", "text/plain", "text/css", "application/json", "application/javascript",
+}
+# Por debajo de esto (bytes) la compresión no compensa
+TAMANO_MINIMO = 1024
+NIVEL_GZIP = 6
+CALIDAD_BROTLI = 5
+
+
+def _codificacion(accept_encodings):
+    """Codificación a usar según Accept-Encoding (None si no acepta ninguna)"""
+    if brotli is not None and accept_encodings["br"]:
+        return "br"
+    if accept_encodings["gzip"]:
+        return "gzip"
+    return None
+
+
+def comprimir(datos, codificacion):
+    """Comprime datos (bytes) con brotli ("br") o gzip"""
+    if codificacion == "br":
+        return brotli.compress(datos, quality=CALIDAD_BROTLI)
+    # mtime=0: mismo contenido, mismos bytes (no cambia en cada petición)
+    return gzip.compress(datos, compresslevel=NIVEL_GZIP, mtime=0)
+
+
+def registrar_compresion(app):
+    """Registra el after_request que comprime las respuestas"""
+    if os.environ.get("COMPRESION_DESACTIVADA"):
+        return
+
+    @app.after_request
+    def comprimir_respuesta(respuesta):
+        if (
+            respuesta.direct_passthrough
+            or respuesta.is_streamed
+            or respuesta.mimetype not in MIMETYPES_COMPRIMIBLES
+            or respuesta.status_code in (204, 304)
+            or "Content-Encoding" in respuesta.headers
+        ):
+            return respuesta
+
+        # El contenido depende de Accept-Encoding aunque esta vez no se comprima
+        respuesta.vary.add("Accept-Encoding")
+        codificacion = _codificacion(request.accept_encodings)
+        if codificacion is None or (respuesta.content_length or 0) < TAMANO_MINIMO:
+            return respuesta
+
+        respuesta.set_data(comprimir(respuesta.get_data(), codificacion))
+        respuesta.headers["Content-Encoding"] = codificacion
+        # Un ETag fuerte identifica bytes exactos: el comprimido es otro
+        etag, debil = respuesta.get_etag()
+        if etag and not debil:
+            respuesta.set_etag(etag, weak=True)
+        return respuesta
@@ -0,0 +1,151 @@
+"""
+Exportación de novedades a XLSX, CSV y Parquet.
+
+Todos los formatos usan los mismos encabezados y reglas de formato (del
+registro de campos.py, compilado en formatear_fila), y leen las filas de a
+lotes para que la memoria no dependa del tamaño del período.
+
+El libro XLSX se arma con openpyxl en modo write-only: cada fila se serializa al
+agregarla, así que la memoria no crece con la cantidad de filas. Los estilos
+son NamedStyle compartidos (los datos van sin estilo por celda, que en modo
+write-only duplica el costo de escritura).
+
+openpyxl y pyarrow se importan dentro de las funciones que los usan: cada
+worker los carga recién con su primer export de ese formato.
+"""
+import csv
+import io
+
+from campos import COLUMNAS, ENCABEZADOS, formatear_fila
+
+MIMETYPE_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+MIMETYPE_CSV = "text/csv"
+MIMETYPE_PARQUET = "application/vnd.apache.parquet"
+
+# Filas por bloque en CSV (texto enviado por vez) y Parquet (row group)
+FILAS_POR_BLOQUE = 1000
+
+# Ancho máximo de columna en el Excel
+ANCHO_MAXIMO = 50
+
+# Columnas con largo fijo una vez formateadas (no hace falta medirlas)
+ANCHOS_FIJOS = {'timestamp': len("DD/MM/YYYY")}
+
+
+# ============================================================================
+# XLSX
+# ============================================================================
+def _estilo_encabezado():
+    """Estilo con nombre compartido por las celdas de encabezado"""
+    from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
+
+    encabezado = NamedStyle(name="encabezado")
+    encabezado.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    encabezado.font = Font(bold=True, color="FFFFFF", size=11)
+    encabezado.alignment = Alignment(horizontal='center', vertical='center')
+    return encabezado
+
+
+def escribir_xlsx(filas, destino, largos=None):
+    """
+    Escribe el Excel de novedades en modo write-only.
+
+    Args:
+        filas: Iterable de filas de la base (tuplas en el orden de COLUMNAS)
+        destino: Ruta o archivo binario donde guardar el libro
+        largos: Diccionario {columna: largo máximo del contenido} para el
+            ancho de columnas. En modo write-only las columnas se escriben
+            antes que las filas, así que los largos se calculan por adelantado.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Novedades")
+    wb.add_named_style(_estilo_encabezado())
+
+    # Ancho de columnas: el mayor entre encabezado y contenido, con tope
+    largos = largos or {}
+    for col_num, (encabezado, columna) in enumerate(zip(ENCABEZADOS, COLUMNAS), 1):
+        largo = max(len(encabezado), largos.get(columna) or 0)
+        ws.column_dimensions[get_column_letter(col_num)].width = min(largo + 2, ANCHO_MAXIMO)
+
+    # Congelar primera fila (encabezados)
+    ws.freeze_panes = 'A2'
+
+    # Encabezados con estilo
+    encabezados = []
+    for encabezado in ENCABEZADOS:
+        celda = WriteOnlyCell(ws, value=encabezado)
+        celda.style = "encabezado"
+        encabezados.append(celda)
+    ws.append(encabezados)
+
+    # Datos: valores planos (openpyxl serializa cada fila al agregarla). Las
+    # celdas vacías se omiten en lugar de escribirse como texto vacío.
+    for fila in filas:
+        ws.append([valor or None for valor in formatear_fila(fila)])
+
+    wb.save(destino)
+
+
+# ============================================================================
+# CSV
+# ============================================================================
+def generar_csv(filas, filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Genera el CSV de novedades por bloques de texto, para enviarlo como
+    respuesta en streaming.
+
+    Args:
+        filas: Iterable de filas de la base (tuplas en el orden de COLUMNAS)
+        filas_por_bloque: Filas que se acumulan antes de emitir un bloque
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(ENCABEZADOS)
+
+    for numero, fila in enumerate(filas, 1):
+        writer.writerow(formatear_fila(fila))
+        if numero % filas_por_bloque == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+# ============================================================================
+# PARQUET
+# ============================================================================
+def escribir_parquet(filas, destino, filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Escribe las novedades en formato Parquet, un row group por bloque.
+
+    Requiere pyarrow (se importa acá para no cargarlo si no se usa).
+
+    Args:
+        filas: Iterable de filas de la base (tuplas en el orden de COLUMNAS)
+        destino: Ruta o archivo binario donde guardar el archivo
+        filas_por_bloque: Filas por row group
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(encabezado, pa.string()) for encabezado in ENCABEZADOS])
+
+    def escribir_bloque(writer, bloque):
+        # Transponer filas a columnas para armar el bloque columnar
+        columnas = [list(columna) for columna in zip(*bloque)] or [[] for _ in ENCABEZADOS]
+        writer.write_table(pa.Table.from_arrays(columnas, schema=schema))
+
+    with pq.ParquetWriter(destino, schema) as writer:
+        bloque = []
+        for fila in filas:
+            bloque.append(formatear_fila(fila))
+            if len(bloque) == filas_por_bloque:
+                escribir_bloque(writer, bloque)
+                bloque = []
+        if bloque:
+            escribir_bloque(writer, bloque)
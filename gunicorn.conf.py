@@ -0,0 +1,59 @@
+"""
+Configuración de gunicorn.
+
+gunicorn lee este archivo automáticamente desde el directorio de trabajo; la
+aplicación sale de la factory (Procfile: `gunicorn "app:crear_app()"`).
+
+Con preload_app (por defecto; GUNICORN_PRELOAD=0 lo apaga) el master importa
+y crea la aplicación una sola vez y los workers la heredan al hacer fork, así
+que el código, las plantillas compiladas y los módulos importados se
+comparten entre workers (copy-on-write) en lugar de cargarse en cada uno.
+"""
+import gc
+import os
+
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+
+
+def on_starting(server):
+    """Aplica las migraciones pendientes una sola vez, en el proceso master,
+    antes de levantar los workers."""
+    from app import crear_app
+    from modelos import db
+    from migraciones import aplicar_migraciones
+
+    # Con preload es la misma aplicación que van a servir los workers
+    app = server.app.wsgi() if server.cfg.preload_app else crear_app()
+    with app.app_context():
+        aplicadas = aplicar_migraciones(db.engine)
+        # No heredar conexiones abiertas del master en los workers
+        db.engine.dispose()
+
+    if aplicadas:
+        server.log.info("Migraciones aplicadas: %s", ", ".join(str(v) for v in aplicadas))
+    else:
+        server.log.info("Esquema de base de datos actualizado")
+
+
+def when_ready(server):
+    """Deja el master listo para compartir memoria con los workers"""
+    if not server.cfg.preload_app:
+        return
+    app = server.app.wsgi()
+    # Compilar las plantillas una vez acá y no en cada worker
+    for nombre in app.jinja_env.list_templates(extensions=["html"]):
+        app.jinja_env.get_template(nombre)
+    # Los objetos que existen hasta acá no los vuelve a recorrer el recolector:
+    # si lo hiciera, tocaría sus páginas y cada worker terminaría con su copia
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """El pool del master no se usa en el worker (close=False: no cerrar las del master)"""
+    from modelos import db
+
+    if not server.cfg.preload_app:
+        return
+    with server.app.wsgi().app_context():
+        db.engine.dispose(close=False)
@@ -0,0 +1,166 @@
+"""
+Importación masiva de novedades desde archivos CSV o XLSX.
+
+Los archivos se leen fila por fila (sin cargarlos enteros en memoria), cada
+fila pasa por las mismas validaciones que el formulario de /enviar y las
+válidas se guardan por lotes con un INSERT ejecutado como executemany.
+
+Se aceptan como encabezados tanto los nombres de columna de la tabla
+(como en novedades.csv) como los encabezados del Excel de /descargar.
+"""
+import csv
+import io
+from datetime import date, datetime
+
+from campos import CAMPOS, fecha_iso
+from periodos import clave_de_fecha
+from validaciones import validar_novedad
+
+# Filas por INSERT en la importación
+TAMANO_LOTE = 1000
+
+EXTENSIONES = (".csv", ".xlsx")
+
+# Encabezado del archivo (nombre de columna o etiqueta del export) → columna
+_COLUMNA_POR_ENCABEZADO = {campo.etiqueta.lower(): campo.nombre for campo in CAMPOS}
+_COLUMNA_POR_ENCABEZADO.update({campo.nombre: campo.nombre for campo in CAMPOS})
+
+
+# ============================================================================
+# LECTURA DE ARCHIVOS
+# ============================================================================
+def leer_archivo(archivo, nombre):
+    """
+    Lee un archivo CSV o XLSX de novedades.
+
+    Args:
+        archivo: Archivo binario abierto (o stream de un upload)
+        nombre: Nombre del archivo (define el formato por la extensión)
+
+    Returns:
+        Iterador de tuplas (número de fila, diccionario {columna: valor})
+
+    Raises:
+        ValueError: Si la extensión no es .csv ni .xlsx
+    """
+    nombre = (nombre or "").lower()
+    if nombre.endswith(".csv"):
+        return _leer_csv(archivo)
+    if nombre.endswith(".xlsx"):
+        return _leer_xlsx(archivo)
+    raise ValueError(f"Formato no soportado (se acepta {' o '.join(EXTENSIONES)}).")
+
+
+def _mapear_encabezados(encabezados):
+    """Devuelve la columna de la tabla para cada encabezado (None si se ignora)"""
+    return [_COLUMNA_POR_ENCABEZADO.get(str(e or "").strip().lower()) for e in encabezados]
+
+
+def _leer_csv(archivo):
+    texto = io.TextIOWrapper(archivo, encoding="utf-8-sig", newline="")
+    lector = csv.reader(texto)
+    try:
+        columnas = _mapear_encabezados(next(lector, []))
+        for numero, valores in enumerate(lector, 2):
+            yield numero, {c: v for c, v in zip(columnas, valores) if c}
+    except UnicodeDecodeError:
+        raise ValueError("El archivo CSV debe estar codificado en UTF-8.")
+
+
+def _leer_xlsx(archivo):
+    from zipfile import BadZipFile
+    from openpyxl import load_workbook
+
+    try:
+        wb = load_workbook(archivo, read_only=True, data_only=True)
+    except (BadZipFile, KeyError):
+        raise ValueError("El archivo no es un XLSX válido.")
+    try:
+        filas = wb.worksheets[0].iter_rows(values_only=True)
+        columnas = _mapear_encabezados(next(filas, ()))
+        for numero, valores in enumerate(filas, 2):
+            yield numero, {c: _valor_celda(v) for c, v in zip(columnas, valores) if c}
+    finally:
+        wb.close()
+
+
+def _valor_celda(valor):
+    """Convierte el valor de una celda de Excel al texto que espera el formulario"""
+    if valor is None:
+        return ""
+    if isinstance(valor, datetime):
+        return valor.isoformat(sep=" ") if valor.time() != datetime.min.time() else valor.date().isoformat()
+    if isinstance(valor, date):
+        return valor.isoformat()
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor)
+
+
+def _parsear_timestamp(valor):
+    """Interpreta la fecha de carga (ISO o DD/MM/YYYY). None si no se puede."""
+    try:
+        return datetime.fromisoformat(fecha_iso(valor.strip()))
+    except ValueError:
+        return None
+
+
+# ============================================================================
+# IMPORTACIÓN
+# ============================================================================
+def importar_novedades(filas, guardar_lote, tamano_lote=TAMANO_LOTE, archivado=None):
+    """
+    Valida y guarda novedades por lotes.
+
+    Args:
+        filas: Iterador de (número de fila, diccionario) como el de leer_archivo
+        guardar_lote: Función que recibe una lista de registros y los inserta
+        tamano_lote: Registros válidos por INSERT
+        archivado: Función que recibe una clave YYYY-MM y devuelve True si el
+            período está archivado (solo lectura): sus filas se rechazan
+
+    Returns:
+        Diccionario con 'procesadas', 'insertadas' y 'errores' (lista de
+        {'fila': número, 'errores': [mensajes]})
+    """
+    ahora = datetime.now().replace(microsecond=0)
+    resultado = {"procesadas": 0, "insertadas": 0, "errores": []}
+    lote = []
+    # Una consulta por período, no por fila
+    archivados = {}
+
+    for numero, datos in filas:
+        # Las filas completamente vacías se ignoran
+        if not any(str(v).strip() for v in datos.values()):
+            continue
+        resultado["procesadas"] += 1
+
+        registro, errores = validar_novedad(datos)
+
+        # Fecha de carga: la del archivo si viene (datos históricos), si no ahora
+        timestamp_str = str(datos.get("timestamp") or "").strip()
+        registro["timestamp"] = _parsear_timestamp(timestamp_str) if timestamp_str else ahora
+        if registro["timestamp"] is None:
+            errores.append(f"Fecha de carga inválida: '{timestamp_str}'.")
+        elif archivado is not None:
+            clave = clave_de_fecha(registro["timestamp"])
+            if clave not in archivados:
+                archivados[clave] = archivado(clave)
+            if archivados[clave]:
+                errores.append(f"El período {clave} está archivado (solo lectura).")
+
+        if errores:
+            resultado["errores"].append({"fila": numero, "errores": errores})
+            continue
+
+        lote.append(registro)
+        if len(lote) >= tamano_lote:
+            guardar_lote(lote)
+            resultado["insertadas"] += len(lote)
+            lote = []
+
+    if lote:
+        guardar_lote(lote)
+        resultado["insertadas"] += len(lote)
+
+    return resultado
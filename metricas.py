@@ -0,0 +1,281 @@
+"""
+Métricas de rendimiento en formato Prometheus (/metrics).
+
+Se miden, con costo mínimo por petición (un par de sumas bajo un lock):
+- Latencia de cada ruta (histograma) y cantidad de respuestas por estado.
+- Consultas SQL por petición y tiempo total de SQL por petición, con los
+  eventos before/after_cursor_execute del engine.
+- Duración de cada consulta y log de las que superan METRICAS_SQL_LENTA_MS.
+- Filas de novedades leídas de la base por las páginas de /ver y los exports.
+- Tiempo y bytes de cada export y duración de los trabajos en segundo plano.
+
+Los valores son del proceso: con varios workers de gunicorn, Prometheus
+debe scrapear cada uno (o sumar por instancia), igual que con el cache.
+"""
+import bisect
+import logging
+import os
+import threading
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+# Las consultas que tardan más que esto se loguean como lentas
+SQL_LENTA_MS = int(os.environ.get("METRICAS_SQL_LENTA_MS", 500))
+
+# Largo máximo de la sentencia en el log de consultas lentas
+LARGO_SENTENCIA_LOG = 500
+
+BUCKETS_SEGUNDOS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+BUCKETS_CANTIDAD = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+BUCKETS_FILAS = (0, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+BUCKETS_BYTES = (10_000, 100_000, 1_000_000, 10_000_000, 100_000_000, 1_000_000_000)
+
+MIMETYPE_PROMETHEUS = "text/plain; version=0.0.4"
+
+log_sql = logging.getLogger("novedades.sql")
+
+
+# ============================================================================
+# TIPOS DE MÉTRICA
+# ============================================================================
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _etiquetas_texto(nombres, valores, extra=""):
+    """Etiquetas en formato {nombre="valor",...} (vacío si no hay)"""
+    pares = [f'{nombre}="{_escapar(valor)}"' for nombre, valor in zip(nombres, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+class Contador:
+    """Contador que solo crece, opcionalmente con etiquetas"""
+
+    tipo = "counter"
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, valor=1, **etiquetas):
+        clave = tuple(etiquetas[e] for e in self.etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + valor
+
+    def muestras(self):
+        with self._lock:
+            valores = list(self._valores.items())
+        for clave, valor in sorted(valores):
+            yield f"{self.nombre}{_etiquetas_texto(self.etiquetas, clave)} {valor}"
+
+
+class Histograma:
+    """Histograma con buckets fijos, opcionalmente con etiquetas"""
+
+    tipo = "histogram"
+
+    def __init__(self, nombre, ayuda, buckets, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.buckets = tuple(buckets)
+        self.etiquetas = tuple(etiquetas)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor, **etiquetas):
+        clave = tuple(etiquetas[e] for e in self.etiquetas)
+        indice = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(clave)
+            if serie is None:
+                # [conteo por bucket (+Inf al final), suma, cantidad]
+                serie = self._series[clave] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            serie[0][indice] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def muestras(self):
+        with self._lock:
+            series = [
+                (clave, list(conteos), suma, total)
+                for clave, (conteos, suma, total) in self._series.items()
+            ]
+        for clave, conteos, suma, total in sorted(series):
+            acumulado = 0
+            for limite, conteo in zip(self.buckets + ("+Inf",), conteos):
+                acumulado += conteo
+                le = _etiquetas_texto(self.etiquetas, clave, f'le="{limite}"')
+                yield f"{self.nombre}_bucket{le} {acumulado}"
+            etiquetas = _etiquetas_texto(self.etiquetas, clave)
+            yield f"{self.nombre}_sum{etiquetas} {suma}"
+            yield f"{self.nombre}_count{etiquetas} {total}"
+
+
+class Registro:
+    """Conjunto de métricas expuestas en /metrics"""
+
+    def __init__(self):
+        self._metricas = []
+
+    def contador(self, nombre, ayuda, etiquetas=()):
+        metrica = Contador(nombre, ayuda, etiquetas)
+        self._metricas.append(metrica)
+        return metrica
+
+    def histograma(self, nombre, ayuda, buckets, etiquetas=()):
+        metrica = Histograma(nombre, ayuda, buckets, etiquetas)
+        self._metricas.append(metrica)
+        return metrica
+
+    def exponer(self):
+        """Texto en el formato de exposición de Prometheus"""
+        lineas = []
+        for metrica in self._metricas:
+            lineas.append(f"# HELP {metrica.nombre} {metrica.ayuda}")
+            lineas.append(f"# TYPE {metrica.nombre} {metrica.tipo}")
+            lineas.extend(metrica.muestras())
+        return "\n".join(lineas) + "\n"
+
+
+# ============================================================================
+# MÉTRICAS DE LA APLICACIÓN
+# ============================================================================
+registro = Registro()
+
+PETICIONES = registro.contador(
+    "novedades_http_requests_total", "Respuestas por ruta, método y estado",
+    ("ruta", "metodo", "estado"),
+)
+LATENCIA = registro.histograma(
+    "novedades_http_request_duration_seconds", "Latencia de cada petición por ruta",
+    BUCKETS_SEGUNDOS, ("ruta", "metodo"),
+)
+SQL_POR_PETICION = registro.histograma(
+    "novedades_sql_queries_per_request", "Consultas SQL ejecutadas en cada petición",
+    BUCKETS_CANTIDAD, ("ruta",),
+)
+SQL_SEGUNDOS_POR_PETICION = registro.histograma(
+    "novedades_sql_seconds_per_request", "Tiempo total de SQL en cada petición",
+    BUCKETS_SEGUNDOS, ("ruta",),
+)
+SQL_DURACION = registro.histograma(
+    "novedades_sql_query_duration_seconds", "Duración de cada consulta SQL (incluye segundo plano)",
+    BUCKETS_SEGUNDOS,
+)
+SQL_LENTAS = registro.contador(
+    "novedades_sql_slow_queries_total", f"Consultas que superaron {SQL_LENTA_MS} ms",
+)
+FILAS_LEIDAS = registro.histograma(
+    "novedades_rows_read", "Filas de novedades leídas de la base por consulta (pagina, export)",
+    BUCKETS_FILAS, ("consulta",),
+)
+EXPORT_DURACION = registro.histograma(
+    "novedades_export_duration_seconds", "Tiempo de armado de cada export por formato",
+    BUCKETS_SEGUNDOS, ("formato",),
+)
+EXPORT_BYTES = registro.histograma(
+    "novedades_export_bytes", "Tamaño de cada export por formato",
+    BUCKETS_BYTES, ("formato",),
+)
+TRABAJOS = registro.contador(
+    "novedades_jobs_total", "Trabajos en segundo plano terminados por tipo y estado",
+    ("tipo", "estado"),
+)
+TRABAJOS_DURACION = registro.histograma(
+    "novedades_job_duration_seconds", "Duración de cada trabajo en segundo plano",
+    BUCKETS_SEGUNDOS, ("tipo",),
+)
+
+
+def observar_export(formato, segundos, tamano):
+    """Registra la duración y el tamaño (bytes) de un export"""
+    EXPORT_DURACION.observar(segundos, formato=formato)
+    EXPORT_BYTES.observar(tamano, formato=formato)
+
+
+def medir_stream(formato, bloques):
+    """
+    Envuelve un generador de texto (export en streaming) y registra el tiempo
+    y los bytes al terminar de enviarlo.
+    """
+    inicio = time.perf_counter()
+    tamano = 0
+    for bloque in bloques:
+        tamano += len(bloque.encode("utf-8"))
+        yield bloque
+    observar_export(formato, time.perf_counter() - inicio, tamano)
+
+
+def contar_filas(consulta, filas):
+    """
+    Envuelve un iterable de filas (export por lotes) y registra cuántas se
+    leyeron al terminar de recorrerlo.
+    """
+    cantidad = 0
+    for cantidad, fila in enumerate(filas, 1):
+        yield fila
+    FILAS_LEIDAS.observar(cantidad, consulta=consulta)
+
+
+# ============================================================================
+# INSTRUMENTACIÓN
+# ============================================================================
+def instrumentar(app, db):
+    """Registra los hooks de Flask y los eventos SQL que alimentan las métricas"""
+
+    @app.before_request
+    def iniciar_medicion():
+        g.metricas_inicio = time.perf_counter()
+        g.metricas_sql = [0, 0.0]  # [consultas, segundos]
+
+    @app.after_request
+    def registrar_peticion(respuesta):
+        inicio = g.pop("metricas_inicio", None)
+        if inicio is None:
+            return respuesta
+        ruta = request.endpoint or "sin_ruta"
+        LATENCIA.observar(time.perf_counter() - inicio, ruta=ruta, metodo=request.method)
+        PETICIONES.incrementar(ruta=ruta, metodo=request.method, estado=respuesta.status_code)
+        consultas, segundos = g.pop("metricas_sql", (0, 0.0))
+        SQL_POR_PETICION.observar(consultas, ruta=ruta)
+        SQL_SEGUNDOS_POR_PETICION.observar(segundos, ruta=ruta)
+        return respuesta
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def antes_de_consulta(conexion, _cursor, _sentencia, _parametros, _contexto, _executemany):
+        conexion.info.setdefault("metricas_inicio", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def despues_de_consulta(conexion, _cursor, sentencia, _parametros, _contexto, _executemany):
+        segundos = time.perf_counter() - conexion.info["metricas_inicio"].pop()
+        SQL_DURACION.observar(segundos)
+
+        if has_request_context() and "metricas_sql" in g:
+            g.metricas_sql[0] += 1
+            g.metricas_sql[1] += segundos
+
+        if segundos * 1000 >= SQL_LENTA_MS:
+            SQL_LENTAS.incrementar()
+            # Sin parámetros: pueden tener datos personales
+            log_sql.warning(
+                "Consulta lenta (%.0f ms) en %s: %s", segundos * 1000,
+                request.endpoint if has_request_context() else "segundo plano",
+                " ".join(sentencia.split())[:LARGO_SENTENCIA_LOG],
+            )
+
+    @event.listens_for(engine, "handle_error")
+    def error_de_consulta(contexto):
+        # La consulta falló: descartar su inicio para no desalinear la pila
+        conexion = contexto.connection
+        if conexion is not None and conexion.info.get("metricas_inicio"):
+            conexion.info["metricas_inicio"].pop()
@@ -0,0 +1,541 @@
+"""
+Migraciones versionadas del esquema de la base de datos.
+
+Cada migración es una función que recibe una conexión abierta (dentro de una
+transacción) y aplica los cambios de su versión. Las versiones aplicadas se
+registran en la tabla `schema_version`, así que correr el migrador varias
+veces es seguro: solo se ejecutan las pendientes.
+
+Se ejecuta al arrancar (comando `flask migrar` o hook de gunicorn), nunca
+durante una petición.
+"""
+from datetime import datetime
+
+from sqlalchemy import (
+    MetaData, Table, Column, Index, BigInteger, Integer, String, Float, Text, DateTime, text
+)
+
+from periodos import Periodo
+from particiones import ESQUEMA_ARCHIVO, asegurar_particiones
+from validaciones import huella_novedad, solo_digitos
+
+TABLA_VERSION = "schema_version"
+
+# Clave arbitraria para el advisory lock de PostgreSQL (evita que dos procesos
+# que arrancan a la vez apliquen las mismas migraciones)
+_PG_LOCK_ID = 7301526
+
+
+# ============================================================================
+# MIGRACIONES
+# ============================================================================
+def _m001_crear_novedades(conn):
+    """Crea la tabla novedades con su definición original.
+
+    La tabla se define acá (y no desde el modelo) para que la migración siga
+    siendo la misma aunque el modelo cambie después. Si la tabla ya existe
+    (bases creadas antes del migrador con db.create_all()) no se toca.
+    """
+    metadata = MetaData()
+    Table(
+        "novedades", metadata,
+        Column("id", Integer, primary_key=True),
+        Column("timestamp", String(50), nullable=False),
+        Column("legajo", String(50)),
+        Column("nombre", String(255), nullable=False),
+        Column("tipo_empleado", String(50)),
+        Column("tipo_novedad", String(50), nullable=False),
+        Column("fecha_nacimiento", String(50)),
+        Column("dni", String(50)),
+        Column("cuil", String(50)),
+        Column("cbu", String(50)),
+        Column("banco", String(255)),
+        Column("domicilio", String(255)),
+        Column("email", String(255)),
+        Column("obra_social", String(255)),
+        Column("nivel", String(50)),
+        Column("fecha_alta", String(50)),
+        Column("cargo", String(255)),
+        Column("caracter_del_cargo", String(50)),
+        Column("trabaja_otra_institucion", String(50)),
+        Column("tipo_institucion", String(50)),
+        Column("horas_catedras", Float),
+        Column("subvencionado", String(50)),
+        Column("asignaciones_familiares", String(50)),
+        Column("cantidad_hijos", Integer),
+        Column("reemplazo_persona_ya_trabaja", String(50)),
+        Column("reemplazo_cargo_que_cubre", String(255)),
+        Column("fecha_inicio_reemplazo", String(50)),
+        Column("fecha_fin_reemplazo", String(50)),
+        Column("fecha_baja", String(50)),
+        Column("motivo_baja", String(255)),
+        Column("tipo_otro", String(255)),
+        Column("cargos_actuales", String(255)),
+        Column("tipo_movimiento", String(255)),
+        Column("subvencion", String(255)),
+        Column("codigo", String(255)),
+        Column("observaciones", Text),
+    )
+    metadata.create_all(conn, checkfirst=True)
+
+
+def _m002_timestamp_datetime(conn):
+    """Convierte novedades.timestamp de texto ISO a DateTime y lo indexa.
+
+    En PostgreSQL se cambia el tipo de la columna (los textos vacíos pasan a la
+    época). SQLite no tiene tipo fecha nativo: SQLAlchemy guarda los DateTime
+    como 'YYYY-MM-DD HH:MM:SS.ffffff', así que se reescriben los ISO viejos a
+    ese formato para que la comparación por rango sea correcta.
+    """
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(
+            'ALTER TABLE novedades ALTER COLUMN "timestamp" TYPE TIMESTAMP '
+            "USING COALESCE(NULLIF(\"timestamp\", '')::timestamp, 'epoch'::timestamp)"
+        ))
+    else:
+        conn.execute(text(
+            "UPDATE novedades SET timestamp = replace(timestamp, 'T', ' ') "
+            "WHERE timestamp LIKE '____-__-__T%'"
+        ))
+        conn.execute(text(
+            "UPDATE novedades SET timestamp = timestamp || '.000000' "
+            "WHERE length(timestamp) = 19"
+        ))
+        conn.execute(text(
+            "UPDATE novedades SET timestamp = '1970-01-01 00:00:00.000000' "
+            "WHERE timestamp IS NULL OR timestamp = ''"
+        ))
+    conn.execute(text(
+        'CREATE INDEX IF NOT EXISTS ix_novedades_timestamp ON novedades ("timestamp")'
+    ))
+
+
+def _m003_indice_timestamp_id(conn):
+    """Reemplaza el índice de timestamp por uno compuesto (timestamp, id),
+    que es el orden de la paginación por keyset de /ver."""
+    conn.execute(text(
+        'CREATE INDEX IF NOT EXISTS ix_novedades_timestamp_id ON novedades ("timestamp", id)'
+    ))
+    conn.execute(text("DROP INDEX IF EXISTS ix_novedades_timestamp"))
+
+
+def _m004_columna_periodo(conn):
+    """Agrega la clave de período (YYYY-MM) indexada y la completa.
+
+    El período empieza el 6, así que la clave es el año-mes de la fecha de
+    carga menos 5 días (ej.: 05/09 → 2025-08, 06/09 → 2025-09).
+    """
+    conn.execute(text(
+        "ALTER TABLE novedades ADD COLUMN periodo VARCHAR(7) NOT NULL DEFAULT ''"
+    ))
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(
+            "UPDATE novedades SET periodo = to_char(\"timestamp\" - interval '5 days', 'YYYY-MM')"
+        ))
+    else:
+        conn.execute(text(
+            "UPDATE novedades SET periodo = strftime('%Y-%m', timestamp, '-5 days')"
+        ))
+    conn.execute(text(
+        'CREATE INDEX IF NOT EXISTS ix_novedades_periodo_timestamp_id '
+        'ON novedades (periodo, "timestamp", id)'
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_novedades_periodo_tipo ON novedades (periodo, tipo_novedad)"
+    ))
+    conn.execute(text("DROP INDEX IF EXISTS ix_novedades_timestamp_id"))
+
+
+def _m005_identificadores_normalizados(conn):
+    """Agrega legajo/dni/cuil normalizados (solo dígitos) con índices para el historial"""
+    for campo in ("legajo", "dni", "cuil"):
+        conn.execute(text(
+            f"ALTER TABLE novedades ADD COLUMN {campo}_norm VARCHAR(50) NOT NULL DEFAULT ''"
+        ))
+
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(
+            "UPDATE novedades SET "
+            "legajo_norm = regexp_replace(coalesce(legajo, ''), '[^0-9]', '', 'g'), "
+            "dni_norm = regexp_replace(coalesce(dni, ''), '[^0-9]', '', 'g'), "
+            "cuil_norm = regexp_replace(coalesce(cuil, ''), '[^0-9]', '', 'g')"
+        ))
+    else:
+        # SQLite no tiene regexp_replace: se registra la misma función de Python
+        conn.connection.dbapi_connection.create_function("solo_digitos", 1, solo_digitos)
+        conn.execute(text(
+            "UPDATE novedades SET legajo_norm = solo_digitos(legajo), "
+            "dni_norm = solo_digitos(dni), cuil_norm = solo_digitos(cuil)"
+        ))
+
+    for campo in ("legajo", "dni", "cuil"):
+        conn.execute(text(
+            f'CREATE INDEX IF NOT EXISTS ix_novedades_{campo}_norm '
+            f'ON novedades ({campo}_norm, "timestamp", id)'
+        ))
+
+
+def _m006_version_fila(conn):
+    """Agrega la versión de cada fila para la concurrencia optimista de /actualizar"""
+    conn.execute(text("ALTER TABLE novedades ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+
+
+def _m007_crear_trabajos(conn):
+    """Crea la tabla de trabajos en segundo plano (exports)"""
+    metadata = MetaData()
+    Table(
+        "trabajos", metadata,
+        Column("id", String(32), primary_key=True),
+        Column("tipo", String(50), nullable=False),
+        Column("parametros", Text, nullable=False),
+        Column("estado", String(20), nullable=False),
+        Column("creado", DateTime, nullable=False),
+        Column("iniciado", DateTime),
+        Column("terminado", DateTime),
+        Column("archivo", String(255)),
+        Column("nombre_archivo", String(255)),
+        Column("mimetype", String(100)),
+        Column("tamano", Integer),
+        Column("error", Text),
+        Index("ix_trabajos_estado_creado", "estado", "creado"),
+    )
+    metadata.create_all(conn, checkfirst=True)
+
+
+def _m008_resumen_novedades(conn):
+    """Crea el resumen por período/nivel/tipo de empleado/tipo de novedad y lo llena"""
+    metadata = MetaData()
+    Table(
+        "resumen_novedades", metadata,
+        Column("periodo", String(7), primary_key=True),
+        Column("nivel", String(50), primary_key=True),
+        Column("tipo_empleado", String(50), primary_key=True),
+        Column("tipo_novedad", String(50), primary_key=True),
+        Column("cantidad", Integer, nullable=False),
+        Column("horas_catedras", Float, nullable=False),
+    )
+    metadata.create_all(conn, checkfirst=True)
+    conn.execute(text(
+        "INSERT INTO resumen_novedades "
+        "(periodo, nivel, tipo_empleado, tipo_novedad, cantidad, horas_catedras) "
+        "SELECT periodo, coalesce(nivel, ''), coalesce(tipo_empleado, ''), tipo_novedad, "
+        "count(*), coalesce(sum(horas_catedras), 0) "
+        "FROM novedades "
+        "GROUP BY periodo, coalesce(nivel, ''), coalesce(tipo_empleado, ''), tipo_novedad"
+    ))
+
+
+# Texto completo: columnas y peso en el ranking (A = más importante)
+_COLUMNAS_TEXTO_COMPLETO = (
+    ("nombre", "A"), ("cargo", "B"), ("cargos_actuales", "B"),
+    ("motivo_baja", "C"), ("observaciones", "D"),
+)
+# Letras acentuadas → sin acento (translate es IMMUTABLE y no necesita la
+# extensión unaccent, que no siempre se puede instalar en una base administrada)
+_CON_ACENTO = "áàäâéèëêíìïîóòöôúùüûñçÁÀÄÂÉÈËÊÍÌÏÎÓÒÖÔÚÙÜÛÑÇ"
+_SIN_ACENTO = "aaaaeeeeiiiioooouuuuncAAAAEEEEIIIIOOOOUUUUNC"
+
+
+def _m009_texto_completo(conn):
+    """Índice de texto completo: tsvector + GIN en PostgreSQL, FTS5 en SQLite"""
+    columnas = [c for c, _ in _COLUMNAS_TEXTO_COMPLETO]
+
+    if conn.dialect.name == "postgresql":
+        # Columna generada: PostgreSQL la recalcula en cada INSERT/UPDATE
+        vector = " || ".join(
+            f"setweight(to_tsvector('spanish', translate(coalesce({c}, ''), "
+            f"'{_CON_ACENTO}', '{_SIN_ACENTO}')), '{peso}')"
+            for c, peso in _COLUMNAS_TEXTO_COMPLETO
+        )
+        conn.execute(text(
+            f"ALTER TABLE novedades ADD COLUMN busqueda tsvector GENERATED ALWAYS AS ({vector}) STORED"
+        ))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_novedades_busqueda ON novedades USING GIN (busqueda)"
+        ))
+        return
+
+    # SQLite: tabla FTS5 con contenido externo (no duplica el texto) que se
+    # mantiene con triggers; remove_diacritics ignora acentos y eñes
+    lista = ", ".join(columnas)
+    nuevos = ", ".join(f"new.{c}" for c in columnas)
+    viejos = ", ".join(f"old.{c}" for c in columnas)
+    conn.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS novedades_fts USING fts5({lista}, "
+        f"content='novedades', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS novedades_fts_insert AFTER INSERT ON novedades BEGIN "
+        f"INSERT INTO novedades_fts(rowid, {lista}) VALUES (new.id, {nuevos}); END"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS novedades_fts_delete AFTER DELETE ON novedades BEGIN "
+        f"INSERT INTO novedades_fts(novedades_fts, rowid, {lista}) VALUES ('delete', old.id, {viejos}); END"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS novedades_fts_update AFTER UPDATE OF {lista} ON novedades BEGIN "
+        f"INSERT INTO novedades_fts(novedades_fts, rowid, {lista}) VALUES ('delete', old.id, {viejos}); "
+        f"INSERT INTO novedades_fts(rowid, {lista}) VALUES (new.id, {nuevos}); END"
+    ))
+    conn.execute(text("INSERT INTO novedades_fts(novedades_fts) VALUES ('rebuild')"))
+
+
+# Campos que usa huella_novedad, en el orden de la función de SQLite
+_CAMPOS_HUELLA = (
+    "legajo", "dni", "tipo_novedad", "fecha_alta", "fecha_baja", "fecha_inicio_reemplazo", "tipo_otro",
+)
+
+
+def _m010_idempotencia_y_huella(conn):
+    """Agrega la clave de idempotencia (única) y la huella de duplicados, con sus índices"""
+    conn.execute(text("ALTER TABLE novedades ADD COLUMN clave_idempotencia VARCHAR(64)"))
+    conn.execute(text("ALTER TABLE novedades ADD COLUMN huella VARCHAR(32)"))
+
+    if conn.dialect.name == "postgresql":
+        # Mismo texto que arma huella_novedad, con md5 del servidor
+        conn.execute(text(
+            "UPDATE novedades SET huella = md5(periodo || '|' || "
+            "CASE WHEN legajo_norm <> '' THEN 'L' || legajo_norm ELSE 'D' || dni_norm END "
+            "|| '|' || tipo_novedad || '|' || coalesce(CASE tipo_novedad "
+            "WHEN 'Alta' THEN fecha_alta "
+            "WHEN 'Baja' THEN fecha_baja "
+            "WHEN 'Reemplazo' THEN coalesce(nullif(fecha_inicio_reemplazo, ''), fecha_alta) "
+            "ELSE tipo_otro END, '')) "
+            "WHERE legajo_norm <> '' OR dni_norm <> ''"
+        ))
+    else:
+        def huella(periodo, *valores):
+            return huella_novedad(dict(zip(_CAMPOS_HUELLA, valores)), periodo)
+
+        conn.connection.dbapi_connection.create_function("huella", 1 + len(_CAMPOS_HUELLA), huella)
+        conn.execute(text(f"UPDATE novedades SET huella = huella(periodo, {', '.join(_CAMPOS_HUELLA)})"))
+
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_novedades_clave_idempotencia "
+        "ON novedades (clave_idempotencia)"
+    ))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_novedades_huella ON novedades (huella)"))
+
+
+def _m011_particiones_periodo(conn):
+    """
+    Registro de períodos archivados (SQLite) y, en PostgreSQL, novedades
+    particionada por período: se arma la tabla particionada con las mismas
+    columnas, se copian las filas y reemplaza a la original.
+
+    En una tabla particionada la clave primaria y los índices únicos tienen
+    que incluir periodo: la clave primaria pasa a ser (id, periodo) y la
+    clave de idempotencia es única dentro de cada período (la unicidad en
+    toda la base la da claves_idempotencia, migración 12).
+    """
+    metadata = MetaData()
+    Table(
+        "periodos_archivados", metadata,
+        Column("periodo", String(7), primary_key=True),
+        Column("filas", Integer, nullable=False),
+        Column("archivado", DateTime, nullable=False),
+    )
+    metadata.create_all(conn, checkfirst=True)
+    if conn.dialect.name != "postgresql":
+        return
+
+    # Índices actuales, para recrearlos iguales sobre la tabla particionada
+    indices = conn.execute(text(
+        "SELECT i.indexname, i.indexdef, c.contype FROM pg_indexes i "
+        "LEFT JOIN pg_constraint c ON c.conname = i.indexname "
+        "WHERE i.schemaname = current_schema() AND i.tablename = 'novedades'"
+    )).all()
+    columnas = ", ".join(f'"{c}"' for c in conn.execute(text(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = 'novedades' "
+        "AND is_generated = 'NEVER' ORDER BY ordinal_position"
+    )).scalars())
+    secuencia = conn.scalar(text("SELECT pg_get_serial_sequence('novedades', 'id')"))
+
+    # Misma definición (NOT NULL, defaults con la misma secuencia, columna generada)
+    conn.execute(text(
+        "CREATE TABLE novedades_particionada "
+        "(LIKE novedades INCLUDING DEFAULTS INCLUDING GENERATED) PARTITION BY LIST (periodo)"
+    ))
+    actual = Periodo.de_fecha()
+    claves = {actual.clave, actual.siguiente().clave}
+    claves.update(conn.execute(text("SELECT DISTINCT periodo FROM novedades")).scalars())
+    for clave in sorted(claves):
+        try:
+            periodo = Periodo.desde_clave(clave)
+        except ValueError:
+            continue  # claves mal formadas: van a la partición por defecto
+        conn.execute(text(
+            f"CREATE TABLE novedades_p_{periodo.anio:04d}_{periodo.mes:02d} "
+            f"PARTITION OF novedades_particionada FOR VALUES IN ('{periodo.clave}')"
+        ))
+    conn.execute(text("CREATE TABLE novedades_p_default PARTITION OF novedades_particionada DEFAULT"))
+
+    conn.execute(text(
+        f"INSERT INTO novedades_particionada ({columnas}) SELECT {columnas} FROM novedades"
+    ))
+    # La secuencia de los ids sigue (la tabla nueva ya la usa en su default)
+    conn.execute(text(f"ALTER SEQUENCE {secuencia} OWNED BY NONE"))
+    conn.execute(text("DROP TABLE novedades"))
+    conn.execute(text("ALTER TABLE novedades_particionada RENAME TO novedades"))
+    conn.execute(text(f"ALTER SEQUENCE {secuencia} OWNED BY novedades.id"))
+
+    conn.execute(text("ALTER TABLE novedades ADD CONSTRAINT novedades_pkey PRIMARY KEY (id, periodo)"))
+    for nombre, definicion, tipo in indices:
+        if tipo == "p":
+            continue
+        if definicion.startswith("CREATE UNIQUE INDEX") and "periodo" not in definicion:
+            definicion = definicion[:definicion.rindex(")")] + ", periodo)"
+        conn.execute(text(definicion))
+    conn.execute(text("ANALYZE novedades"))
+
+
+def _m012_claves_idempotencia(conn):
+    """
+    Tabla de claves de idempotencia usadas, sin particionar: su clave primaria
+    hace que cada clave sea única en toda la base (en novedades particionada
+    solo lo es dentro del período). Se llena con las claves ya guardadas,
+    también las de los períodos archivados de SQLite.
+    """
+    metadata = MetaData()
+    Table(
+        "claves_idempotencia", metadata,
+        Column("clave", String(64), primary_key=True),
+        Column("novedad_id", Integer, nullable=False),
+    )
+    metadata.create_all(conn, checkfirst=True)
+
+    origenes = ["novedades"]
+    if conn.dialect.name == "sqlite" and conn.scalar(text(
+        f"SELECT count(*) FROM pragma_database_list WHERE name = '{ESQUEMA_ARCHIVO}'"
+    )) and conn.scalar(text(
+        f"SELECT count(*) FROM {ESQUEMA_ARCHIVO}.sqlite_master WHERE type = 'table' AND name = 'novedades'"
+    )):
+        origenes.append(f"{ESQUEMA_ARCHIVO}.novedades")
+    filas = " UNION ALL ".join(
+        f"SELECT clave_idempotencia, id FROM {origen} WHERE clave_idempotencia IS NOT NULL"
+        for origen in origenes
+    )
+    # Si una clave ya se repitió entre períodos, queda la primera novedad
+    conn.execute(text(
+        f"INSERT INTO claves_idempotencia (clave, novedad_id) "
+        f"SELECT clave_idempotencia, min(id) FROM ({filas}) AS guardadas GROUP BY clave_idempotencia"
+    ))
+
+
+def _m013_versiones_periodos(conn):
+    """
+    Versión de los datos de cada período en la base (antes, un contador en la
+    memoria de cada proceso). Los períodos que ya tienen novedades arrancan en
+    el instante actual en milisegundos, como hacía el contador en memoria.
+    """
+    metadata = MetaData()
+    Table(
+        "versiones_periodos", metadata,
+        Column("periodo", String(7), primary_key=True),
+        Column("version", BigInteger, nullable=False),
+    )
+    metadata.create_all(conn, checkfirst=True)
+    conn.execute(text(
+        "INSERT INTO versiones_periodos (periodo, version) "
+        "SELECT periodo, :inicial FROM (SELECT DISTINCT periodo FROM novedades "
+        "UNION SELECT periodo FROM periodos_archivados) AS periodos"
+    ), {"inicial": int(datetime.now().timestamp() * 1000)})
+
+
+# Lista ordenada de (versión, descripción, función). Las migraciones nuevas
+# se agregan al final con la versión siguiente; nunca se editan las aplicadas.
+MIGRACIONES = [
+    (1, "Crear tabla novedades", _m001_crear_novedades),
+    (2, "Timestamp como DateTime indexado", _m002_timestamp_datetime),
+    (3, "Índice compuesto (timestamp, id)", _m003_indice_timestamp_id),
+    (4, "Columna periodo indexada", _m004_columna_periodo),
+    (5, "Legajo, DNI y CUIL normalizados e indexados", _m005_identificadores_normalizados),
+    (6, "Versión de fila (concurrencia optimista)", _m006_version_fila),
+    (7, "Tabla de trabajos en segundo plano", _m007_crear_trabajos),
+    (8, "Resumen por período, nivel y tipo", _m008_resumen_novedades),
+    (9, "Búsqueda de texto completo", _m009_texto_completo),
+    (10, "Clave de idempotencia y huella de duplicados", _m010_idempotencia_y_huella),
+    (11, "Particiones por período y registro de períodos archivados", _m011_particiones_periodo),
+    (12, "Claves de idempotencia únicas en toda la base", _m012_claves_idempotencia),
+    (13, "Versión de los datos de cada período", _m013_versiones_periodos),
+]
+
+
+# ============================================================================
+# EJECUCIÓN
+# ============================================================================
+def _tabla_version():
+    metadata = MetaData()
+    return Table(
+        TABLA_VERSION, metadata,
+        Column("version", Integer, primary_key=True),
+        Column("descripcion", String(255), nullable=False),
+        Column("aplicada", DateTime, nullable=False),
+    )
+
+
+def _versiones_aplicadas(conn, tabla):
+    tabla.create(conn, checkfirst=True)
+    return {fila.version for fila in conn.execute(tabla.select())}
+
+
+def estado_migraciones(engine):
+    """
+    Lista el estado de cada migración conocida.
+
+    Returns:
+        Lista de tuplas (versión, descripción, aplicada)
+    """
+    tabla = _tabla_version()
+    with engine.begin() as conn:
+        aplicadas = _versiones_aplicadas(conn, tabla)
+    return [(v, desc, v in aplicadas) for v, desc, _ in MIGRACIONES]
+
+
+def aplicar_migraciones(engine):
+    """
+    Aplica en orden las migraciones pendientes, cada una en su transacción.
+    En PostgreSQL, además, crea las particiones de novedades que falten para
+    el período actual y el siguiente.
+
+    Args:
+        engine: Engine de SQLAlchemy de la base a migrar
+
+    Returns:
+        Lista con las versiones aplicadas en esta ejecución
+    """
+    tabla = _tabla_version()
+    es_postgres = engine.dialect.name == "postgresql"
+    aplicadas_ahora = []
+
+    with engine.connect() as conn:
+        if es_postgres:
+            conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": _PG_LOCK_ID})
+            conn.commit()
+        try:
+            with conn.begin():
+                aplicadas = _versiones_aplicadas(conn, tabla)
+
+            for version, descripcion, migracion in MIGRACIONES:
+                if version in aplicadas:
+                    continue
+                with conn.begin():
+                    migracion(conn)
+                    conn.execute(tabla.insert().values(
+                        version=version,
+                        descripcion=descripcion,
+                        aplicada=datetime.now(),
+                    ))
+                aplicadas_ahora.append(version)
+
+            if es_postgres:
+                # Particiones del período actual y del siguiente (todavía con el lock)
+                with conn.begin():
+                    asegurar_particiones(conn)
+        finally:
+            if es_postgres:
+                conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": _PG_LOCK_ID})
+                conn.commit()
+
+    return aplicadas_ahora
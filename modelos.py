@@ -0,0 +1,198 @@
+"""Modelos de base de datos de la aplicación."""
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import validates
+
+from periodos import clave_de_fecha
+from validaciones import huella_novedad, solo_digitos
+
+# Instancia compartida de SQLAlchemy (se vincula a la app con db.init_app)
+db = SQLAlchemy()
+
+
+# ============================================================================
+# MODELO DE BASE DE DATOS
+# ============================================================================
+def _periodo_del_timestamp(context):
+    """Default de Novedad.periodo: se deriva del timestamp de la misma fila"""
+    return clave_de_fecha(context.get_current_parameters()["timestamp"])
+
+
+def _normalizado(campo):
+    """Default de <campo>_norm para los INSERT masivos: dígitos de la misma fila"""
+    def default(context):
+        return solo_digitos(context.get_current_parameters().get(campo))
+    return default
+
+
+def _huella(context):
+    """Default de Novedad.huella: se calcula con los campos de la misma fila"""
+    parametros = context.get_current_parameters()
+    return huella_novedad(parametros, clave_de_fecha(parametros["timestamp"]))
+
+
+class Novedad(db.Model):
+    """Modelo que representa una novedad laboral (Alta/Baja/Reemplazo/Otros)"""
+    __tablename__ = 'novedades'
+    __table_args__ = (
+        # Filtro por período + orden de la paginación por keyset
+        db.Index("ix_novedades_periodo_timestamp_id", "periodo", "timestamp", "id"),
+        # Resumen por período y tipo de novedad
+        db.Index("ix_novedades_periodo_tipo", "periodo", "tipo_novedad"),
+        # Historial de una persona, ordenado por fecha de carga
+        db.Index("ix_novedades_legajo_norm", "legajo_norm", "timestamp", "id"),
+        db.Index("ix_novedades_dni_norm", "dni_norm", "timestamp", "id"),
+        db.Index("ix_novedades_cuil_norm", "cuil_norm", "timestamp", "id"),
+        # Reenvíos del mismo formulario o petición. En PostgreSQL, particionada,
+        # es única por período: la unicidad global la da ClaveIdempotencia
+        db.Index("ix_novedades_clave_idempotencia", "clave_idempotencia", unique=True),
+        # Posibles duplicados: una búsqueda por huella al insertar
+        db.Index("ix_novedades_huella", "huella"),
+    )
+
+    # ID y timestamp
+    id = db.Column(db.Integer, primary_key=True)
+    # Versión de la fila: cada UPDATE la incrementa y exige la versión leída
+    # (concurrencia optimista entre dos operadores editando la misma novedad)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    timestamp = db.Column(db.DateTime, nullable=False)
+    # Período de liquidación (YYYY-MM), calculado del timestamp al insertar
+    periodo = db.Column(db.String(7), nullable=False, default=_periodo_del_timestamp)
+
+    # Datos básicos del empleado
+    legajo = db.Column(db.String(50), default="")
+    nombre = db.Column(db.String(255), nullable=False)
+    tipo_empleado = db.Column(db.String(50), default="")  # Docente/No Docente
+    tipo_novedad = db.Column(db.String(50), nullable=False)  # Alta/Baja/Reemplazo/Otros
+
+    # Datos personales
+    fecha_nacimiento = db.Column(db.String(50), default="")
+    dni = db.Column(db.String(50), default="")
+    cuil = db.Column(db.String(50), default="")
+    cbu = db.Column(db.String(50), default="")
+    banco = db.Column(db.String(255), default="")
+    domicilio = db.Column(db.String(255), default="")
+    email = db.Column(db.String(255), default="")
+    obra_social = db.Column(db.String(255), default="")
+
+    # Datos del alta
+    nivel = db.Column(db.String(50), default="")  # Inicial/Primario/Secundario/Terciario
+    fecha_alta = db.Column(db.String(50), default="")
+    cargo = db.Column(db.String(255), default="")
+    caracter_del_cargo = db.Column(db.String(50), default="")  # Titular/Suplente
+
+    # Decretos
+    trabaja_otra_institucion = db.Column(db.String(50), default="")
+    tipo_institucion = db.Column(db.String(50), default="")  # Pública/Privada/Ambas
+    horas_catedras = db.Column(db.Float, default=0.0)
+
+    # Datos laborales
+    subvencionado = db.Column(db.String(50), default="")
+    asignaciones_familiares = db.Column(db.String(50), default="")
+    cantidad_hijos = db.Column(db.Integer, default=0)
+
+    # Datos de reemplazo
+    reemplazo_persona_ya_trabaja = db.Column(db.String(50), default="")
+    reemplazo_cargo_que_cubre = db.Column(db.String(255), default="")
+    fecha_inicio_reemplazo = db.Column(db.String(50), default="")
+    fecha_fin_reemplazo = db.Column(db.String(50), default="")
+
+    # Datos de baja
+    fecha_baja = db.Column(db.String(50), default="")
+    motivo_baja = db.Column(db.String(255), default="")
+
+    # Otros tipos de novedad
+    tipo_otro = db.Column(db.String(255), default="")  # Anticipo/Inasistencia/Licencia
+
+    # Información adicional
+    cargos_actuales = db.Column(db.String(255), default="")
+    tipo_movimiento = db.Column(db.String(255), default="")
+    subvencion = db.Column(db.String(255), default="")
+    codigo = db.Column(db.String(255), default="")
+    observaciones = db.Column(db.Text, default="")
+
+    # Identificadores normalizados (solo dígitos) para buscar a la persona
+    legajo_norm = db.Column(db.String(50), nullable=False, default=_normalizado("legajo"))
+    dni_norm = db.Column(db.String(50), nullable=False, default=_normalizado("dni"))
+    cuil_norm = db.Column(db.String(50), nullable=False, default=_normalizado("cuil"))
+
+    # Clave que manda el cliente con cada envío: si se repite, no se inserta
+    # de nuevo (doble clic, reintento después de una respuesta lenta)
+    clave_idempotencia = db.Column(db.String(64))
+    # Huella de persona + tipo + fecha clave en el período (ver huella_novedad)
+    huella = db.Column(db.String(32), default=_huella)
+
+    __mapper_args__ = {"version_id_col": version}
+
+    @validates("legajo", "dni", "cuil")
+    def _sincronizar_normalizado(self, campo, valor):
+        """Mantiene <campo>_norm al día cuando se asigna el identificador por el ORM"""
+        setattr(self, f"{campo}_norm", solo_digitos(valor))
+        return valor
+
+
+class ResumenNovedad(db.Model):
+    """Cantidad de novedades y horas cátedra por período, nivel, tipo de empleado y tipo de novedad"""
+    __tablename__ = 'resumen_novedades'
+
+    # Clave del grupo (los vacíos se guardan como "", no como NULL)
+    periodo = db.Column(db.String(7), primary_key=True)
+    nivel = db.Column(db.String(50), primary_key=True)
+    tipo_empleado = db.Column(db.String(50), primary_key=True)
+    tipo_novedad = db.Column(db.String(50), primary_key=True)
+
+    cantidad = db.Column(db.Integer, nullable=False, default=0)
+    horas_catedras = db.Column(db.Float, nullable=False, default=0.0)
+
+
+class VersionPeriodo(db.Model):
+    """Versión de los datos de un período (cache, Excel precalculado y ETag, ver cache.py)"""
+    __tablename__ = 'versiones_periodos'
+
+    periodo = db.Column(db.String(7), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False)
+
+
+class ClaveIdempotencia(db.Model):
+    """
+    Clave de idempotencia ya usada y la novedad que guardó. Se inserta en la
+    misma transacción que la novedad: como la tabla no está particionada, su
+    clave primaria impide la misma clave en dos períodos distintos.
+    """
+    __tablename__ = 'claves_idempotencia'
+
+    clave = db.Column(db.String(64), primary_key=True)
+    novedad_id = db.Column(db.Integer, nullable=False)
+
+
+class PeriodoArchivado(db.Model):
+    """Período cerrado cuyas novedades se movieron al archivo de SQLite (ver particiones.py)"""
+    __tablename__ = 'periodos_archivados'
+
+    periodo = db.Column(db.String(7), primary_key=True)
+    filas = db.Column(db.Integer, nullable=False)
+    archivado = db.Column(db.DateTime, nullable=False)
+
+
+class Trabajo(db.Model):
+    """Trabajo en segundo plano (export de un período) y su estado"""
+    __tablename__ = 'trabajos'
+    __table_args__ = (
+        # Trabajos pendientes/en curso (límite global) y limpieza por antigüedad
+        db.Index("ix_trabajos_estado_creado", "estado", "creado"),
+    )
+
+    # Identificador aleatorio: es lo único que hace falta para consultar y descargar
+    id = db.Column(db.String(32), primary_key=True)
+    tipo = db.Column(db.String(50), nullable=False)  # export
+    parametros = db.Column(db.Text, nullable=False, default="{}")  # JSON
+    estado = db.Column(db.String(20), nullable=False)  # pendiente/en_curso/terminado/error
+    creado = db.Column(db.DateTime, nullable=False)
+    iniciado = db.Column(db.DateTime)
+    terminado = db.Column(db.DateTime)
+
+    # Resultado
+    archivo = db.Column(db.String(255))  # Ruta en el servidor
+    nombre_archivo = db.Column(db.String(255))  # Nombre para la descarga
+    mimetype = db.Column(db.String(100))
+    tamano = db.Column(db.Integer)
+    error = db.Column(db.Text)
@@ -0,0 +1,110 @@
+"""
+Configuración del engine de base de datos.
+
+PostgreSQL (producción, bajo gunicorn):
+- Pool de conexiones acotado (tamaño + overflow por worker), con reciclado
+  periódico y pre-ping para descartar conexiones cortadas por el servidor o
+  el proxy antes de usarlas.
+- statement_timeout por transacción según la ruta: las consultas comunes
+  tienen un límite corto y /descargar (y los exports en segundo plano) uno
+  más largo, así un export trabado no retiene la conexión para siempre.
+
+SQLite (desarrollo / fallback):
+- WAL, para que las lecturas no se bloqueen con las escrituras.
+- busy_timeout, para que una escritura concurrente espere en lugar de fallar
+  con "database is locked".
+
+Todo se configura con variables de entorno (ver CONFIG_POR_DEFECTO).
+"""
+import os
+
+from flask import has_request_context, request
+from sqlalchemy import event
+
+# Variable de entorno → valor por defecto
+CONFIG_POR_DEFECTO = {
+    # Pool (solo PostgreSQL). Máximo de conexiones por worker = tamaño + overflow
+    "DB_POOL_SIZE": 5,
+    "DB_MAX_OVERFLOW": 10,
+    "DB_POOL_TIMEOUT": 30,      # segundos esperando una conexión libre
+    "DB_POOL_RECYCLE": 1800,    # segundos antes de reabrir una conexión
+    # statement_timeout (solo PostgreSQL), en milisegundos
+    "DB_STATEMENT_TIMEOUT_MS": 15_000,
+    "DB_STATEMENT_TIMEOUT_DESCARGA_MS": 300_000,
+    # Espera por locks de SQLite, en milisegundos
+    "DB_BUSY_TIMEOUT_MS": 5_000,
+}
+
+# Rutas (endpoints) que usan el statement_timeout largo
+RUTAS_TIMEOUT_LARGO = ("descargar",)
+
+
+def es_sqlite(url):
+    return url.startswith("sqlite")
+
+
+def configurar_engine(app):
+    """
+    Carga la configuración del engine en app.config (variables de entorno o
+    valores por defecto) y arma SQLALCHEMY_ENGINE_OPTIONS.
+
+    Llamar antes de db.init_app(app), que es cuando se crea el engine.
+    """
+    for clave, defecto in CONFIG_POR_DEFECTO.items():
+        app.config.setdefault(clave, int(os.environ.get(clave, defecto)))
+
+    if es_sqlite(app.config["SQLALCHEMY_DATABASE_URI"]):
+        # El pool por defecto de SQLite ya es el adecuado; solo se pide que el
+        # driver espere los locks (el PRAGMA de cada conexión se aplica abajo)
+        opciones = {"connect_args": {"timeout": app.config["DB_BUSY_TIMEOUT_MS"] / 1000}}
+    else:
+        opciones = {
+            "pool_size": app.config["DB_POOL_SIZE"],
+            "max_overflow": app.config["DB_MAX_OVERFLOW"],
+            "pool_timeout": app.config["DB_POOL_TIMEOUT"],
+            "pool_recycle": app.config["DB_POOL_RECYCLE"],
+            "pool_pre_ping": True,
+        }
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", {}).update(opciones)
+
+
+def timeout_consulta(app):
+    """statement_timeout (ms) para la transacción actual según la ruta"""
+    if has_request_context() and request.endpoint not in RUTAS_TIMEOUT_LARGO:
+        return app.config["DB_STATEMENT_TIMEOUT_MS"]
+    # /descargar y el trabajo fuera de una petición (exports en segundo plano)
+    return app.config["DB_STATEMENT_TIMEOUT_DESCARGA_MS"]
+
+
+def registrar_eventos(app, db):
+    """
+    Registra los eventos por conexión (SQLite) y por transacción (PostgreSQL).
+
+    Llamar después de db.init_app(app).
+    """
+    with app.app_context():
+        engine = db.engine
+
+    if es_sqlite(str(engine.url)):
+        busy_timeout = app.config["DB_BUSY_TIMEOUT_MS"]
+
+        @event.listens_for(engine, "connect")
+        def pragmas_sqlite(conexion, _registro):
+            cursor = conexion.cursor()
+            # WAL es persistente en el archivo; en :memory: queda en "memory"
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout)}")
+            # Con WAL, NORMAL sigue siendo seguro ante caídas de la aplicación
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.close()
+        return
+
+    @event.listens_for(db.session, "after_begin")
+    def statement_timeout(_sesion, _transaccion, conexion):
+        # db.session es de todas las aplicaciones del proceso (crear_app
+        # puede llamarse más de una vez): solo las conexiones de este engine
+        if conexion.engine is not engine:
+            return
+        # SET LOCAL dura solo hasta el fin de la transacción, así que la
+        # conexión vuelve al pool sin arrastrar el timeout de otra ruta
+        conexion.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_consulta(app))}")
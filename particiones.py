@@ -0,0 +1,305 @@
+"""
+Separación de los períodos cerrados de la tabla de novedades.
+
+Todas las consultas de la aplicación son de un período (del 6 al 5), así que
+los períodos viejos solo agrandan los índices y los backups.
+
+PostgreSQL: `novedades` está particionada por LIST (periodo), una partición
+por período (novedades_p_YYYY_MM) más una por defecto (ver migración 11).
+Las consultas con "periodo = X" leen solo esa partición (partition pruning).
+Las particiones del período actual y del siguiente se crean al aplicar las
+migraciones y, en cada worker, con la primera petición de un período nuevo
+(ver registrar_particiones): la del siguiente ya existe cuando empieza. Si
+alguna fila cayó igual en la partición por defecto, se mueve al crearla.
+
+SQLite: `flask archivar-periodos` mueve los períodos cerrados a un archivo
+aparte (<base>_archivo.db, o ARCHIVO_SQLITE) y compacta la base principal.
+El archivo se adjunta a cada conexión con el esquema "archivo" y los
+períodos archivados quedan registrados en `periodos_archivados`; las lecturas
+de esos períodos se redirigen al archivo con schema_translate_map (ver
+opciones_lectura). Los períodos archivados son de solo lectura.
+"""
+import os
+from datetime import datetime
+
+from sqlalchemy import event, select, text
+
+from cache import incrementar_versiones
+from modelos import Novedad, PeriodoArchivado
+from periodos import Periodo
+
+# Nombre con el que se adjunta el archivo a cada conexión de SQLite
+ESQUEMA_ARCHIVO = "archivo"
+
+# Variable de entorno → valor por defecto
+CONFIG_POR_DEFECTO = {
+    # Períodos cerrados que quedan en la base principal además del actual
+    "ARCHIVO_PERIODOS_ACTIVOS": 3,
+}
+
+
+# ============================================================================
+# POSTGRESQL: PARTICIONES
+# ============================================================================
+def nombre_particion(clave):
+    """Nombre de la partición de un período (ej.: '2025-08' → novedades_p_2025_08)"""
+    return f"novedades_p_{Periodo.desde_clave(clave).clave.replace('-', '_')}"
+
+
+def _columnas_copiables(conn):
+    """Columnas de novedades que se pueden insertar (todas menos las generadas)"""
+    return [f'"{c}"' for c in conn.execute(text(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = 'novedades' "
+        "AND is_generated = 'NEVER' ORDER BY ordinal_position"
+    )).scalars()]
+
+
+def asegurar_particiones(conn, claves=None):
+    """
+    Crea las particiones que falten (por defecto, del período actual y del
+    siguiente). Las filas de esos períodos que hayan caído en la partición
+    por defecto se mueven a la nueva.
+
+    Args:
+        conn: Conexión a PostgreSQL dentro de una transacción
+        claves: Claves YYYY-MM de los períodos
+
+    Returns:
+        Lista de particiones creadas (vacía si novedades todavía no está
+        particionada, antes de la migración 11)
+    """
+    if conn.scalar(text("SELECT to_regclass('novedades_p_default')")) is None:
+        return []
+    if claves is None:
+        actual = Periodo.de_fecha()
+        claves = [actual.clave, actual.siguiente().clave]
+
+    def existe(nombre):
+        return conn.scalar(text("SELECT to_regclass(:nombre)"), {"nombre": nombre}) is not None
+
+    creadas = []
+    for clave in claves:
+        nombre = nombre_particion(clave)
+        if existe(nombre):
+            continue
+
+        # Crear la partición falla si la de por defecto tiene filas del período:
+        # se sacan antes y se vuelven a insertar (ya van a la partición nueva)
+        conn.execute(text("LOCK TABLE novedades_p_default IN EXCLUSIVE MODE"))
+        if existe(nombre):
+            continue  # otro worker la creó mientras se esperaba el lock
+        hay_filas = conn.scalar(
+            text("SELECT EXISTS (SELECT 1 FROM novedades_p_default WHERE periodo = :clave)"),
+            {"clave": clave},
+        )
+        if hay_filas:
+            columnas = ", ".join(_columnas_copiables(conn))
+            conn.execute(text(
+                f"CREATE TEMPORARY TABLE novedades_a_mover ON COMMIT DROP AS "
+                f"SELECT {columnas} FROM novedades_p_default WHERE periodo = :clave"
+            ), {"clave": clave})
+            conn.execute(text("DELETE FROM novedades_p_default WHERE periodo = :clave"), {"clave": clave})
+
+        conn.execute(text(f"CREATE TABLE {nombre} PARTITION OF novedades FOR VALUES IN ('{clave}')"))
+        if hay_filas:
+            conn.execute(text(
+                f"INSERT INTO novedades ({columnas}) SELECT {columnas} FROM novedades_a_mover"
+            ))
+            conn.execute(text("DROP TABLE novedades_a_mover"))
+        creadas.append(nombre)
+    return creadas
+
+
+def registrar_particiones(app, db):
+    """
+    PostgreSQL: con la primera petición de cada período, crea (en su propia
+    transacción) las particiones del período actual y del siguiente que
+    falten, así una aplicación que sigue corriendo después del 6 no escribe
+    el período nuevo en la partición por defecto. Llamar después de
+    db.init_app(app).
+    """
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != "postgresql":
+        return
+
+    # Períodos para los que este proceso ya aseguró las particiones
+    asegurados = set()
+
+    @app.before_request
+    def particiones_del_periodo():
+        clave = Periodo.de_fecha().clave
+        if clave in asegurados:
+            return
+        # Antes de que la sesión de la petición abra su transacción: crear la
+        # partición espera a las que leen novedades, no a la propia
+        with engine.begin() as conn:
+            asegurar_particiones(conn)
+        asegurados.add(clave)
+
+
+# ============================================================================
+# SQLITE: ARCHIVO DE PERÍODOS CERRADOS
+# ============================================================================
+def ruta_archivo(engine):
+    """Ruta del archivo de períodos archivados (None si no es SQLite en disco)"""
+    if engine.dialect.name != "sqlite" or not engine.url.database or engine.url.database == ":memory:":
+        return None
+    if os.environ.get("ARCHIVO_SQLITE"):
+        return os.environ["ARCHIVO_SQLITE"]
+    base, extension = os.path.splitext(engine.url.database)
+    return f"{base}_archivo{extension or '.db'}"
+
+
+def registrar_archivo(app, db):
+    """
+    Adjunta el archivo de períodos archivados a cada conexión de SQLite
+    (si no existe, SQLite lo crea vacío). Llamar después de db.init_app(app).
+    """
+    for clave, defecto in CONFIG_POR_DEFECTO.items():
+        app.config.setdefault(clave, int(os.environ.get(clave, defecto)))
+
+    with app.app_context():
+        engine = db.engine
+    ruta = ruta_archivo(engine)
+    if ruta is None:
+        return
+
+    @event.listens_for(engine, "connect")
+    def adjuntar_archivo(conexion, _registro):
+        cursor = conexion.cursor()
+        cursor.execute(f"ATTACH DATABASE ? AS {ESQUEMA_ARCHIVO}", (ruta,))
+        cursor.execute(f"PRAGMA {ESQUEMA_ARCHIVO}.journal_mode=WAL")
+        cursor.close()
+
+
+def hay_archivo(session):
+    """True si hay algún período archivado (y por lo tanto un esquema archivo con datos)"""
+    if session.get_bind().dialect.name != "sqlite":
+        return False
+    return session.scalar(select(PeriodoArchivado.periodo).limit(1)) is not None
+
+
+def periodo_archivado(session, clave):
+    """True si el período (clave YYYY-MM) está en el archivo de SQLite"""
+    if session.get_bind().dialect.name != "sqlite" or clave == Periodo.de_fecha().clave:
+        return False
+    return session.get(PeriodoArchivado, clave) is not None
+
+
+def periodos_archivados(session):
+    """Claves de los períodos que están en el archivo de SQLite (vacío en PostgreSQL)"""
+    if session.get_bind().dialect.name != "sqlite":
+        return set()
+    return set(session.scalars(select(PeriodoArchivado.periodo))) - {Periodo.de_fecha().clave}
+
+
+def opciones_lectura(session, clave):
+    """
+    Opciones de ejecución para leer novedades de un período: si está
+    archivado, la tabla novedades se lee del esquema archivo.
+
+    Returns:
+        Diccionario para execution_options (vacío si el período está en la base principal)
+    """
+    if periodo_archivado(session, clave):
+        return {"schema_translate_map": {None: ESQUEMA_ARCHIVO}}
+    return {}
+
+
+def _preparar_archivo(conn):
+    """Crea (o completa, si el modelo sumó columnas) la tabla e índices del archivo"""
+    en_archivo = conn.execution_options(schema_translate_map={None: ESQUEMA_ARCHIVO})
+    Novedad.__table__.create(en_archivo, checkfirst=True)
+
+    existentes = {fila[1] for fila in conn.execute(text(f"PRAGMA {ESQUEMA_ARCHIVO}.table_info(novedades)"))}
+    for columna in Novedad.__table__.columns:
+        if columna.name not in existentes:
+            tipo = columna.type.compile(conn.dialect)
+            conn.execute(text(f'ALTER TABLE {ESQUEMA_ARCHIVO}.novedades ADD COLUMN "{columna.name}" {tipo}'))
+
+    # Texto completo del archivo (mismas columnas y tokenizador que la migración 9)
+    conn.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {ESQUEMA_ARCHIVO}.novedades_fts USING fts5("
+        f"nombre, cargo, cargos_actuales, motivo_baja, observaciones, "
+        f"content='novedades', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+    ))
+
+
+def archivar_periodos(engine, activos, compactar=True, informar=print):
+    """
+    Mueve al archivo los períodos cerrados más viejos que los `activos`
+    anteriores al actual y compacta la base principal.
+
+    Cada período se copia al archivo en una transacción y se borra de la
+    base principal (registrándolo como archivado) en otra: si el proceso se
+    corta entre las dos, el período sigue en la base principal y la copia se
+    reemplaza en la próxima ejecución. La versión del período se incrementa
+    junto con el borrado, así ningún worker sigue usando lo cacheado.
+
+    Args:
+        engine: Engine de SQLite (con el archivo adjunto, ver registrar_archivo)
+        activos: Períodos cerrados que quedan en la base principal
+        compactar: Correr VACUUM de la base principal al terminar
+        informar: Función que recibe los mensajes de avance
+
+    Returns:
+        Lista de claves de los períodos archivados
+    """
+    corte = Periodo.de_fecha()
+    for _ in range(activos):
+        corte = corte.anterior()
+
+    columnas = ", ".join(f'"{c.name}"' for c in Novedad.__table__.columns)
+    with engine.begin() as conn:
+        _preparar_archivo(conn)
+        claves = list(conn.execute(
+            text("SELECT DISTINCT periodo FROM main.novedades WHERE periodo < :corte ORDER BY periodo"),
+            {"corte": corte.clave},
+        ).scalars())
+        id_maximo = conn.scalar(text("SELECT max(id) FROM main.novedades"))
+
+    archivados = []
+    for clave in claves:
+        with engine.begin() as conn:
+            # SQLite reusa el id más alto si se borra: esa fila queda en la
+            # base principal para que los ids nuevos no choquen con el archivo
+            if conn.scalar(
+                text("SELECT max(id) FROM main.novedades WHERE periodo = :clave"), {"clave": clave}
+            ) == id_maximo:
+                informar(f"· {clave}: tiene la última novedad cargada, queda en la base principal")
+                continue
+            conn.execute(text(
+                f"INSERT OR REPLACE INTO {ESQUEMA_ARCHIVO}.novedades ({columnas}) "
+                f"SELECT {columnas} FROM main.novedades WHERE periodo = :clave"
+            ), {"clave": clave})
+
+        with engine.begin() as conn:
+            filas = conn.scalar(
+                text(f"SELECT count(*) FROM {ESQUEMA_ARCHIVO}.novedades WHERE periodo = :clave"),
+                {"clave": clave},
+            )
+            conn.execute(text(
+                "INSERT OR REPLACE INTO periodos_archivados (periodo, filas, archivado) "
+                "VALUES (:clave, :filas, :ahora)"
+            ), {"clave": clave, "filas": filas, "ahora": datetime.now()})
+            conn.execute(text("DELETE FROM main.novedades WHERE periodo = :clave"), {"clave": clave})
+            # Los workers tienen cacheadas lecturas de la base principal
+            incrementar_versiones(conn, [clave])
+        archivados.append(clave)
+        informar(f"✓ {clave}: {filas} novedades archivadas")
+
+    if archivados:
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"INSERT INTO {ESQUEMA_ARCHIVO}.novedades_fts(novedades_fts) VALUES ('rebuild')"
+            ))
+    if compactar:
+        # VACUUM no puede correr dentro de una transacción
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM main"))
+            conn.execute(text("PRAGMA main.wal_checkpoint(TRUNCATE)"))
+        informar("✓ Base principal compactada")
+    return archivados
+
@@ -0,0 +1,104 @@
+"""
+Períodos de liquidación.
+
+Un período va del 6 de un mes al 5 del mes siguiente y se identifica con la
+clave YYYY-MM del mes en que empieza (ej.: 2025-08 = 06/08/2025 al 05/09/2025).
+Esa clave se guarda en la columna indexada novedades.periodo.
+"""
+from datetime import date, datetime, timedelta
+
+# Día del mes en que empieza cada período
+DIA_INICIO = 6
+
+# Años aceptados en una clave: el período de diciembre termina en enero del
+# año siguiente, que tiene que poder representarse con datetime
+ANIO_MINIMO = 1
+ANIO_MAXIMO = 9998
+
+
+class Periodo:
+    """Período de liquidación (del 6 de un mes al 5 del siguiente)"""
+
+    __slots__ = ("anio", "mes")
+
+    def __init__(self, anio, mes):
+        if not 1 <= mes <= 12:
+            raise ValueError(f"Mes inválido: {mes}")
+        self.anio = anio
+        self.mes = mes
+
+    @classmethod
+    def de_fecha(cls, dia=None):
+        """Período que contiene al día (date o datetime; por defecto, hoy)"""
+        dia = dia or date.today()
+        if dia.day >= DIA_INICIO:
+            return cls(dia.year, dia.month)
+        # Del 1 al 5: todavía es el período que empezó el mes anterior
+        if dia.month == 1:
+            return cls(dia.year - 1, 12)
+        return cls(dia.year, dia.month - 1)
+
+    @classmethod
+    def desde_clave(cls, clave):
+        """
+        Período a partir de su clave YYYY-MM.
+
+        Raises:
+            ValueError: Si la clave no tiene el formato YYYY-MM o el año
+                está fuera de ANIO_MINIMO..ANIO_MAXIMO
+        """
+        try:
+            anio, mes = clave.split("-")
+            if len(anio) != 4 or len(mes) != 2 or not (anio.isdigit() and mes.isdigit()):
+                raise ValueError
+            if not ANIO_MINIMO <= int(anio) <= ANIO_MAXIMO:
+                raise ValueError
+            return cls(int(anio), int(mes))
+        except (AttributeError, ValueError):
+            raise ValueError(f"Período inválido: '{clave}' (se espera YYYY-MM)")
+
+    @property
+    def clave(self):
+        return f"{self.anio:04d}-{self.mes:02d}"
+
+    @property
+    def inicio(self):
+        """Primer instante del período"""
+        return datetime(self.anio, self.mes, DIA_INICIO)
+
+    @property
+    def fin(self):
+        """Primer instante del período siguiente (rango semiabierto [inicio, fin))"""
+        return self.siguiente().inicio
+
+    @property
+    def ultimo_dia(self):
+        """Último día incluido en el período (el 5 del mes siguiente)"""
+        return (self.fin - timedelta(days=1)).date()
+
+    def anterior(self):
+        if self.mes == 1:
+            return Periodo(self.anio - 1, 12)
+        return Periodo(self.anio, self.mes - 1)
+
+    def siguiente(self):
+        if self.mes == 12:
+            return Periodo(self.anio + 1, 1)
+        return Periodo(self.anio, self.mes + 1)
+
+    def __eq__(self, otro):
+        return isinstance(otro, Periodo) and (self.anio, self.mes) == (otro.anio, otro.mes)
+
+    def __hash__(self):
+        return hash((self.anio, self.mes))
+
+    def __str__(self):
+        return self.clave
+
+    def __repr__(self):
+        return f"Periodo({self.clave!r})"
+
+
+def clave_de_fecha(dia):
+    """Clave YYYY-MM del período que contiene al día"""
+    return Periodo.de_fecha(dia).clave
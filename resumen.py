@@ -0,0 +1,181 @@
+"""
+Resumen precalculado para el tablero de supervisores.
+
+La tabla `resumen_novedades` guarda, por período, nivel, tipo de empleado y
+tipo de novedad, la cantidad de novedades y el total de horas cátedra. Las
+funciones que escriben novedades (add_novedad, add_novedades y
+actualizar_novedad) suman sus deltas con un upsert en la misma transacción,
+así que el resumen nunca queda desfasado de los datos. El tablero lee
+solo las filas de un período (una por grupo) en lugar de recorrer la tabla
+de novedades.
+
+`flask reconstruir-resumen` lo recalcula desde cero (por ejemplo, después de
+cargar filas por fuera de la aplicación), salvo los períodos archivados.
+"""
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+
+from cache import incrementar_versiones
+from modelos import Novedad, PeriodoArchivado, ResumenNovedad
+
+# Columnas que identifican un grupo (clave primaria de la tabla)
+COLUMNAS_GRUPO = ("periodo", "nivel", "tipo_empleado", "tipo_novedad")
+
+# Tipos de novedad en el orden de las columnas del tablero
+TIPOS_TABLERO = ("Alta", "Baja", "Reemplazo", "Otros")
+
+# Columna donde el tablero suma los demás tipos (Inasistencia, Anticipo, ...)
+TIPO_TABLERO_OTROS = "Otros"
+
+
+# ============================================================================
+# ACTUALIZACIÓN INCREMENTAL
+# ============================================================================
+def sumar_novedad(deltas, periodo, registro, signo=1):
+    """
+    Acumula en deltas el aporte de una novedad a su grupo.
+
+    Args:
+        deltas: Diccionario {grupo: [cantidad, horas]} que se va llenando
+        periodo: Clave YYYY-MM de la novedad
+        registro: Diccionario (o Novedad, con getattr) con nivel,
+            tipo_empleado, tipo_novedad y horas_catedras
+        signo: 1 para sumar la novedad, -1 para restarla
+    """
+    get = registro.get if isinstance(registro, dict) else lambda campo: getattr(registro, campo)
+    grupo = (periodo, get("nivel") or "", get("tipo_empleado") or "", get("tipo_novedad") or "")
+    acumulado = deltas.setdefault(grupo, [0, 0.0])
+    acumulado[0] += signo
+    acumulado[1] += signo * (get("horas_catedras") or 0.0)
+
+
+def aplicar_deltas(session, deltas):
+    """
+    Suma los deltas a la tabla con INSERT ... ON CONFLICT DO UPDATE, dentro
+    de la transacción de la sesión (el commit lo hace quien llama).
+
+    Los grupos se escriben siempre en el mismo orden para que dos
+    transacciones que tocan varios grupos no se bloqueen mutuamente.
+    """
+    filas = [
+        dict(zip(COLUMNAS_GRUPO, grupo), cantidad=cantidad, horas_catedras=horas)
+        for grupo, (cantidad, horas) in sorted(deltas.items())
+        if cantidad or horas
+    ]
+    if not filas:
+        return
+
+    dialecto = session.get_bind().dialect.name
+    sentencia = (postgresql if dialecto == "postgresql" else sqlite).insert(ResumenNovedad)
+    sentencia = sentencia.on_conflict_do_update(
+        index_elements=COLUMNAS_GRUPO,
+        set_={
+            "cantidad": ResumenNovedad.cantidad + sentencia.excluded.cantidad,
+            "horas_catedras": ResumenNovedad.horas_catedras + sentencia.excluded.horas_catedras,
+        },
+    )
+    session.execute(sentencia, filas)
+
+
+# ============================================================================
+# RECONSTRUCCIÓN
+# ============================================================================
+def reconstruir_resumen(session, periodo=None):
+    """
+    Recalcula el resumen desde la tabla de novedades, en una transacción.
+
+    También incrementa la versión de los períodos recalculados, así el cache
+    de todos los workers deja de servir el tablero anterior.
+
+    Args:
+        session: Sesión de SQLAlchemy
+        periodo: Clave YYYY-MM a recalcular (por defecto, todos)
+
+    Returns:
+        Cantidad de grupos resultantes
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        # Las escrituras concurrentes esperan en su upsert hasta el commit, así
+        # que sus deltas se suman sobre el resumen ya reconstruido
+        session.execute(text("LOCK TABLE resumen_novedades IN EXCLUSIVE MODE"))
+
+    nivel = func.coalesce(Novedad.nivel, "")
+    tipo_empleado = func.coalesce(Novedad.tipo_empleado, "")
+    consulta = (
+        select(
+            Novedad.periodo, nivel, tipo_empleado, Novedad.tipo_novedad,
+            func.count(), func.coalesce(func.sum(Novedad.horas_catedras), 0.0),
+        )
+        .group_by(Novedad.periodo, nivel, tipo_empleado, Novedad.tipo_novedad)
+    )
+    # Los períodos archivados ya no están en novedades: su resumen se conserva
+    borrar = delete(ResumenNovedad).where(
+        ResumenNovedad.periodo.not_in(select(PeriodoArchivado.periodo))
+    )
+    if periodo:
+        consulta = consulta.where(Novedad.periodo == periodo)
+        borrar = borrar.where(ResumenNovedad.periodo == periodo)
+        periodos = [periodo]
+    else:
+        periodos = session.scalars(
+            select(Novedad.periodo).union(select(ResumenNovedad.periodo))
+        ).all()
+
+    session.execute(borrar)
+    resultado = session.execute(
+        insert(ResumenNovedad).from_select(
+            [*COLUMNAS_GRUPO, "cantidad", "horas_catedras"], consulta
+        )
+    )
+    # Después del resumen, en el mismo orden que las escrituras (ver add_novedades)
+    incrementar_versiones(session, periodos)
+    session.commit()
+    return resultado.rowcount
+
+
+# ============================================================================
+# CONSULTA
+# ============================================================================
+def tablero_periodo(session, periodo):
+    """
+    Resumen de un período agrupado por nivel y tipo de empleado.
+
+    Args:
+        session: Sesión de SQLAlchemy
+        periodo: Clave YYYY-MM
+
+    Returns:
+        Diccionario con "grupos" (lista de {nivel, tipo_empleado, cantidades
+        por tipo de novedad, total, horas_catedras}) y "totales" (lo mismo
+        sumado para todo el período). Las cantidades tienen solo las columnas
+        de TIPOS_TABLERO: los demás tipos se suman en "Otros".
+    """
+    consulta = (
+        select(
+            ResumenNovedad.nivel, ResumenNovedad.tipo_empleado, ResumenNovedad.tipo_novedad,
+            ResumenNovedad.cantidad, ResumenNovedad.horas_catedras,
+        )
+        .where(ResumenNovedad.periodo == periodo, ResumenNovedad.cantidad > 0)
+        .order_by(ResumenNovedad.nivel, ResumenNovedad.tipo_empleado)
+    )
+
+    def vacio(**datos):
+        return dict(datos, cantidades=dict.fromkeys(TIPOS_TABLERO, 0), total=0, horas_catedras=0.0)
+
+    grupos = {}
+    totales = vacio()
+    for nivel, tipo_empleado, tipo_novedad, cantidad, horas in session.execute(consulta):
+        grupo = grupos.get((nivel, tipo_empleado))
+        if grupo is None:
+            grupo = grupos[(nivel, tipo_empleado)] = vacio(nivel=nivel, tipo_empleado=tipo_empleado)
+        if tipo_novedad not in TIPOS_TABLERO:
+            tipo_novedad = TIPO_TABLERO_OTROS
+        for destino in (grupo, totales):
+            destino["cantidades"][tipo_novedad] += cantidad
+            destino["total"] += cantidad
+            destino["horas_catedras"] += horas
+
+    for destino in (*grupos.values(), totales):
+        # Sumas de floats: redondear para no mostrar 12.499999999
+        destino["horas_catedras"] = round(destino["horas_catedras"], 2)
+    return {"grupos": list(grupos.values()), "totales": totales}
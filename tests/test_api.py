@@ -0,0 +1,207 @@
+"""
+API JSON, edición por /actualizar, importación y exports en segundo plano.
+"""
+import io
+import os
+import sys
+import time
+
+import pytest
+from sqlalchemy import func, select, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as aplicacion  # noqa: E402
+from app import ConflictoEdicion  # noqa: E402
+from migraciones import aplicar_migraciones  # noqa: E402
+from modelos import Novedad, db  # noqa: E402
+
+
+@pytest.fixture
+def cliente(app):
+    """Cliente HTTP de la aplicación, con el esquema ya migrado"""
+    aplicar_migraciones(db.engine)
+    return app.test_client()
+
+
+def _novedad(**campos):
+    """Datos de una novedad válida (tipo Otros), con los campos dados"""
+    datos = {"nombre": "Ana Pérez", "tipo_empleado": "Docente", "tipo_novedad": "Otros", "tipo_otro": "Anticipo"}
+    datos.update(campos)
+    return datos
+
+
+def _contar():
+    """Cantidad de novedades guardadas"""
+    return db.session.scalar(select(func.count()).select_from(Novedad))
+
+
+# ============================================================================
+# API JSON
+# ============================================================================
+def test_lote_con_errores_responde_207(cliente):
+    respuesta = cliente.post("/api/novedades", json=[_novedad(), _novedad(nombre=""), "no es un objeto"])
+
+    assert respuesta.status_code == 207
+    datos = respuesta.get_json()
+    assert (datos["insertadas"], datos["con_errores"]) == (1, 2)
+    primero, segundo, tercero = datos["resultados"]
+    assert primero["ok"] and primero["indice"] == 0 and primero["id"]
+    assert not segundo["ok"] and segundo["errores"] == ["El campo 'Nombre y apellido' es obligatorio."]
+    assert not tercero["ok"] and tercero["errores"]
+    assert _contar() == 1
+
+
+def test_clave_repetida_devuelve_el_id_existente(cliente):
+    primera = cliente.post("/api/novedades", json=[_novedad(clave_idempotencia="envio-1")])
+    assert primera.status_code == 201
+    [resultado] = primera.get_json()["resultados"]
+
+    repetida = cliente.post("/api/novedades", json=[_novedad(clave_idempotencia="envio-1")])
+
+    assert repetida.status_code == 200
+    assert repetida.get_json()["resultados"] == [
+        {"indice": 0, "ok": True, "id": resultado["id"], "repetida": True}
+    ]
+    assert _contar() == 1
+
+
+def test_cursor_recorre_todas_las_novedades(cliente):
+    # Mismo timestamp en todo el lote: el cursor desempata por id
+    respuesta = cliente.post("/api/novedades", json=[_novedad(nombre=f"Persona {i}") for i in range(7)])
+    ids = {r["id"] for r in respuesta.get_json()["resultados"]}
+
+    vistos, paginas, cursor = [], 0, None
+    while True:
+        datos = cliente.get("/api/novedades", query_string={"limite": 3, "despues": cursor}).get_json()
+        vistos += [n["id"] for n in datos["novedades"]]
+        paginas += 1
+        cursor = datos["siguiente"]
+        if cursor is None:
+            break
+
+    assert paginas == 3
+    assert datos["total"] == 7
+    assert len(vistos) == len(set(vistos)) and set(vistos) == ids
+
+
+def test_busqueda_toma_comodines_como_texto(cliente):
+    cliente.post("/api/novedades", json=[
+        _novedad(observaciones="Descuento 100%"),
+        _novedad(observaciones="Descuento 1000"),
+        _novedad(observaciones="legajo_12"),
+        _novedad(observaciones="legajo 12"),
+    ])
+
+    def buscar(texto):
+        datos = cliente.get("/api/novedades", query_string={"q": texto}).get_json()
+        return [n["observaciones"] for n in datos["novedades"]]
+
+    assert buscar("100%") == ["Descuento 100%"]
+    assert buscar("o_1") == ["legajo_12"]
+    assert buscar("%") == ["Descuento 100%"]
+
+
+def test_patch_con_version_vieja_responde_409(cliente):
+    cliente.post("/api/novedades", json=[_novedad()])
+    [novedad] = cliente.get("/api/novedades").get_json()["novedades"]
+
+    url = f"/api/novedades/{novedad['id']}"
+    primera = cliente.patch(url, json={"nombre": "Ana María Pérez", "version": novedad["version"]})
+    assert primera.status_code == 200
+    assert primera.get_json()["cambios"] == ["nombre"]
+
+    segunda = cliente.patch(url, json={"nombre": "Otra", "version": novedad["version"]})
+
+    assert segunda.status_code == 409
+    db.session.expire_all()
+    assert db.session.get(Novedad, novedad["id"]).nombre == "Ana María Pérez"
+
+
+# ============================================================================
+# EDICIÓN E IMPORTACIÓN
+# ============================================================================
+def test_actualizar_solo_escribe_lo_que_cambio(cliente):
+    cliente.post("/api/novedades", json=[_novedad(observaciones="Primera quincena")])
+    [novedad] = cliente.get("/api/novedades").get_json()["novedades"]
+    formulario = {"id": novedad["id"], "version": novedad["version"], "nombre": novedad["nombre"]}
+
+    # Sin cambios: no hay UPDATE y la versión queda igual
+    cliente.post("/actualizar", data=formulario)
+    db.session.expire_all()
+    assert db.session.get(Novedad, novedad["id"]).version == novedad["version"]
+
+    # Los campos que no vienen en el formulario quedan como estaban
+    cliente.post("/actualizar", data=dict(formulario, nombre="Ana María Pérez"))
+    db.session.expire_all()
+    guardada = db.session.get(Novedad, novedad["id"])
+    assert (guardada.nombre, guardada.observaciones) == ("Ana María Pérez", "Primera quincena")
+    assert guardada.version != novedad["version"]
+
+
+def test_segunda_edicion_con_la_misma_version(cliente):
+    cliente.post("/api/novedades", json=[_novedad()])
+    novedad = db.session.scalars(select(Novedad)).one()
+    version = novedad.version
+
+    # Sin cambios: no hay commit y la versión no se mueve
+    assert aplicacion.actualizar_novedad(novedad, {"nombre": "Ana Pérez"}, version) == ({}, [])
+    assert aplicacion.actualizar_novedad(novedad, {"nombre": "Ana María Pérez"}, version) == (
+        {"nombre": "Ana María Pérez"}, []
+    )
+    with pytest.raises(ConflictoEdicion):
+        aplicacion.actualizar_novedad(novedad, {"nombre": "Otra"}, version)
+
+    db.session.expire_all()
+    guardada = db.session.get(Novedad, novedad.id)
+    assert (guardada.nombre, guardada.version) == ("Ana María Pérez", version + 1)
+
+
+def test_edicion_de_una_fila_que_cambio_despues_de_leerla(cliente):
+    cliente.post("/api/novedades", json=[_novedad()])
+    novedad = db.session.scalars(select(Novedad)).one()
+
+    # Otra persona guarda entre la lectura y el UPDATE
+    with db.engine.begin() as conn:
+        conn.execute(text(
+            "UPDATE novedades SET nombre = 'Otra', version = version + 1 WHERE id = :id"
+        ), {"id": novedad.id})
+
+    with pytest.raises(ConflictoEdicion):
+        aplicacion.actualizar_novedad(novedad, {"nombre": "Ana María Pérez"}, novedad.version)
+
+    db.session.expire_all()
+    assert db.session.get(Novedad, novedad.id).nombre == "Otra"
+
+
+def test_importar_csv_guarda_las_filas_validas(cliente):
+    contenido = (
+        "nombre,tipo_empleado,tipo_novedad,tipo_otro\n"
+        "Ana Pérez,Docente,Otros,Anticipo\n"
+        ",Docente,Otros,Anticipo\n"
+        "Juan Gómez,No Docente,Otros,Inasistencia\n"
+    ).encode("utf-8")
+
+    respuesta = cliente.post("/importar", data={"archivo": (io.BytesIO(contenido), "novedades.csv")})
+
+    assert respuesta.status_code == 200
+    assert sorted(db.session.scalars(select(Novedad.nombre))) == ["Ana Pérez", "Juan Gómez"]
+    assert "Se importaron 2 novedades." in respuesta.get_data(as_text=True)
+
+
+def test_export_en_segundo_plano(cliente):
+    cliente.post("/api/novedades", json=[_novedad()])
+
+    respuesta = cliente.post("/jobs", json={"format": "csv"})
+    assert respuesta.status_code == 202
+    url = respuesta.headers["Location"]
+
+    fin = time.monotonic() + 10
+    while (trabajo := cliente.get(url).get_json())["estado"] != "terminado":
+        assert trabajo["estado"] != "error", trabajo.get("error")
+        assert time.monotonic() < fin, "el trabajo no terminó a tiempo"
+        time.sleep(0.05)
+
+    descarga = cliente.get(trabajo["descarga"])
+    assert descarga.status_code == 200
+    assert "Ana Pérez" in descarga.get_data(as_text=True)
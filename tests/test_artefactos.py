@@ -0,0 +1,58 @@
+"""
+Reconstrucción en segundo plano del Excel precalculado.
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artefactos import ArtefactosExcel  # noqa: E402
+
+ESPERA = 0.1
+
+
+def _esperar(condicion, limite=5):
+    """Espera hasta que condicion() sea verdadera (o falla pasado el límite)"""
+    fin = time.monotonic() + limite
+    while not condicion():
+        assert time.monotonic() < fin, "no se cumplió a tiempo"
+        time.sleep(0.01)
+
+
+def test_cambios_seguidos_se_juntan(tmp_path):
+    artefactos = ArtefactosExcel(str(tmp_path), espera=ESPERA)
+    construcciones = []
+
+    for _ in range(20):
+        artefactos.programar("2025-08", lambda: construcciones.append("2025-08"))
+    artefactos.programar("2025-09", lambda: construcciones.append("2025-09"))
+
+    _esperar(lambda: len(construcciones) == 2)
+    time.sleep(ESPERA * 3)
+    assert sorted(construcciones) == ["2025-08", "2025-09"]
+
+
+def test_cambios_durante_la_reconstruccion(tmp_path):
+    artefactos = ArtefactosExcel(str(tmp_path), espera=ESPERA)
+    empezo, seguir = threading.Event(), threading.Event()
+    construcciones = []
+
+    def reconstruir():
+        construcciones.append(time.monotonic())
+        empezo.set()
+        seguir.wait(5)
+
+    artefactos.programar("2025-08", reconstruir)
+    assert empezo.wait(5)
+    # Mientras se arma el libro: una sola reconstrucción más, después de terminar
+    for _ in range(5):
+        artefactos.programar("2025-08", reconstruir)
+    terminada = time.monotonic()
+    seguir.set()
+
+    _esperar(lambda: len(construcciones) == 2)
+    time.sleep(ESPERA * 3)
+    assert len(construcciones) == 2
+    assert construcciones[1] - terminada >= ESPERA
@@ -0,0 +1,144 @@
+"""
+Migraciones del esquema en SQLite y en PostgreSQL (ver conftest.py).
+"""
+import os
+import sys
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as aplicacion  # noqa: E402
+import migraciones  # noqa: E402
+import particiones  # noqa: E402
+from migraciones import MIGRACIONES, aplicar_migraciones  # noqa: E402
+from modelos import ClaveIdempotencia, Novedad, db  # noqa: E402
+from particiones import archivar_periodos  # noqa: E402
+from periodos import Periodo  # noqa: E402
+
+# Última versión antes de particionar novedades (migración 11)
+VERSION_SIN_PARTICIONES = 10
+
+
+# ============================================================================
+# AUXILIARES
+# ============================================================================
+def _migrar_hasta(version, monkeypatch):
+    """Aplica las migraciones hasta la versión dada (inclusive)"""
+    with monkeypatch.context() as m:
+        m.setattr(migraciones, "MIGRACIONES", [x for x in MIGRACIONES if x[0] <= version])
+        return aplicar_migraciones(db.engine)
+
+
+def _insertar(filas):
+    """Inserta filas (timestamp, clave_idempotencia) con SQL plano, como una base vieja"""
+    with db.engine.begin() as conn:
+        for timestamp, clave in filas:
+            conn.execute(text(
+                'INSERT INTO novedades ("timestamp", periodo, nombre, tipo_novedad, clave_idempotencia) '
+                "VALUES (:timestamp, :periodo, 'Ana', 'Alta', :clave)"
+            ), {"timestamp": timestamp, "periodo": Periodo.de_fecha(timestamp).clave, "clave": clave})
+
+
+# ============================================================================
+# PRUEBAS
+# ============================================================================
+def test_migraciones_conservan_las_novedades(app, monkeypatch):
+    _migrar_hasta(VERSION_SIN_PARTICIONES, monkeypatch)
+    _insertar([
+        (datetime(2025, 7, 10, 9, 0), "a"),
+        (datetime(2025, 8, 5, 23, 59), None),
+        (datetime(2025, 8, 6, 0, 0), "b"),
+        (datetime(2025, 9, 20, 12, 30), None),
+    ])
+    antes = db.session.execute(
+        select(Novedad.id, Novedad.periodo, Novedad.clave_idempotencia).order_by(Novedad.id)
+    ).all()
+    db.session.rollback()
+
+    pendientes = [v for v, _, _ in MIGRACIONES if v > VERSION_SIN_PARTICIONES]
+    assert aplicar_migraciones(db.engine) == pendientes
+    assert aplicar_migraciones(db.engine) == []
+
+    despues = db.session.execute(
+        select(Novedad.id, Novedad.periodo, Novedad.clave_idempotencia).order_by(Novedad.id)
+    ).all()
+    assert despues == antes
+    assert dict(db.session.execute(select(ClaveIdempotencia.clave, ClaveIdempotencia.novedad_id)).all()) == {
+        "a": antes[0].id, "b": antes[2].id,
+    }
+
+    if db.engine.dialect.name == "postgresql":
+        assert db.session.scalar(text(
+            "SELECT count(*) FROM pg_partitioned_table WHERE partrelid = 'novedades'::regclass"
+        )) == 1
+        for clave in ("2025-07", "2025-08", "2025-09", Periodo.de_fecha().clave):
+            nombre = f"novedades_p_{clave.replace('-', '_')}"
+            assert db.session.scalar(text("SELECT to_regclass(:nombre)"), {"nombre": nombre})
+        db.session.rollback()
+
+    # Los ids siguen después de los copiados
+    [(nuevo_id, _)] = aplicacion.add_novedades(
+        [{"nombre": "Ana", "tipo_novedad": "Alta", "timestamp": datetime(2025, 9, 21, 8, 0)}]
+    )
+    assert nuevo_id > antes[-1].id
+
+
+def test_clave_repetida_en_otro_periodo(app, monkeypatch):
+    aplicar_migraciones(db.engine)
+
+    def registro(timestamp):
+        return {"nombre": "Ana", "tipo_novedad": "Alta", "timestamp": timestamp, "clave_idempotencia": "k"}
+
+    [(primero, nueva)] = aplicacion.add_novedades([registro(datetime(2025, 9, 5, 23, 59))])
+    assert nueva
+
+    # Reintento que cruza del 5 al 6 (otro período) y que además pierde la
+    # carrera con la consulta previa: lo tiene que frenar claves_idempotencia
+    consultar = aplicacion.ids_por_clave
+    llamadas = []
+
+    def sin_ver_la_primera_vez(claves):
+        llamadas.append(claves)
+        return {} if len(llamadas) == 1 else consultar(claves)
+
+    monkeypatch.setattr(aplicacion, "ids_por_clave", sin_ver_la_primera_vez)
+    assert aplicacion.add_novedades([registro(datetime(2025, 9, 6, 0, 0))]) == [(primero, False)]
+    assert db.session.scalar(select(func.count()).where(Novedad.clave_idempotencia == "k")) == 1
+
+
+def test_claves_de_periodos_archivados(app, url_base, monkeypatch):
+    if not url_base.startswith("sqlite"):
+        pytest.skip("El archivo de períodos es solo de SQLite")
+    _migrar_hasta(11, monkeypatch)
+    _insertar([(datetime(2025, 3, 10, 9, 0), "archivada"), (datetime.now(), "actual")])
+    # Una base de la versión 11 todavía no tiene versiones_periodos (migración 13)
+    monkeypatch.setattr(particiones, "incrementar_versiones", lambda conn, periodos: None)
+    assert archivar_periodos(db.engine, 0, informar=lambda mensaje: None) == ["2025-03"]
+
+    assert aplicar_migraciones(db.engine) == [v for v, _, _ in MIGRACIONES if v > 11]
+    assert set(db.session.scalars(select(ClaveIdempotencia.clave))) == {"archivada", "actual"}
+
+
+def test_particion_de_un_periodo_nuevo(app, url_base, monkeypatch):
+    if url_base.startswith("sqlite"):
+        pytest.skip("Las particiones son solo de PostgreSQL")
+    aplicar_migraciones(db.engine)
+    futuro = Periodo.de_fecha().siguiente().siguiente()
+    # Sin partición todavía: la fila cae en la partición por defecto
+    [(novedad_id, _)] = aplicacion.add_novedades(
+        [{"nombre": "Ana", "tipo_novedad": "Alta", "timestamp": futuro.inicio}]
+    )
+    nombre = f"novedades_p_{futuro.clave.replace('-', '_')}"
+    assert db.session.scalar(text("SELECT to_regclass(:nombre)"), {"nombre": nombre}) is None
+    db.session.rollback()
+
+    # La aplicación sigue corriendo y llega el 6: la primera petición crea las particiones
+    monkeypatch.setattr(Periodo, "de_fecha", classmethod(lambda cls, dia=None: futuro))
+    assert app.test_client().get("/ver").status_code == 200
+    assert db.session.scalar(text(f"SELECT id FROM {nombre}")) == novedad_id
+    assert db.session.scalar(text("SELECT count(*) FROM novedades_p_default")) == 0
+    siguiente = f"novedades_p_{futuro.siguiente().clave.replace('-', '_')}"
+    assert db.session.scalar(text("SELECT to_regclass(:nombre)"), {"nombre": siguiente})
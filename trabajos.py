@@ -0,0 +1,239 @@
+"""
+Trabajos en segundo plano (exports) persistidos en la tabla `trabajos`.
+
+Un export grande dentro de una petición bloquea el worker sync de gunicorn
+todo lo que dure y puede cortarse por el timeout. En su lugar, la petición
+registra un trabajo y responde enseguida con su id; un pool local de threads
+lo ejecuta y deja el archivo en disco. El cliente consulta /jobs/<id> hasta
+que el estado es "terminado" y descarga el archivo.
+
+Límites de concurrencia, para que los exports no le quiten recursos a la
+carga de novedades:
+- Por proceso: TRABAJOS_MAX_CONCURRENTES threads (por defecto 1).
+- Global (todos los workers): como mucho TRABAJOS_MAX_GLOBAL trabajos en
+  curso a la vez; el trabajo se toma con un UPDATE condicional, así que un
+  mismo trabajo nunca corre dos veces aunque lo vean varios procesos.
+- Cola: con TRABAJOS_MAX_PENDIENTES trabajos esperando se rechazan nuevos.
+
+Como el estado está en la base, cualquier worker responde /jobs/<id>. Si el
+proceso que registró un trabajo se reinicia antes de correrlo, el trabajo lo
+retoma el proceso que atienda la próxima consulta de su estado.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, update
+
+from metricas import TRABAJOS, TRABAJOS_DURACION
+from modelos import Trabajo
+
+PENDIENTE = "pendiente"
+EN_CURSO = "en_curso"
+TERMINADO = "terminado"
+ERROR = "error"
+
+# Variable de entorno → valor por defecto
+CONFIG_POR_DEFECTO = {
+    "TRABAJOS_MAX_CONCURRENTES": 1,   # threads por proceso
+    "TRABAJOS_MAX_GLOBAL": 2,         # trabajos en curso entre todos los procesos
+    "TRABAJOS_MAX_PENDIENTES": 20,    # trabajos esperando antes de rechazar nuevos
+    "TRABAJOS_RETENCION_HORAS": 24,   # se borran (fila y archivo) pasado este tiempo
+    "TRABAJOS_MAX_DURACION_S": 900,   # un trabajo en curso más tiempo se da por perdido
+}
+
+# Un pendiente sin tomar después de esto se retoma al consultar su estado
+ESPERA_RETOMAR = timedelta(seconds=30)
+# Espera entre intentos cuando se alcanzó el límite global
+ESPERA_LIMITE_S = 1.0
+
+
+class ColaLlena(Exception):
+    """Hay demasiados trabajos pendientes para aceptar otro"""
+
+
+class ColaTrabajos:
+    """Registro, ejecución y consulta de trabajos en segundo plano"""
+
+    def __init__(self, app, db, directorio):
+        for clave, defecto in CONFIG_POR_DEFECTO.items():
+            app.config.setdefault(clave, int(os.environ.get(clave, defecto)))
+        self.app = app
+        self.db = db
+        self.directorio = directorio
+        self._ejecutores = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=app.config["TRABAJOS_MAX_CONCURRENTES"], thread_name_prefix="trabajos",
+        )
+        self._en_cola = set()
+        self._lock = threading.Lock()
+
+    def registrar(self, tipo, ejecutar):
+        """
+        Registra la función que ejecuta los trabajos de un tipo.
+
+        Args:
+            tipo: Nombre del tipo de trabajo (p. ej. "export")
+            ejecutar: Función (parametros, destino) que escribe el resultado en
+                la ruta destino y devuelve (nombre_archivo, mimetype)
+        """
+        self._ejecutores[tipo] = ejecutar
+
+    # ------------------------------------------------------------------------
+    # Registro y consulta (dentro de una petición)
+    # ------------------------------------------------------------------------
+    def enviar(self, tipo, parametros):
+        """
+        Registra un trabajo y lo agenda en el pool local.
+
+        Returns:
+            El Trabajo creado (estado "pendiente")
+
+        Raises:
+            ColaLlena: si ya hay TRABAJOS_MAX_PENDIENTES trabajos esperando
+        """
+        if tipo not in self._ejecutores:
+            raise ValueError(f"Tipo de trabajo desconocido: {tipo}")
+        session = self.db.session
+        self.limpiar()
+
+        pendientes = session.scalar(
+            select(func.count()).select_from(Trabajo).where(Trabajo.estado == PENDIENTE)
+        )
+        if pendientes >= self.app.config["TRABAJOS_MAX_PENDIENTES"]:
+            raise ColaLlena("Hay demasiados trabajos en espera; intente de nuevo en unos minutos.")
+
+        trabajo = Trabajo(
+            id=uuid.uuid4().hex, tipo=tipo, parametros=json.dumps(parametros),
+            estado=PENDIENTE, creado=datetime.now(),
+        )
+        session.add(trabajo)
+        session.commit()
+        self._agendar(trabajo.id)
+        return trabajo
+
+    def obtener(self, id_trabajo):
+        """
+        Devuelve el trabajo (o None). De paso retoma los pendientes que nadie
+        tomó y marca como error los que quedaron en curso demasiado tiempo.
+        """
+        trabajo = self.db.session.get(Trabajo, id_trabajo)
+        if trabajo is None:
+            return None
+
+        ahora = datetime.now()
+        if trabajo.estado == PENDIENTE and ahora - trabajo.creado > ESPERA_RETOMAR:
+            self._agendar(trabajo.id)
+        elif trabajo.estado == EN_CURSO and trabajo.iniciado and (
+            ahora - trabajo.iniciado > timedelta(seconds=self.app.config["TRABAJOS_MAX_DURACION_S"])
+        ):
+            trabajo.estado = ERROR
+            trabajo.terminado = ahora
+            trabajo.error = "El trabajo se interrumpió antes de terminar."
+            self.db.session.commit()
+        return trabajo
+
+    def limpiar(self):
+        """Borra los trabajos (y sus archivos) más viejos que la retención"""
+        limite = datetime.now() - timedelta(hours=self.app.config["TRABAJOS_RETENCION_HORAS"])
+        session = self.db.session
+        viejos = session.scalars(
+            select(Trabajo).where(Trabajo.estado.in_((TERMINADO, ERROR)), Trabajo.creado < limite)
+        ).all()
+        for trabajo in viejos:
+            if trabajo.archivo and os.path.exists(trabajo.archivo):
+                os.remove(trabajo.archivo)
+            session.delete(trabajo)
+        if viejos:
+            session.commit()
+
+    # ------------------------------------------------------------------------
+    # Ejecución (threads del pool)
+    # ------------------------------------------------------------------------
+    def _agendar(self, id_trabajo):
+        with self._lock:
+            if id_trabajo in self._en_cola:
+                return
+            self._en_cola.add(id_trabajo)
+        self._executor.submit(self._correr, id_trabajo)
+
+    def _tomar(self, id_trabajo):
+        """
+        Pasa el trabajo a "en curso" si sigue pendiente y hay lugar bajo el
+        límite global. Devuelve True si lo tomó este proceso.
+        """
+        # Los que llevan en curso más que TRABAJOS_MAX_DURACION_S no cuentan:
+        # su proceso se cayó y no deben bloquear el límite
+        vigentes_desde = datetime.now() - timedelta(seconds=self.app.config["TRABAJOS_MAX_DURACION_S"])
+        en_curso = (
+            select(func.count()).select_from(Trabajo)
+            .where(Trabajo.estado == EN_CURSO, Trabajo.iniciado > vigentes_desde)
+            .scalar_subquery()
+        )
+        resultado = self.db.session.execute(
+            update(Trabajo)
+            .where(
+                Trabajo.id == id_trabajo, Trabajo.estado == PENDIENTE,
+                en_curso < self.app.config["TRABAJOS_MAX_GLOBAL"],
+            )
+            .values(estado=EN_CURSO, iniciado=datetime.now())
+            .execution_options(synchronize_session=False)
+        )
+        self.db.session.commit()
+        return resultado.rowcount == 1
+
+    def _correr(self, id_trabajo):
+        try:
+            with self.app.app_context():
+                self._correr_en_contexto(id_trabajo)
+        except Exception:
+            self.app.logger.exception("Error en el trabajo %s", id_trabajo)
+        finally:
+            with self._lock:
+                self._en_cola.discard(id_trabajo)
+
+    def _correr_en_contexto(self, id_trabajo):
+        session = self.db.session
+        # Esperar lugar bajo el límite global mientras el trabajo siga pendiente
+        while not self._tomar(id_trabajo):
+            estado = session.scalar(select(Trabajo.estado).where(Trabajo.id == id_trabajo))
+            if estado != PENDIENTE:
+                return  # lo tomó otro proceso (o ya no existe)
+            time.sleep(ESPERA_LIMITE_S)
+
+        trabajo = session.get(Trabajo, id_trabajo)
+        parametros = json.loads(trabajo.parametros)
+        os.makedirs(self.directorio, exist_ok=True)
+        # Se escribe en un temporal y se renombra al terminar: nunca se sirve
+        # un archivo a medio escribir
+        descriptor, temporal = tempfile.mkstemp(dir=self.directorio, suffix=".tmp")
+        os.close(descriptor)
+        try:
+            nombre_archivo, mimetype = self._ejecutores[trabajo.tipo](parametros, temporal)
+            destino = os.path.join(self.directorio, f"{trabajo.id}{os.path.splitext(nombre_archivo)[1]}")
+            os.replace(temporal, destino)
+        except Exception as e:
+            session.rollback()
+            self.app.logger.exception("Falló el trabajo %s (%s)", trabajo.id, trabajo.tipo)
+            trabajo.estado = ERROR
+            trabajo.error = str(e) or type(e).__name__
+        else:
+            trabajo.estado = TERMINADO
+            trabajo.archivo = destino
+            trabajo.nombre_archivo = nombre_archivo
+            trabajo.mimetype = mimetype
+            trabajo.tamano = os.path.getsize(destino)
+        finally:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+        trabajo.terminado = datetime.now()
+        session.commit()
+        TRABAJOS.incrementar(tipo=trabajo.tipo, estado=trabajo.estado)
+        TRABAJOS_DURACION.observar(
+            (trabajo.terminado - trabajo.iniciado).total_seconds(), tipo=trabajo.tipo,
+        )
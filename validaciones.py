@@ -0,0 +1,120 @@
+"""
+Normalización y validación de novedades.
+
+Las mismas reglas se aplican al formulario (/enviar) y a la importación
+masiva, así que cualquier origen de datos produce registros equivalentes.
+La conversión de cada campo sale del registro de campos.py.
+"""
+import hashlib
+
+from campos import normalizar_novedad
+
+# Identificadores de la persona que se guardan también normalizados (solo
+# dígitos) en columnas indexadas <campo>_norm para las búsquedas
+CAMPOS_IDENTIFICADORES = ("legajo", "dni", "cuil")
+
+# Campos que entran en la huella (ver huella_novedad)
+CAMPOS_HUELLA = {
+    "legajo", "dni", "tipo_novedad", "fecha_alta", "fecha_baja", "fecha_inicio_reemplazo", "tipo_otro",
+}
+
+
+def solo_digitos(valor):
+    """Normaliza un identificador dejando solo los dígitos (ej.: '20-12.345.678-9' → '20123456789')"""
+    return "".join(c for c in str(valor or "") if c.isdigit())
+
+
+def huella_novedad(datos, periodo):
+    """
+    Huella de una novedad para detectar cargas repetidas: md5 de período,
+    persona (legajo o, si no hay, DNI), tipo de novedad y su fecha clave
+    (fecha de alta, de baja o de inicio del reemplazo; en "Otros", el subtipo).
+
+    Dos novedades con la misma huella son probablemente la misma carga hecha
+    dos veces. La migración 10 calcula lo mismo en SQL para las filas viejas.
+
+    Args:
+        datos: Diccionario (o Novedad, con getattr) con los campos de la novedad
+        periodo: Clave YYYY-MM de la novedad
+
+    Returns:
+        Texto hexadecimal de 32 caracteres, o None si no hay legajo ni DNI
+    """
+    get = datos.get if isinstance(datos, dict) else lambda campo: getattr(datos, campo, None)
+    legajo, dni = solo_digitos(get("legajo")), solo_digitos(get("dni"))
+    if not legajo and not dni:
+        return None
+
+    tipo_novedad = get("tipo_novedad") or ""
+    if tipo_novedad == "Alta":
+        fecha_clave = get("fecha_alta")
+    elif tipo_novedad == "Baja":
+        fecha_clave = get("fecha_baja")
+    elif tipo_novedad == "Reemplazo":
+        # El reemplazo de alguien que ya trabaja tiene fecha de inicio; el de
+        # una persona nueva, fecha de alta
+        fecha_clave = get("fecha_inicio_reemplazo") or get("fecha_alta")
+    else:
+        fecha_clave = get("tipo_otro")
+
+    persona = f"L{legajo}" if legajo else f"D{dni}"
+    texto = "|".join((periodo, persona, tipo_novedad, fecha_clave or ""))
+    return hashlib.md5(texto.encode("utf-8")).hexdigest()
+
+
+def validar_novedad(datos):
+    """
+    Normaliza y valida los datos de una novedad.
+
+    Args:
+        datos: Diccionario (o MultiDict del formulario) con los campos como texto
+
+    Returns:
+        Tupla (registro, errores). registro tiene todos los campos listos para
+        guardar (sin id ni timestamp); errores es una lista de mensajes.
+    """
+    # -------------------------------------------------------------------------
+    # 1. NORMALIZAR (los números inválidos ya vienen como errores)
+    # -------------------------------------------------------------------------
+    registro, errores = normalizar_novedad(datos)
+
+    # -------------------------------------------------------------------------
+    # 2. VALIDACIONES
+    # -------------------------------------------------------------------------
+    tipo_novedad = registro["tipo_novedad"]
+
+    # Validaciones básicas
+    if not registro["nombre"]:
+        errores.append("El campo 'Nombre y apellido' es obligatorio.")
+    if not registro["tipo_empleado"]:
+        errores.append("Seleccioná 'Docente' o 'No Docente'.")
+    if not tipo_novedad:
+        errores.append("Seleccioná el 'Tipo de novedad'.")
+
+    ## Validaciones por tipo de novedad
+    falta_alta = not registro["fecha_alta"] or not registro["nivel"] or not registro["cargo"]
+
+    if tipo_novedad == "Alta":
+        if falta_alta:
+            errores.append("Para 'Alta', los campos 'Fecha de alta', 'Nivel' y 'Cargo' son obligatorios.")
+
+    elif tipo_novedad == "Baja":
+        if not registro["fecha_baja"] or not registro["motivo_baja"]:
+            errores.append("Para 'Baja', los campos 'Fecha de baja' y 'Motivo' son obligatorios.")
+
+    elif tipo_novedad == "Reemplazo":
+        ya_trabaja = registro["reemplazo_persona_ya_trabaja"]
+        if ya_trabaja not in ("Si", "No"):
+            errores.append("En 'Reemplazo', indicá si la persona ya trabaja en el colegio (Sí/No).")
+        elif ya_trabaja == "Si":
+            if (not registro["reemplazo_cargo_que_cubre"] or not registro["fecha_inicio_reemplazo"]
+                    or not registro["fecha_fin_reemplazo"]):
+                errores.append("En 'Reemplazo (ya trabaja)', indicá cargo y fechas de inicio y fin.")
+        elif falta_alta:
+            errores.append("En 'Reemplazo (nuevo)', los campos 'Fecha de alta', 'Nivel' y 'Cargo' son obligatorios.")
+
+    elif tipo_novedad == "Otros":
+        if not registro["tipo_otro"]:
+            errores.append("En 'Otros', seleccioná el subtipo (Anticipo/Inasistencia/Lic. sin goce).")
+
+    return registro, errores